@@ -0,0 +1,241 @@
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from typing import Dict, List, Any, Callable, Tuple
+from synthetic_inventory import generate_inventory
+from helper_fns import extract_json_from_string
+from parser_registry import parse_services, ParsedServiceCache
+from evpn_vpws_parser import parse_evpn_vpws_json
+from evpn_elan_parser import parse_evpn_json
+from l2ckt_parser import parse_l2circuit_json
+from l3vpn_parser import parse_l3vpn_json
+from reference_data import build_customer_index, build_device_index, build_site_index
+from inventory_store import InventoryStore
+from inventory_sync import FULL_PAGE, FULL_DONE
+
+DEFAULT_SIZES = "1000,10000,50000"
+# Lookups timed per benchmark, spread over the dataset
+LOOKUP_SAMPLE = 10000
+
+# name -> (setup(dataset) -> state, run(state) -> items processed)
+Benchmark = Tuple[Callable[[Dict[str, Any]], Any], Callable[[Any], int]]
+
+
+def _dataset(size: int, seed: int) -> Dict[str, Any]:
+    inventory = generate_inventory(size, seed)
+    instances = inventory["instances"]
+    body = json.dumps(instances)
+    inventory["body"] = body
+    inventory["markdown"] = f"Here are the instances:\n```json\n{body}\n```\n"
+    step = max(1, len(instances) // LOOKUP_SAMPLE)
+    inventory["sample"] = [instance["instance_id"] for instance in instances[::step]]
+    return inventory
+
+def _parser_benchmark(parse: Callable[[Any], Any]) -> Benchmark:
+    def run(instances: List[Dict[str, Any]]) -> int:
+        parse(instances)
+        return len(instances)
+    return (lambda data: data["instances"], run)
+
+def _parse_cache_cold(data: Dict[str, Any]) -> Any:
+    store = InventoryStore(os.path.join(data["workdir"], "parse.db"))
+    _full_sync(store, data["instances"])
+    return store, None
+
+def _run_parse_cache_cold(state: Any) -> int:
+    store, _ = state
+    digests = store.query_digests()
+    ParsedServiceCache(store.get_documents).parse(digests)
+    return len(digests)
+
+def _parse_cache_warm(data: Dict[str, Any]) -> Any:
+    store, _ = _parse_cache_cold(data)
+    cache = ParsedServiceCache(store.get_documents)
+    cache.parse(store.query_digests())
+    return store, cache
+
+def _run_parse_cache_warm(state: Any) -> int:
+    """A repeated get_services: the store query and the cache, end to end"""
+    store, cache = state
+    digests = store.query_digests()
+    cache.parse(digests)
+    return len(digests)
+
+def _reference_data_access(data: Dict[str, Any]) -> Any:
+    results = parse_services(data["instances"])
+    return [(reference_data, list(reference_data)[:LOOKUP_SAMPLE]) for _, reference_data in results.values()]
+
+def _access_all(state: Any) -> int:
+    accessed = 0
+    for reference_data, names in state:
+        for name in names:
+            reference_data[name]
+        accessed += len(names)
+    return accessed
+
+def _index_lookups(data: Dict[str, Any]) -> Any:
+    hostnames = [device["hostname"].upper() for device in data["devices"]["devices"]]
+    names = [customer["name"] for customer in data["customers"]]
+    return data, hostnames, names
+
+def _run_index_lookups(state: Any) -> int:
+    data, hostnames, names = state
+    customers_index = build_customer_index(data["customers"])
+    devices_index = build_device_index(data["devices"])
+    build_site_index(data["sites"])
+    for _ in range(LOOKUP_SAMPLE // max(1, len(hostnames)) + 1):
+        for hostname in hostnames:
+            devices_index.get(hostname.lower())
+        for name in names:
+            customers_index.get(name.lower())
+    return len(data["customers"]) + len(data["devices"]["devices"]) + len(data["sites"])
+
+def _full_sync(store: InventoryStore, instances: List[Dict[str, Any]], page_size: int = 500):
+    """Write instances the way InventorySync's full resync does, page by page then swapped in"""
+    for start in range(0, len(instances), page_size):
+        store.apply_instances(instances[start:start + page_size], [], FULL_PAGE)
+    store.apply_instances([], [], FULL_DONE)
+
+def _inventory_store(data: Dict[str, Any]) -> Any:
+    store = InventoryStore(os.path.join(data["workdir"], "lookup.db"))
+    _full_sync(store, data["instances"])
+    return store, data
+
+def _store_lookups(state: Any) -> int:
+    store, data = state
+    for instance_name in data["sample"]:
+        store.lookup_instance(instance_name)
+    return len(data["sample"])
+
+def _store_queries(state: Any) -> int:
+    store, data = state
+    customers, devices = data["customers"][:50], data["devices"]["devices"][:50]
+    for customer in customers:
+        store.query_documents({"customer_id": customer["customer_id"], "design_id": "l3vpn"})
+    for device in devices:
+        store.query_documents({"ne_id": device["hostname"]})
+    return len(customers) + len(devices)
+
+def _store_write(data: Dict[str, Any]) -> Any:
+    return InventoryStore(os.path.join(data["workdir"], "sync.db")), data["instances"]
+
+def _run_store_write(state: Any) -> int:
+    store, instances = state
+    _full_sync(store, instances)
+    return len(instances)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    # JSON extraction
+    "json.loads get_instances": (lambda data: data["body"], lambda body: len(json.loads(body))),
+    "extract_json_from_string": (lambda data: data["markdown"], lambda text: len(extract_json_from_string(text))),
+    # Parsers
+    "parse_evpn_vpws_json": _parser_benchmark(parse_evpn_vpws_json),
+    "parse_evpn_json": _parser_benchmark(parse_evpn_json),
+    "parse_l2circuit_json": _parser_benchmark(parse_l2circuit_json),
+    "parse_l3vpn_json": _parser_benchmark(parse_l3vpn_json),
+    "parse_services (all designs)": _parser_benchmark(parse_services),
+    "ParsedServiceCache cold": (_parse_cache_cold, _run_parse_cache_cold),
+    "ParsedServiceCache warm": (_parse_cache_warm, _run_parse_cache_warm),
+    "reference_data access": (_reference_data_access, _access_all),
+    # Lookup helpers
+    "customer/device/site index": (_index_lookups, _run_index_lookups),
+    "InventoryStore full sync": (_store_write, _run_store_write),
+    "InventoryStore.lookup_instance": (_inventory_store, _store_lookups),
+    "InventoryStore.query_documents": (_inventory_store, _store_queries),
+}
+
+
+def measure(run: Callable[[Any], int], state: Any, repeat: int) -> Dict[str, float]:
+    """Best wall time of repeat runs, then one traced run for the peak allocation"""
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        items = run(state)
+        timings.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    seconds = min(timings)
+    return {"items": items, "seconds": seconds, "items_per_second": items / seconds if seconds else 0.0,
+            "peak_mb": peak / 1e6}
+
+def run_benchmarks(sizes: List[int], seed: int = 0, repeat: int = 3, only: str = None) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        data = _dataset(size, seed)
+        # Keep the collector off the dataset itself, which a real caller wouldn't be holding
+        gc.freeze()
+        with tempfile.TemporaryDirectory(prefix="rd-bench-") as workdir:
+            data["workdir"] = workdir
+            for name, (setup, run) in BENCHMARKS.items():
+                if only and only.lower() not in name.lower():
+                    continue
+                state = setup(data)
+                result = {"benchmark": name, "size": size}
+                result.update(measure(run, state, repeat))
+                results.append(result)
+                print(f"{name:<34} {size:>7} {result['seconds']:>9.4f}s {result['items_per_second']:>14,.0f}/s "
+                      f"{result['peak_mb']:>9.1f} MB", flush=True)
+                if isinstance(state, tuple) and isinstance(state[0], InventoryStore):
+                    state[0].close()
+        gc.unfreeze()
+        del data
+    return results
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Benchmarks whose throughput dropped or peak memory grew by more than tolerance"""
+    previous = {(result["benchmark"], result["size"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["benchmark"], result["size"]))
+        if before is None:
+            continue
+        if result["items_per_second"] < before["items_per_second"] * (1 - tolerance):
+            regressions.append(f"{result['benchmark']} @ {result['size']}: throughput "
+                               f"{before['items_per_second']:,.0f}/s -> {result['items_per_second']:,.0f}/s")
+        if result["peak_mb"] > before["peak_mb"] * (1 + tolerance) + 1:
+            regressions.append(f"{result['benchmark']} @ {result['size']}: peak memory "
+                               f"{before['peak_mb']:.1f} MB -> {result['peak_mb']:.1f} MB")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and peak memory of the service parsers, lookups and JSON extraction on synthetic inventories")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated instance counts (1k to 200k)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic inventory")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark, the best one is reported")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this text")
+    parser.add_argument("--output", help="Write the results to this JSON file, e.g. to use as a baseline")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown / memory growth")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    print(f"{'benchmark':<34} {'size':>7} {'best':>10} {'throughput':>16} {'peak':>12}")
+    results = run_benchmarks(sizes, seed=args.seed, repeat=args.repeat, only=args.only)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
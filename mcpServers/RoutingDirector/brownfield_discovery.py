@@ -0,0 +1,538 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, AsyncIterator, Iterable, Optional, Tuple
+import pandas as pd
+import xml.etree.ElementTree as ET
+from rd_client import env_int, env_float
+import discovery_writer
+from netconf_pool import get_netconf_pool
+
+logger = logging.getLogger(__name__)
+
+# Routers discovered at once, and at once through one SSH host (sshd's MaxStartups
+# drops unauthenticated connections beyond 10 by default)
+RD_DISCOVERY_CONCURRENCY = env_int('RD_DISCOVERY_CONCURRENCY', 32)
+RD_DISCOVERY_PER_HOST_LIMIT = env_int('RD_DISCOVERY_PER_HOST_LIMIT', 10)
+# Seconds one router may take, from connect to the last RPC
+RD_DISCOVERY_DEVICE_TIMEOUT = env_float('RD_DISCOVERY_DEVICE_TIMEOUT', 120.0)
+# Further attempts at a failed router, the first after RD_DISCOVERY_RETRY_BACKOFF
+# seconds and each later one after twice as long
+RD_DISCOVERY_RETRIES = env_int('RD_DISCOVERY_RETRIES', 2)
+RD_DISCOVERY_RETRY_BACKOFF = env_float('RD_DISCOVERY_RETRY_BACKOFF', 5.0)
+
+INTERFACE_CONFIG_COMMAND = 'show configuration interfaces | display xml |display inheritance no-comments'
+
+# (IFD -> description, (IFD, unit) -> (unit description, outer-vlan, inner-vlan))
+InterfaceIndex = Tuple[Dict[str, Optional[str]], Dict[Tuple[str, str], Tuple[Optional[str], str, str]]]
+
+
+class _Deadline:
+    """Time left for one router; checked between RPCs and used as the RPC timeout"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        remaining = self.expires - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Device discovery exceeded {self.seconds:.0f}s")
+        return remaining
+
+
+class DiscoveryCheckpoint:
+    """Journal of which routers of a discovery run succeeded or failed, to resume it
+
+    A header line with the run ID, then one JSON line per router outcome; the
+    last line of a router wins. Lines are flushed as they are written, so the
+    journal survives the run dying at any point (a torn last line is ignored).
+
+    Args:
+        path: journal file
+        run_id: ID of the run
+        output_format: format the run streams its tables in
+        resume: continue the journal of run_id at path; a journal of another run
+            there is an error. False starts a fresh journal, replacing any other.
+    """
+
+    def __init__(self, path: str, run_id: str, output_format: str, resume: bool = False):
+        self.path = path
+        self.run_id = run_id
+        self.output_format = output_format
+        # "host:port" -> last outcome
+        self.routers: Dict[str, Dict[str, Any]] = {}
+        # Table file positions after the last completed router
+        self.positions: Optional[Dict[str, int]] = None
+        # Whether the journal ends in a torn line, to be terminated before appending
+        self._torn = False
+        self.resumed = resume and self._load()
+        if not self.resumed:
+            self.routers, self.positions = {}, None
+        self._file = open(path, 'a' if self.resumed else 'w', encoding='utf-8')
+        if self._torn:
+            # Keep the first event of this run off the end of the torn line
+            self._file.write('\n')
+        if not self.resumed:
+            self._append({'run_id': run_id, 'output_format': output_format,
+                          'started_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    @staticmethod
+    def key(router: Dict[str, Any]) -> str:
+        return f"{router['host']}:{router['port']}"
+
+    def _load(self) -> bool:
+        """Read an earlier journal of this run ID; False if there is none to resume"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding='utf-8') as file:
+            content = file.read()
+        lines = content.splitlines()
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return False
+        if header.get('run_id') != self.run_id:
+            raise ValueError(f"{self.path} is the checkpoint of run {header.get('run_id')}, not {self.run_id}; "
+                             f"resume that run or start a new one without a run_id")
+        if header.get('output_format') != self.output_format:
+            raise ValueError(f"Run {self.run_id} streamed {header.get('output_format')} output, "
+                             f"it can't be resumed as {self.output_format}")
+        for line in lines[1:]:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            self.routers[event['router']] = event
+            if event['status'] == 'ok':
+                self.positions = event.get('positions')
+        self._torn = not content.endswith('\n')
+        return True
+
+    def _append(self, event: Dict[str, Any]):
+        self._file.write(json.dumps(event) + '\n')
+        self._file.flush()
+
+    def completed(self, router: Dict[str, Any]) -> bool:
+        return self.routers.get(self.key(router), {}).get('status') == 'ok'
+
+    def attempts(self, router: Dict[str, Any]) -> int:
+        return self.routers.get(self.key(router), {}).get('attempts', 0)
+
+    def record(self, router: Dict[str, Any], status: str, attempts: int, error: str = None,
+               rows: Dict[str, int] = None, positions: Optional[Dict[str, int]] = None):
+        event = {'router': self.key(router), 'status': status, 'attempts': attempts}
+        if error is not None:
+            event['error'] = error
+        if rows is not None:
+            event['rows'] = rows
+        if positions is not None:
+            event['positions'] = positions
+        self.routers[event['router']] = event
+        self._append(event)
+
+    def close(self):
+        self._file.close()
+
+
+def load_router_list(router_list_filepath: str, host: str) -> List[Dict[str, Any]]:
+    """Routers to discover from the Excel router list: 'Port' column, optional 'Host' column"""
+    if not Path(router_list_filepath).exists():
+        raise FileNotFoundError(f"Router list file not found: {router_list_filepath}")
+
+    try:
+        df = pd.read_excel(router_list_filepath, engine='openpyxl')
+        if 'Port' not in df.columns:
+            raise ValueError("Excel file must contain 'Port' column")
+    except Exception as e:
+        raise Exception(f"Error reading router list file: {str(e)}")
+
+    routers = []
+    for index, row in enumerate(df.to_dict('records')):
+        router_host = row.get('Host') if 'Host' in df.columns and pd.notna(row.get('Host')) else host
+        routers.append({'index': index, 'host': str(router_host), 'port': int(row['Port'])})
+    return routers
+
+def unit_vlans(unit: ET.Element) -> Tuple[str, str]:
+    """(outer-vlan, inner-vlan) of an interface unit's configuration"""
+    vlan_tags = unit.find('.//vlan-tags')
+    vlan_id = unit.findtext('.//vlan-id')
+
+    if vlan_tags is not None:
+        outer = vlan_tags.findtext('outer')
+        inner = vlan_tags.findtext('inner')
+        if outer and inner:
+            return outer, inner
+        elif outer and not inner:
+            return outer, '0'
+        else:
+            return 'config error', 'config error'
+    elif vlan_id:
+        return vlan_id, '0'
+    return '0', '0'
+
+def index_interface_config(interfaces: Iterable[ET.Element]) -> InterfaceIndex:
+    """Index the interface elements of an interfaces configuration by IFD and by (IFD, unit)
+
+    Later definitions of the same IFD or unit override earlier ones, as the
+    linear scan this replaces did.
+    """
+    ifd_descriptions: Dict[str, Optional[str]] = {}
+    units: Dict[Tuple[str, str], Tuple[Optional[str], str, str]] = {}
+    for iface in interfaces:
+        name = iface.findtext('name')
+        ifd_descriptions[name] = iface.findtext('description')
+        for unit in iface.findall('.//unit'):
+            units[(name, unit.findtext('name'))] = (unit.findtext('description'),) + unit_vlans(unit)
+    return ifd_descriptions, units
+
+def resolve_interface(entry: Dict[str, Any], interface_index: InterfaceIndex, ifd: str, unit_id: str):
+    """Fill an L2VPN entry's descriptions and VLAN tags from the interface index"""
+    ifd_descriptions, units = interface_index
+    if ifd in ifd_descriptions:
+        entry['IFD description'] = ifd_descriptions[ifd]
+    unit = units.get((ifd, unit_id))
+    if unit is not None:
+        entry['Unit Description'], entry['outer-vlan'], entry['inner-vlan'] = unit
+
+def _command(m, deadline: _Deadline, command: str):
+    """Parsed rpc-reply of a command, namespaces stripped, with find/findall/findtext
+
+    Junos replies come back as an NCElement, which already holds ncclient's
+    namespace-stripped tree of the reply; it is searched in place rather than
+    re-serialized with str() and parsed again. Other replies are parsed from
+    their text.
+    """
+    m.timeout = deadline.remaining()
+    reply = m.command(command, format='xml')
+    if hasattr(reply, 'findall'):
+        return reply
+    return ET.fromstring(str(reply))
+
+def discover_device(host: str, port: int, username: str, password: str,
+                    timeout: float = None) -> Dict[str, Any]:
+    """Hardware record and L2VPN connections of one router over NETCONF (blocking)
+
+    Returns:
+        {"hardware": {...}, "l2vpn": [entry, ...]}
+    """
+    deadline = _Deadline(timeout or RD_DISCOVERY_DEVICE_TIMEOUT)
+    l2vpn_data = []
+    # (hostname, instance-name) -> connections, for the route target join
+    connections: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    interface_index = None
+
+    # A pooled session skips the SSH handshake when the router was discovered recently
+    with get_netconf_pool().session(host, port, username, password, timeout=deadline.remaining()) as m:
+
+        # --- Hardware Info ---
+        version_root = _command(m, deadline, 'show version | display xml')
+
+        hostname = version_root.findtext('.//host-name')
+        product_model = version_root.findtext('.//product-model')
+        junos_version = version_root.findtext('.//junos-version')
+
+        interface_root = _command(m, deadline, 'show configuration interfaces lo0.0 family inet |display xml')
+
+        lo0_ip = None
+        for af in interface_root.findall('.//family'):
+            lo0_ip = af.findtext('.//name')
+            break
+
+        hardware = {
+            'hostname': hostname,
+            'product-model': product_model,
+            'junos-version': junos_version,
+            'lo0.0 inet ip': lo0_ip
+        }
+        logger.debug(f"{hostname}: lo0 IP {lo0_ip}")
+
+        # --- L2VPN Info ---
+        l2vpn_root = _command(m, deadline, 'show l2vpn connection | display xml')
+
+        for conn in l2vpn_root.findall('.//instance'):
+            instance_name = conn.findtext('.//instance-name')
+            local_site = conn.findtext('.//local-site-id')
+
+            for rpe in conn.findall('.//connection'):
+                remote_pe = rpe.findtext('remote-pe')
+                conn_status = rpe.findtext('connection-status')
+                interface_name = rpe.findtext('.//local-interface/interface-name')
+                interface_status = rpe.findtext('.//local-interface/interface-status')
+
+                entry = {
+                    'hostname': hostname,
+                    'instance-name': instance_name,
+                    'Instance Type': None,
+                    'local-site': local_site,
+                    'connection-status': conn_status,
+                    'remote-pe': remote_pe,
+                    'interface-name': interface_name,
+                    'interface id': None,
+                    'unit id': None,
+                    'IFD description': None,
+                    'Unit Description': None,
+                    'interface-status': interface_status,
+                    'Route Target': None,
+                    'outer-vlan': None,
+                    'inner-vlan': None
+                }
+
+                # --- VLAN Parsing ---
+                try:
+                    if conn_status == "Up":
+                        ifd, unit_id = interface_name.split('.')
+                        entry['interface id'] = ifd
+                        entry['unit id'] = unit_id
+                        if interface_index is None:
+                            # One config RPC per device, however many connections are Up
+                            interface_index = index_interface_config(
+                                _command(m, deadline, INTERFACE_CONFIG_COMMAND).findall('.//interface'))
+                        resolve_interface(entry, interface_index, ifd, unit_id)
+                    else:
+                        entry['outer-vlan'] = 'None'
+                        entry['inner-vlan'] = 'None'
+
+                except TimeoutError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"{hostname}: error parsing VLAN config for {interface_name}: {e}")
+                    entry['outer-vlan'] = entry['inner-vlan'] = 'parse error'
+
+                l2vpn_data.append(entry)
+                connections.setdefault((hostname, instance_name), []).append(entry)
+
+        # --- Routing Instances for Route Target ---
+        routing_root = _command(m, deadline, 'show configuration routing-instances | display xml |display inheritance no-comments')
+
+        for instance in routing_root.findall('.//instance'):
+            name = instance.findtext('name')
+            community = instance.findtext('.//community')
+            instance_type = instance.findtext('instance-type')
+            for entry in connections.get((hostname, name), ()):
+                entry['Route Target'] = community
+                entry['Instance Type'] = instance_type
+
+    return {'hardware': hardware, 'l2vpn': l2vpn_data}
+
+
+async def iter_discovered(routers: List[Dict[str, Any]], username: str, password: str,
+                          concurrency: int = None, per_host_limit: int = None,
+                          device_timeout: float = None, retries: int = None,
+                          retry_backoff: float = None) -> AsyncIterator[Dict[str, Any]]:
+    """Discover routers over a bounded worker pool, yielding records as they are ready
+
+    At most `concurrency` routers are in flight overall and `per_host_limit`
+    through any one SSH host; each router gets `device_timeout` seconds. A failed
+    router is tried up to `retries` more times with exponential backoff, without
+    holding a slot while it waits. Each router is yielded as soon as it finishes,
+    so records come out in completion order (their index gives the router-list
+    order) and none is held on to behind a slower router.
+
+    Yields:
+        One record per router: {"index", "host", "port", "status": "ok" | "failed",
+        "result" or "error", "attempts", "elapsed_seconds"}
+    """
+    concurrency = concurrency or RD_DISCOVERY_CONCURRENCY
+    per_host_limit = per_host_limit or RD_DISCOVERY_PER_HOST_LIMIT
+    device_timeout = device_timeout or RD_DISCOVERY_DEVICE_TIMEOUT
+    retries = RD_DISCOVERY_RETRIES if retries is None else retries
+    retry_backoff = RD_DISCOVERY_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+    global_limit = asyncio.Semaphore(concurrency)
+    host_limits = {router['host']: asyncio.Semaphore(per_host_limit) for router in routers}
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="discovery")
+    done = 0
+
+    async def attempt(router: Dict[str, Any]) -> Dict[str, Any]:
+        # Host slot first, so routers behind a saturated host don't hold global slots
+        async with host_limits[router['host']], global_limit:
+            try:
+                # The device deadline bounds the RPCs; the extra second covers the teardown
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, discover_device, router['host'], router['port'],
+                                         username, password, device_timeout),
+                    device_timeout + 1)
+                return {'status': 'ok', 'result': result}
+            except asyncio.TimeoutError:
+                return {'status': 'failed', 'error': f"Timed out after {device_timeout:.0f}s"}
+            except Exception as e:
+                return {'status': 'failed', 'error': str(e) or type(e).__name__}
+
+    async def run_router(router: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal done
+        record = {'index': router['index'], 'host': router['host'], 'port': router['port']}
+        started = time.monotonic()
+        for retry in range(retries + 1):
+            if retry:
+                delay = retry_backoff * 2 ** (retry - 1) * random.uniform(0.5, 1.0)
+                logger.info(f"Retrying {router['host']}:{router['port']} in {delay:.1f}s "
+                            f"({record['error']})")
+                await asyncio.sleep(delay)
+            record.update(await attempt(router))
+            if record['status'] == 'ok':
+                record.pop('error', None)
+                break
+        record['attempts'] = router.get('attempts', 0) + retry + 1
+        record['elapsed_seconds'] = round(time.monotonic() - started, 2)
+        done += 1
+        if record['status'] == 'ok':
+            logger.info(f"Discovered {record['result']['hardware']['hostname']} at {router['host']}:{router['port']} "
+                        f"({done}/{len(routers)})")
+        else:
+            logger.warning(f"Failed to discover {router['host']}:{router['port']}: {record['error']} "
+                           f"({done}/{len(routers)})")
+        finished.put_nowait(record)
+
+    finished: asyncio.Queue = asyncio.Queue()
+    tasks = set()
+    for router in routers:
+        task = asyncio.ensure_future(run_router(router))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    try:
+        for _ in range(len(routers)):
+            yield await finished.get()
+    finally:
+        for task in list(tasks):
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+async def discover_devices(routers: List[Dict[str, Any]], username: str, password: str,
+                           concurrency: int = None, per_host_limit: int = None,
+                           device_timeout: float = None, retries: int = None) -> List[Dict[str, Any]]:
+    """All records of iter_discovered, in router-list order"""
+    records = [record async for record in iter_discovered(routers, username, password, concurrency=concurrency,
+                                                           per_host_limit=per_host_limit,
+                                                           device_timeout=device_timeout, retries=retries)]
+    return sorted(records, key=lambda record: record['index'])
+
+
+async def discover_l2vpn_bgp_signaling_services(router_list_filepath: str, output_filepath: str,
+                                                username: str, password: str, host: str,
+                                                concurrency: int = None, per_host_limit: int = None,
+                                                device_timeout: float = None,
+                                                output_format: str = None, run_id: str = None,
+                                                retries: int = None) -> Dict[str, Any]:
+    """Discover L2VPN BGP signaling services from Juniper routers
+
+    Rows are streamed per router to a Hardware and an L2VPN file (CSV, JSONL or
+    Parquet) as discovery goes, so memory stays flat and a run that dies part way
+    keeps what it found. An Excel output path is produced from those files once
+    discovery is done.
+
+    Each run has an ID and a checkpoint journal (<name>.checkpoint.jsonl) of the
+    routers that succeeded or failed. Calling again with the same run_id and
+    output file skips the routers already discovered and retries only the failed
+    ones; their rows are appended after the earlier ones.
+
+    Args:
+        router_list_filepath: Excel router list with a 'Port' column (and optionally 'Host')
+        output_filepath: output file; .xlsx for an Excel workbook, or .csv / .jsonl / .parquet
+            for the streamed files only (<name>.hardware.<format> and <name>.l2vpn.<format>)
+        username / password: SSH credentials
+        host: SSH host of routers without a 'Host' value
+        concurrency / per_host_limit / device_timeout: worker pool bounds, defaults from .env
+        output_format: format of the streamed files, defaults to the output file's
+            suffix or RD_DISCOVERY_OUTPUT_FORMAT
+        run_id: ID of an earlier run to resume (an error if the output's checkpoint belongs
+            to another run); a new run is started if omitted
+        retries: further attempts at a failed router, defaults to RD_DISCOVERY_RETRIES
+
+    Returns:
+        dict: Summary of discovery results
+    """
+    routers = load_router_list(router_list_filepath, host)
+    started = time.monotonic()
+    resume_run = run_id is not None
+    run_id = run_id or uuid.uuid4().hex[:12]
+
+    output_base, output_format, excel_filepath = discovery_writer.resolve_output(output_filepath, output_format)
+    try:
+        checkpoint = DiscoveryCheckpoint(f"{output_base}.checkpoint.jsonl", run_id, output_format, resume=resume_run)
+    except Exception as e:
+        raise Exception(f"Error opening discovery checkpoint: {str(e)}")
+    pending = []
+    for router in routers:
+        if not checkpoint.completed(router):
+            router['attempts'] = checkpoint.attempts(router)
+            pending.append(router)
+    if checkpoint.resumed:
+        logger.info(f"Resuming discovery run {run_id}: {len(routers) - len(pending)} routers already discovered, "
+                    f"{len(pending)} to go...")
+    else:
+        logger.info(f"Starting discovery run {run_id} for {len(routers)} routers...")
+
+    # A run that completed no router has nothing worth keeping in its files
+    resume = (checkpoint.positions or {}) if checkpoint.resumed and any(
+        event['status'] == 'ok' for event in checkpoint.routers.values()) else None
+    try:
+        writer = discovery_writer.open_writer(output_base, output_format, resume)
+    except Exception as e:
+        checkpoint.close()
+        raise Exception(f"Error writing output file: {str(e)}")
+
+    # Routers whose rows are only on disk once the writer is closed (Parquet)
+    unflushed = []
+    try:
+        async for record in iter_discovered(pending, username, password, concurrency=concurrency,
+                                            per_host_limit=per_host_limit, device_timeout=device_timeout,
+                                            retries=retries):
+            if record['status'] == 'ok':
+                result = record['result']
+                writer.write_device(result, record['index'])
+                outcome = dict(status='ok', attempts=record['attempts'],
+                               rows={'Hardware': 1, 'L2VPN': len(result['l2vpn'])})
+                if writer.durable_flush:
+                    checkpoint.record(record, positions=writer.positions(), **outcome)
+                else:
+                    unflushed.append((record, outcome))
+            else:
+                checkpoint.record(record, 'failed', record['attempts'], error=record['error'])
+    finally:
+        try:
+            writer.close()
+            for record, outcome in unflushed:
+                checkpoint.record(record, **outcome)
+        finally:
+            checkpoint.close()
+    logger.info(f"Data has been written to {', '.join(writer.paths.values())}")
+
+    if excel_filepath:
+        try:
+            discovery_writer.convert_to_excel(writer.paths, output_format, excel_filepath)
+        except Exception as e:
+            raise Exception(f"Error writing output file: {str(e)}")
+
+    records = {'Hardware': 0, 'L2VPN': 0}
+    connection_errors = []
+    for router in routers:
+        event = checkpoint.routers.get(checkpoint.key(router), {})
+        if event.get('status') == 'ok':
+            for table, rows in event['rows'].items():
+                records[table] += rows
+        else:
+            connection_errors.append(f"Failed to connect to {router['host']}:{router['port']}: {event.get('error')}")
+    successful_connections = len(routers) - len(connection_errors)
+
+    # Return summary
+    return {
+        'run_id': run_id,
+        'total_routers': len(routers),
+        'successful_connections': successful_connections,
+        'failed_connections': len(connection_errors),
+        'resumed_routers': len(routers) - len(pending),
+        'hardware_records': records['Hardware'],
+        'l2vpn_records': records['L2VPN'],
+        'output_file': output_filepath,
+        'streamed_files': writer.paths,
+        'checkpoint_file': checkpoint.path,
+        'connection_errors': connection_errors,
+        'elapsed_seconds': round(time.monotonic() - started, 2)
+    }
@@ -0,0 +1,302 @@
+import os
+import csv
+import json
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+from rd_client import env_int
+
+logger = logging.getLogger(__name__)
+
+# Format discovery streams into when the requested output is an Excel workbook
+RD_DISCOVERY_OUTPUT_FORMAT = os.getenv('RD_DISCOVERY_OUTPUT_FORMAT', 'csv').lower()
+# Rows buffered per Parquet row group (Parquet files are only readable once closed)
+RD_DISCOVERY_PARQUET_ROW_GROUP = env_int('RD_DISCOVERY_PARQUET_ROW_GROUP', 10000)
+
+# Sheet name -> columns, in the order of the discovery records
+TABLES = {
+    'Hardware': ['hostname', 'product-model', 'junos-version', 'lo0.0 inet ip'],
+    'L2VPN': ['hostname', 'instance-name', 'Instance Type', 'local-site', 'connection-status', 'remote-pe',
+              'interface-name', 'interface id', 'unit id', 'IFD description', 'Unit Description',
+              'interface-status', 'Route Target', 'outer-vlan', 'inner-vlan'],
+}
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm')
+# Leading column of the streamed files: router-list index of the router a row came from.
+# Routers are written as they finish, so the workbook is put back in router-list order by it.
+INDEX_COLUMN = 'index'
+
+
+def table_paths(output_base: str, output_format: str) -> Dict[str, str]:
+    """Table -> streamed file, e.g. discovery.hardware.csv and discovery.l2vpn.csv"""
+    base = Path(output_base)
+    return {table: str(base.with_name(f"{base.name}.{table.lower()}.{output_format}")) for table in TABLES}
+
+
+class DiscoveryWriter:
+    """Streams discovery rows to one file per table as routers complete
+
+    Rows of a router are flushed together, so a run that dies part way keeps
+    every router written before it. Each row is tagged with its router's index.
+
+    Args:
+        output_base: base path of the table files
+        resume: for a resumed run, the positions() recorded after the last
+            router it completed (rows written past them are dropped); None
+            starts the files afresh
+    """
+    format = None
+    # Whether rows are on disk as soon as flush() returns
+    durable_flush = True
+
+    def __init__(self, output_base: str, resume: Optional[Dict[str, int]] = None):
+        Path(output_base).parent.mkdir(parents=True, exist_ok=True)
+        self.paths = table_paths(output_base, self.format)
+        self.rows = {table: 0 for table in TABLES}
+
+    def write_device(self, result: Dict[str, Any], index: int):
+        """Write the discover_device result of the router at index and flush it"""
+        self.write_rows('Hardware', index, [result['hardware']])
+        self.write_rows('L2VPN', index, result['l2vpn'])
+        self.flush()
+
+    def write_rows(self, table: str, index: int, rows: List[Dict[str, Any]]):
+        self._write(table, index, rows)
+        self.rows[table] += len(rows)
+
+    def _write(self, table: str, index: int, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def positions(self) -> Optional[Dict[str, int]]:
+        """Where each table file ends now, to resume from (None if not resumable by offset)"""
+        return None
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _TextWriter(DiscoveryWriter):
+    """Line-based table files, resumed by truncating to the recorded offsets"""
+
+    def __init__(self, output_base: str, resume: Optional[Dict[str, int]] = None):
+        super().__init__(output_base, resume)
+        self._files = {}
+        self._fresh = set()
+        for table, path in self.paths.items():
+            offset = (resume or {}).get(table)
+            if offset is not None and os.path.exists(path):
+                os.truncate(path, offset)
+                self._files[table] = open(path, 'a', newline='', encoding='utf-8')
+            else:
+                self._files[table] = open(path, 'w', newline='', encoding='utf-8')
+                self._fresh.add(table)
+
+    def positions(self) -> Dict[str, int]:
+        return {table: file.tell() for table, file in self._files.items()}
+
+    def flush(self):
+        for file in self._files.values():
+            file.flush()
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+
+
+class CsvWriter(_TextWriter):
+    format = 'csv'
+
+    def __init__(self, output_base: str, resume: Optional[Dict[str, int]] = None):
+        super().__init__(output_base, resume)
+        self._writers = {table: csv.writer(file) for table, file in self._files.items()}
+        for table in self._fresh:
+            self._writers[table].writerow([INDEX_COLUMN] + TABLES[table])
+
+    def _write(self, table: str, index: int, rows: List[Dict[str, Any]]):
+        columns = TABLES[table]
+        self._writers[table].writerows([index] + [row.get(column) for column in columns] for row in rows)
+
+
+class JsonlWriter(_TextWriter):
+    format = 'jsonl'
+
+    def _write(self, table: str, index: int, rows: List[Dict[str, Any]]):
+        columns = TABLES[table]
+        file = self._files[table]
+        for row in rows:
+            record = {INDEX_COLUMN: index}
+            record.update((column, row.get(column)) for column in columns)
+            file.write(json.dumps(record) + '\n')
+
+
+class ParquetWriter(DiscoveryWriter):
+    """Parquet sink (needs pyarrow); rows are written a row group at a time
+
+    The files are written under a .partial name and moved into place on close,
+    so an interrupted run leaves the previous files intact. A resumed run copies
+    their rows over first.
+    """
+    format = 'parquet'
+    durable_flush = False
+
+    def __init__(self, output_base: str, resume: Optional[Dict[str, int]] = None, row_group_size: int = None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs the optional 'pyarrow' package (pip install pyarrow)")
+        super().__init__(output_base, resume)
+        self._pa = pa
+        self._schemas = {table: pa.schema([(INDEX_COLUMN, pa.int64())] + [(column, pa.string()) for column in columns])
+                         for table, columns in TABLES.items()}
+        self._writers = {table: pq.ParquetWriter(path + '.partial', self._schemas[table])
+                         for table, path in self.paths.items()}
+        self._buffers = {table: [] for table in TABLES}
+        self.row_group_size = row_group_size or RD_DISCOVERY_PARQUET_ROW_GROUP
+        if resume is not None:
+            for table, path in self.paths.items():
+                if os.path.exists(path):
+                    for batch in pq.ParquetFile(path).iter_batches():
+                        self._writers[table].write_table(pa.Table.from_batches([batch], schema=self._schemas[table]))
+
+    def _write(self, table: str, index: int, rows: List[Dict[str, Any]]):
+        self._buffers[table].extend((index, row) for row in rows)
+        if len(self._buffers[table]) >= self.row_group_size:
+            self._write_row_group(table)
+
+    def _write_row_group(self, table: str):
+        rows = self._buffers[table]
+        if rows:
+            columns = {INDEX_COLUMN: [index for index, _ in rows]}
+            columns.update((column, [row.get(column) for _, row in rows]) for column in TABLES[table])
+            self._writers[table].write_table(self._pa.Table.from_pydict(columns, schema=self._schemas[table]))
+            self._buffers[table] = []
+
+    def close(self):
+        for table, writer in self._writers.items():
+            self._write_row_group(table)
+            writer.close()
+            os.replace(self.paths[table] + '.partial', self.paths[table])
+
+
+WRITERS = {writer.format: writer for writer in (CsvWriter, JsonlWriter, ParquetWriter)}
+
+
+def resolve_output(output_filepath: str, output_format: Optional[str] = None):
+    """(base path of the streamed files, stream format, Excel workbook to convert to or None)
+
+    An Excel output path streams in output_format (RD_DISCOVERY_OUTPUT_FORMAT by
+    default) next to the workbook; a .csv/.jsonl/.parquet path picks that format.
+    """
+    path = Path(output_filepath)
+    suffix = path.suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        return str(path.with_suffix('')), (output_format or RD_DISCOVERY_OUTPUT_FORMAT).lower(), str(path)
+    if suffix.lstrip('.') in WRITERS:
+        return str(path.with_suffix('')), (output_format or suffix.lstrip('.')).lower(), None
+    return str(path), (output_format or RD_DISCOVERY_OUTPUT_FORMAT).lower(), None
+
+def open_writer(output_base: str, output_format: str, resume: Optional[Dict[str, int]] = None) -> DiscoveryWriter:
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown discovery output format '{output_format}', expected one of {', '.join(WRITERS)}")
+    return WRITERS[output_format](output_base, resume)
+
+
+def read_rows(path: str, output_format: str) -> Iterator[Dict[str, Any]]:
+    """Rows of a streamed table file, with empty CSV cells as None"""
+    if output_format == 'csv':
+        with open(path, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                yield {column: value if value != '' else None for column, value in row.items()}
+    elif output_format == 'jsonl':
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    elif output_format == 'parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches():
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unknown discovery output format '{output_format}'")
+
+def _router_index(row: Dict[str, Any]) -> Optional[int]:
+    index = row.get(INDEX_COLUMN)
+    return int(index) if index is not None else None
+
+def rows_in_router_order(path: str, output_format: str) -> Iterator[Dict[str, Any]]:
+    """Rows of a streamed table file, ordered by router index and in file order within a router
+
+    A first pass counts the rows of each router. The second pass holds back only
+    the routers that were written ahead of an earlier one, and releases each as
+    soon as every router before it is complete. Files without the index column
+    come out in file order.
+    """
+    counts: Dict[int, int] = {}
+    for row in read_rows(path, output_format):
+        index = _router_index(row)
+        if index is None:
+            yield from read_rows(path, output_format)
+            return
+        counts[index] = counts.get(index, 0) + 1
+
+    order = iter(sorted(counts))
+    expected = next(order, None)
+    # Rows of the expected router passed through so far
+    released = 0
+    # router index -> rows of routers written ahead of the expected one
+    held: Dict[int, List[Dict[str, Any]]] = {}
+    for row in read_rows(path, output_format):
+        index = _router_index(row)
+        if index != expected:
+            held.setdefault(index, []).append(row)
+            continue
+        yield row
+        released += 1
+        while expected is not None and released == counts[expected]:
+            expected = next(order, None)
+            rows = held.pop(expected, [])
+            yield from rows
+            released = len(rows)
+    for index in sorted(held):
+        yield from held[index]
+
+def convert_to_excel(paths: Dict[str, str], output_format: str, excel_filepath: str) -> str:
+    """Write streamed discovery tables to an Excel workbook, one sheet per table, in router-list order
+
+    The workbook is written row by row (openpyxl write-only mode), so memory only
+    grows with the rows of routers that finished ahead of an earlier one.
+    """
+    from openpyxl import Workbook
+
+    Path(excel_filepath).parent.mkdir(parents=True, exist_ok=True)
+    workbook = Workbook(write_only=True)
+    for table, columns in TABLES.items():
+        sheet = workbook.create_sheet(table)
+        sheet.append(columns)
+        for row in rows_in_router_order(paths[table], output_format):
+            sheet.append([row.get(column) for column in columns])
+    workbook.save(excel_filepath)
+    logger.info(f"Data has been written to {excel_filepath}")
+    return excel_filepath
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert streamed brownfield discovery output to an Excel workbook")
+    parser.add_argument("output_base", help="Base path of the streamed files, e.g. discovery for discovery.hardware.csv")
+    parser.add_argument("excel_file", help="Excel workbook to write")
+    parser.add_argument("--format", default=RD_DISCOVERY_OUTPUT_FORMAT, choices=list(WRITERS), help="Format of the streamed files")
+    args = parser.parse_args()
+
+    paths = table_paths(args.output_base, args.format)
+    print(f"Wrote {convert_to_excel(paths, args.format, args.excel_file)}")
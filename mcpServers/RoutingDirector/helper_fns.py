@@ -1,5 +1,7 @@
 import re, json
+import csv
 import logging
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
  
@@ -65,6 +67,44 @@ def clean_string(input_string: str, fallback: str = "unknown") -> str:
     
     return cleaned
 
+def read_service_manifest(filepath: str) -> list:
+    """
+    Read a bulk service manifest, one service per CSV row or JSONL line
+    
+    Args:
+        filepath: .csv, .jsonl/.ndjson or .json (list of objects) file
+        
+    Returns:
+        List of row dictionaries. In CSV files multi-valued fields such as hostnames
+        are separated with ';' (e.g. "r1;r2"), in JSON they can be lists.
+    """
+    path = Path(filepath)
+    suffix = path.suffix.lower()
+
+    if suffix == ".csv":
+        with open(path, newline='') as f:
+            return [
+                {key.strip(): value.strip() if isinstance(value, str) else value for key, value in row.items() if key}
+                for row in csv.DictReader(f)
+            ]
+    elif suffix in (".jsonl", ".ndjson"):
+        with open(path, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    elif suffix == ".json":
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else [data]
+    else:
+        raise ValueError(f"Unsupported manifest format '{suffix}', use .csv, .jsonl or .json")
+
+def split_manifest_field(value) -> list:
+    """Split a manifest field into its values: lists pass through, strings split on ';'"""
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [part.strip() for part in str(value).split(';') if part.strip()]
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
\ No newline at end of file
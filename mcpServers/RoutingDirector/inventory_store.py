@@ -0,0 +1,295 @@
+import os
+import json
+import hashlib
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+from inventory_sync import DELTA, FULL_PAGE, FULL_DONE
+
+logger = logging.getLogger(__name__)
+
+RD_INVENTORY_DB = os.getenv('RD_INVENTORY_DB',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rd_inventory.db'))
+
+# Bumped when a table changes shape; an older database is dropped and fully resynced
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    instance_id TEXT PRIMARY KEY,
+    instance_uuid TEXT,
+    customer_id TEXT,
+    design_id TEXT,
+    instance_status TEXT,
+    digest BLOB NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_instances_design ON instances (design_id, customer_id, instance_id);
+CREATE INDEX IF NOT EXISTS idx_instances_customer ON instances (customer_id, instance_id);
+CREATE INDEX IF NOT EXISTS idx_instances_status ON instances (instance_status, instance_id);
+
+CREATE TABLE IF NOT EXISTS instance_devices (
+    instance_id TEXT NOT NULL,
+    ne_id TEXT NOT NULL,
+    PRIMARY KEY (ne_id, instance_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_instance_devices_instance ON instance_devices (instance_id);
+
+-- A full resync is written here page by page and swapped in once complete
+CREATE TABLE IF NOT EXISTS staged_instances (
+    instance_id TEXT PRIMARY KEY,
+    instance_uuid TEXT,
+    customer_id TEXT,
+    design_id TEXT,
+    instance_status TEXT,
+    digest BLOB NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS staged_instance_devices (
+    instance_id TEXT NOT NULL,
+    ne_id TEXT NOT NULL,
+    PRIMARY KEY (ne_id, instance_id)
+) WITHOUT ROWID;
+
+-- Customers, devices and sites are looked up in reference_data's in-memory indexes;
+-- drop the copies older versions of this store kept
+DROP TABLE IF EXISTS customers;
+DROP TABLE IF EXISTS devices;
+DROP TABLE IF EXISTS sites;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Tables of older schema versions, recreated empty on upgrade
+VERSIONED_TABLES = ("instances", "instance_devices", "staged_instances", "staged_instance_devices", "sync_state")
+
+# Predicate field -> SQL column of the instances table
+INSTANCE_COLUMNS = {
+    "instance_id": "instance_id",
+    "customer_id": "customer_id",
+    "design_id": "design_id",
+    "instance_status": "instance_status",
+}
+
+
+def document_digest(document: str) -> bytes:
+    """Digest of a raw instance document, computed once when it is written"""
+    return hashlib.blake2b(document.encode(), digest_size=16).digest()
+
+def instance_devices(instance: Dict[str, Any]) -> List[str]:
+    """Lower-cased ne_id of every vpn_node in an instance (l2vpn_ntw or l3vpn_ntw)"""
+    devices = set()
+    for network_key in ('l2vpn_ntw', 'l3vpn_ntw'):
+        network = instance.get(network_key) or {}
+        for vpn_service in (network.get('vpn_services') or {}).get('vpn_service', []) or []:
+            for node in (vpn_service.get('vpn_nodes') or {}).get('vpn_node', []) or []:
+                ne_id = node.get('ne_id')
+                if ne_id:
+                    devices.add(str(ne_id).lower())
+    return sorted(devices)
+
+
+class InventoryStore:
+    """Persistent SQLite copy of the RD inventory for indexed local queries
+
+    Instances, with the devices each one touches, are written by the sync layer and
+    read back with indexed queries instead of going to Routing Director. The database runs in WAL mode so reads never wait on a
+    sync that is writing. A full resync is staged page by page and replaces the
+    instances in one transaction, so queries never see a half-written inventory.
+    The sync high-water mark is saved in the same transaction as the instances it
+    covers, so a restart resumes incrementally.
+
+    Every call blocks on SQLite; callers on the event loop run them with asyncio.to_thread.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or RD_INVENTORY_DB
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # Whether this process has started staging a full resync
+        self._staging = False
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The database connection, opened on first use so importing the server creates no file"""
+        if self._connection is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Without a sync state the next sync is a full one, which refills the new tables
+                conn.executescript("".join(f"DROP TABLE IF EXISTS {table};" for table in VERSIONED_TABLES))
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+            self._connection = conn
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _write(self, statements: Iterable[Tuple[str, Any]]):
+        """Run (sql, args) statements in one transaction; list args mean executemany"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                for sql, args in statements:
+                    if isinstance(args, list):
+                        cursor.executemany(sql, args)
+                    else:
+                        cursor.execute(sql, args)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    # ---- instances ----
+
+    def apply_instances(self, upserts: List[Dict[str, Any]], removed: List[str], kind: str,
+                        high_water_mark: Any = None, timestamp_field: Optional[str] = None):
+        """Apply an InventorySync listener call: a DELTA upserts changed instances and
+        deletes removed ones, FULL_PAGEs are staged and FULL_DONE swaps them in"""
+        rows, device_rows = [], []
+        for instance in upserts:
+            instance_name = instance.get('instance_id')
+            if not instance_name:
+                continue
+            document = json.dumps(instance)
+            rows.append((instance_name, instance.get('instance_uuid'), instance.get('customer_id'),
+                         instance.get('design_id'), instance.get('instance_status'), document_digest(document),
+                         document))
+            device_rows.extend((instance_name, ne_id) for ne_id in instance_devices(instance))
+
+        if kind == FULL_PAGE:
+            statements = []
+            if not self._staging:
+                # Whatever an interrupted resync left behind is not part of this one
+                statements += [("DELETE FROM staged_instances", ()), ("DELETE FROM staged_instance_devices", ())]
+                self._staging = True
+            statements += [
+                ("INSERT OR REPLACE INTO staged_instances (instance_id, instance_uuid, customer_id, design_id, "
+                 "instance_status, digest, data) VALUES (?, ?, ?, ?, ?, ?, ?)", rows),
+                ("INSERT OR IGNORE INTO staged_instance_devices (instance_id, ne_id) VALUES (?, ?)", device_rows),
+            ]
+            self._write(statements)
+            return
+
+        statements = []
+        if kind == FULL_DONE:
+            if not self._staging:
+                # RD returned no instances at all
+                statements += [("DELETE FROM staged_instances", ()), ("DELETE FROM staged_instance_devices", ())]
+            statements += [
+                ("DELETE FROM instances", ()), ("DELETE FROM instance_devices", ()),
+                ("INSERT INTO instances (instance_id, instance_uuid, customer_id, design_id, instance_status, "
+                 "digest, data) SELECT instance_id, instance_uuid, customer_id, design_id, instance_status, "
+                 "digest, data "
+                 "FROM staged_instances ORDER BY rowid", ()),
+                ("INSERT INTO instance_devices (instance_id, ne_id) "
+                 "SELECT instance_id, ne_id FROM staged_instance_devices", ()),
+                ("DELETE FROM staged_instances", ()), ("DELETE FROM staged_instance_devices", ()),
+            ]
+        elif kind == DELTA:
+            stale = [(row[0],) for row in rows] + [(instance_name,) for instance_name in removed]
+            statements += [
+                ("DELETE FROM instances WHERE instance_id = ?", stale),
+                ("DELETE FROM instance_devices WHERE instance_id = ?", stale),
+                ("INSERT OR REPLACE INTO instances (instance_id, instance_uuid, customer_id, design_id, "
+                 "instance_status, digest, data) VALUES (?, ?, ?, ?, ?, ?, ?)", rows),
+                ("INSERT OR IGNORE INTO instance_devices (instance_id, ne_id) VALUES (?, ?)", device_rows),
+            ]
+        else:
+            raise ValueError(f"Unknown inventory change {kind}")
+
+        state = {"high_water_mark": json.dumps(high_water_mark), "timestamp_field": timestamp_field}
+        if kind == FULL_DONE:
+            state["full_synced_at"] = repr(time.time())
+        statements.append(("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", list(state.items())))
+        self._write(statements)
+        if kind == FULL_DONE:
+            self._staging = False
+            # Refresh planner statistics so it picks the most selective index
+            with self._lock:
+                self._conn.execute("PRAGMA optimize")
+
+    def query_instances(self, predicates: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Instances matching predicates, answered from the indexes
+
+        Args:
+            predicates: instance_id / customer_id / design_id / instance_status / ne_id
+                -> value or list of values; None values are ignored
+        """
+        return [json.loads(document) for _, document in self.query_documents(predicates)]
+
+    def query_documents(self, predicates: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str]]:
+        """(instance_id, raw JSON document) of the instances matching predicates"""
+        return self._select("instance_id, data", predicates)
+
+    def query_digests(self, predicates: Optional[Dict[str, Any]] = None) -> List[Tuple[str, bytes]]:
+        """(instance_id, document digest) of the instances matching predicates, for callers
+        that reuse work done on an unchanged document and load only the changed ones"""
+        return self._select("instance_id, digest", predicates)
+
+    def _select(self, columns: str, predicates: Optional[Dict[str, Any]]) -> List[tuple]:
+        clauses, args = [], []
+        for field, value in (predicates or {}).items():
+            if value is None:
+                continue
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if field == "ne_id":
+                column = "instance_id IN (SELECT instance_id FROM instance_devices WHERE ne_id"
+                values = [str(v).lower() for v in values]
+                suffix = ")"
+            elif field in INSTANCE_COLUMNS:
+                column, suffix = INSTANCE_COLUMNS[field], ""
+            else:
+                raise ValueError(f"Unsupported inventory predicate {field}")
+            if len(values) == 1:
+                clauses.append(f"{column} = ?{suffix}")
+            else:
+                clauses.append(f"{column} IN ({','.join('?' * len(values))}){suffix}")
+            args.extend(values)
+
+        sql = f"SELECT {columns} FROM instances"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        # Keep the order RD listed the instances in
+        sql += " ORDER BY rowid"
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def get_documents(self, instance_names: List[str], batch_size: int = 500) -> Dict[str, str]:
+        """instance_id -> raw JSON document of the stored instances among instance_names"""
+        documents = {}
+        with self._lock:
+            for start in range(0, len(instance_names), batch_size):
+                batch = instance_names[start:start + batch_size]
+                documents.update(self._conn.execute(
+                    f"SELECT instance_id, data FROM instances WHERE instance_id IN ({','.join('?' * len(batch))})",
+                    batch).fetchall())
+        return documents
+
+    def lookup_instance(self, instance_name: str) -> Optional[Tuple[str, str]]:
+        """(customer_id, instance_uuid) of an instance, or None if it is not stored"""
+        with self._lock:
+            row = self._conn.execute("SELECT customer_id, instance_uuid FROM instances WHERE instance_id = ?",
+                                     (instance_name,)).fetchone()
+        return tuple(row) if row else None
+
+    def load_sync_state(self) -> Optional[Tuple[Any, Optional[str], float]]:
+        """Saved (high-water mark, timestamp field, wall-clock time of the last full sync)
+        to resume a sync from, or None if no full sync has completed yet"""
+        with self._lock:
+            state = dict(self._conn.execute("SELECT key, value FROM sync_state").fetchall())
+        if "full_synced_at" not in state:
+            return None
+        return (json.loads(state.get("high_water_mark") or "null"), state.get("timestamp_field"),
+                float(state["full_synced_at"]))
@@ -0,0 +1,257 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Iterable, Set, Tuple
+from rd_client import env_int, env_float
+from rd_pagination import iter_pages, iter_filtered_pages, filter_supported, Comparison, RDRequestError
+
+logger = logging.getLogger(__name__)
+
+# Seconds between incremental syncs from the orders feed, and between full resyncs
+RD_INVENTORY_SYNC_INTERVAL = env_float('RD_INVENTORY_SYNC_INTERVAL', 30.0)
+RD_INVENTORY_FULL_RESYNC = env_float('RD_INVENTORY_FULL_RESYNC', 3600.0)
+# Instances re-fetched per filtered request when applying a delta
+RD_INVENTORY_FETCH_BATCH = env_int('RD_INVENTORY_FETCH_BATCH', 100)
+# Order timestamp used as the high-water mark; first present field wins when unset
+RD_ORDER_TIMESTAMP_FIELD = os.getenv('RD_ORDER_TIMESTAMP_FIELD')
+ORDER_TIMESTAMP_FIELDS = ("updated_at", "created_at", "order_time", "timestamp")
+
+# What a listener call carries: changed instances, one page of a full resync, or the end of that resync
+DELTA, FULL_PAGE, FULL_DONE = "delta", "full_page", "full_done"
+# listener(upserted instances, removed instance names, DELTA / FULL_PAGE / FULL_DONE); may be a coroutine function
+InventoryListener = Callable[[List[Dict[str, Any]], List[str], str], Any]
+# restore() -> (high-water mark, timestamp field, wall-clock time of last full sync) or None
+InventoryRestore = Callable[[], Optional[Tuple[Any, Optional[str], float]]]
+# (high-water mark as read, its numeric value, keys of the orders seen at exactly that mark)
+MarkState = Tuple[Any, Optional[float], Set[Any]]
+
+
+def _timestamp_value(value: Any) -> Optional[float]:
+    """Comparable form of an order timestamp: epoch numbers or ISO-8601 strings"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class InventorySync:
+    """Keeps listeners' copy of every service instance fresh from the orders feed
+
+    The first use pulls all instances. After that, each sync asks get_orders only
+    for orders at or after the high-water mark (the newest order timestamp seen),
+    re-fetches just the instances those orders touched and hands them to the
+    listeners as a delta; instances RD no longer returns are passed as removed. A
+    full resync still runs every RD_INVENTORY_FULL_RESYNC seconds to correct any
+    drift, its pages going to the listeners as they arrive followed by FULL_DONE.
+    The sync keeps no copy of the instances itself. A restore callable lets the
+    first sync resume from the state a listener persisted.
+    """
+
+    def __init__(self, instances_endpoint: str, orders_endpoint: str,
+                 interval: float = None, full_resync: float = None, restore: InventoryRestore = None):
+        self.instances_endpoint = instances_endpoint
+        self.orders_endpoint = orders_endpoint
+        self.interval = RD_INVENTORY_SYNC_INTERVAL if interval is None else interval
+        self.full_resync = RD_INVENTORY_FULL_RESYNC if full_resync is None else full_resync
+        self.timestamp_field = RD_ORDER_TIMESTAMP_FIELD
+        self.high_water_mark: Any = None
+        self._high_water_value: Optional[float] = None
+        # Orders already applied at exactly the high-water mark
+        self._seen_at_mark: Set[Any] = set()
+        self._loaded = False
+        self._full_synced_at: Optional[float] = None
+        self._synced_at: Optional[float] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._listeners: List[InventoryListener] = []
+        self._restore = restore
+
+    def add_listener(self, listener: InventoryListener):
+        self._listeners.append(listener)
+
+    async def _notify(self, upserts: List[Dict[str, Any]], removed: List[str], kind: str):
+        for listener in self._listeners:
+            try:
+                result = listener(upserts, removed, kind)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Inventory listener {listener} failed: {e}")
+
+    def mark_stale(self):
+        """Run an incremental sync on next use, e.g. after this process submitted an order"""
+        self._synced_at = None
+
+    def _order_timestamp(self, order: Dict[str, Any]) -> Any:
+        if self.timestamp_field is None:
+            for field in ORDER_TIMESTAMP_FIELDS:
+                if order.get(field) is not None:
+                    self.timestamp_field = field
+                    logger.info(f"Using order field {field} as the inventory high-water mark")
+                    break
+            else:
+                return None
+        return order.get(self.timestamp_field)
+
+    @staticmethod
+    def _order_key(order: Dict[str, Any]) -> Any:
+        return order.get('order_id') or order.get('id') or (order.get('instance_id'), order.get('operation'))
+
+    def _pending_orders(self, orders: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], MarkState]:
+        """Orders not applied before, and the mark that covers them; the current mark is left as is"""
+        high_water_mark, high_water_value, seen_at_mark = self.high_water_mark, self._high_water_value, set(self._seen_at_mark)
+        new_orders = []
+        for order in orders:
+            raw = self._order_timestamp(order)
+            value = _timestamp_value(raw)
+            if value is None:
+                # Can't be placed relative to the mark; the periodic full resync covers it
+                continue
+            key = self._order_key(order)
+            if high_water_value is not None:
+                if value < high_water_value:
+                    continue
+                if value == high_water_value and key in seen_at_mark:
+                    continue
+            new_orders.append(order)
+            if high_water_value is None or value > high_water_value:
+                high_water_mark, high_water_value = raw, value
+                seen_at_mark = {key}
+            elif value == high_water_value:
+                seen_at_mark.add(key)
+        return new_orders, (high_water_mark, high_water_value, seen_at_mark)
+
+    def _set_mark(self, mark: MarkState):
+        self.high_water_mark, self._high_water_value, self._seen_at_mark = mark
+
+    async def _read_orders(self) -> List[Dict[str, Any]]:
+        """Orders at or after the high-water mark (all orders when there is none yet)"""
+        orders = []
+        if self.high_water_mark is None or self.timestamp_field is None:
+            async for page in iter_pages(self.orders_endpoint):
+                orders.extend(page)
+        else:
+            predicates = {self.timestamp_field: Comparison("ge", self.high_water_mark)}
+            async for page in iter_filtered_pages(self.orders_endpoint, predicates):
+                orders.extend(page)
+        return orders
+
+    async def _fetch_instances(self, instance_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        instances = {}
+
+        async def fetch(names: List[str]):
+            async for page in iter_filtered_pages(self.instances_endpoint, {"instance_id": names}):
+                for instance in page:
+                    instances[instance.get('instance_id')] = instance
+
+        for start in range(0, len(instance_names), RD_INVENTORY_FETCH_BATCH):
+            if not filter_supported(self.instances_endpoint):
+                # Each batch would page through the whole inventory, match the rest in one pass
+                await fetch(instance_names[start:])
+                break
+            await fetch(instance_names[start:start + RD_INVENTORY_FETCH_BATCH])
+        return instances
+
+    async def _full_sync(self):
+        count = 0
+
+        async def read_instances():
+            nonlocal count
+            async for page in iter_pages(self.instances_endpoint):
+                count += len(page)
+                await self._notify(page, [], FULL_PAGE)
+
+        if self.high_water_mark is None:
+            # Establish the mark alongside the first full pull; the orders seen here
+            # are already reflected in (or older than) the instances being read
+            orders, _ = await asyncio.gather(self._read_orders(), read_instances())
+            self._set_mark(self._pending_orders(orders)[1])
+        else:
+            await read_instances()
+
+        await self._notify([], [], FULL_DONE)
+        self._loaded = True
+        self._full_synced_at = self._synced_at = time.monotonic()
+        logger.info(f"Inventory fully synced with {count} instances, high-water mark {self.high_water_mark}")
+
+    async def _incremental_sync(self):
+        orders, mark = self._pending_orders(await self._read_orders())
+        changed = sorted({order.get('instance_id') for order in orders if order.get('instance_id')})
+        # The mark only moves once the instances it covers are fetched, so a failed
+        # fetch leaves these orders to be picked up by the next sync
+        fetched = await self._fetch_instances(changed) if changed else {}
+        self._set_mark(mark)
+        if changed:
+            removed = await self._apply_delta(changed, fetched)
+            logger.info(f"Inventory delta from {len(orders)} orders: {len(fetched)} updated, {len(removed)} removed")
+        self._synced_at = time.monotonic()
+
+    async def _apply_delta(self, changed: List[str], fetched: Dict[str, Dict[str, Any]]) -> List[str]:
+        removed = [name for name in changed if name not in fetched]
+        await self._notify(list(fetched.values()), removed, DELTA)
+        return removed
+
+    async def refresh_instances(self, instance_names: List[str]):
+        """Re-fetch specific instances, e.g. one looked up that is newer than the last sync"""
+        instance_names = list(instance_names)
+        await self._apply_delta(instance_names, await self._fetch_instances(instance_names))
+
+    async def _restore_snapshot(self):
+        try:
+            saved = await asyncio.to_thread(self._restore)
+        except Exception as e:
+            logger.error(f"Restoring the saved inventory failed: {e}")
+            return
+        if saved is None:
+            return
+        high_water_mark, timestamp_field, full_synced_at = saved
+        self.high_water_mark = high_water_mark
+        self._high_water_value = _timestamp_value(high_water_mark)
+        self.timestamp_field = self.timestamp_field or timestamp_field
+        self._loaded = True
+        # Carry the age of the saved full sync over to this process
+        self._full_synced_at = time.monotonic() - max(time.time() - full_synced_at, 0)
+        logger.info(f"Inventory sync resumed from high-water mark {high_water_mark}")
+
+    async def _sync(self, force_full: bool):
+        if not self._loaded and self._restore is not None:
+            await self._restore_snapshot()
+            self._restore = None
+        now = time.monotonic()
+        if force_full or not self._loaded or now - self._full_synced_at >= self.full_resync:
+            await self._full_sync()
+        elif self._high_water_value is None:
+            # The orders feed gave no usable timestamps, deltas can't be tracked
+            logger.warning("No order timestamps to sync from, running a full inventory resync")
+            await self._full_sync()
+        else:
+            await self._incremental_sync()
+
+    async def sync(self, force_full: bool = False):
+        """Bring the listeners up to date, sharing one in-flight sync across callers"""
+        task = self._sync_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._sync(force_full))
+            self._sync_task = task
+        await asyncio.shield(task)
+
+    def is_fresh(self) -> bool:
+        return self._loaded and self._synced_at is not None and time.monotonic() - self._synced_at < self.interval
+
+    async def ensure_fresh(self):
+        """Sync if the last sync is older than the sync interval. A failed sync leaves the
+        listeners' existing copy in place; with no copy at all the error is raised"""
+        if self.is_fresh():
+            return
+        try:
+            await self.sync()
+        except RDRequestError as e:
+            if not self._loaded:
+                raise
+            logger.warning(f"Inventory sync failed, serving the previous snapshot: {e}")
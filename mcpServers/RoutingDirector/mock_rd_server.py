@@ -0,0 +1,470 @@
+import os
+import re
+import ssl
+import json
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Any, Optional, Tuple
+from dotenv import load_dotenv
+from synthetic_inventory import generate_inventory, WORKFLOW_TASKS
+
+# Load environment variables
+load_dotenv(override=True)
+
+logger = logging.getLogger(__name__)
+
+# Served under the names the agent is configured with, so it can be pointed here unchanged
+ORG_ID = os.getenv('ORG_ID', "0eaf8613-632d-41d2-8de4-c2d242325d7e")
+TOPO_FILE_NAME = os.getenv('TOPO_FILE_NAME', "topo")
+RT_RESOURCES_NAME = os.getenv('RD_RT_RESOURCES', "rt-resources")
+
+# (route name, method, path template) - the ENDPOINTS table of servicesAgent plus the
+# .env endpoints the config generator and ParagonAuth use
+ROUTES = [
+    ("get_instances", "GET", "/service-orchestration/api/v1/orgs/{org_id}/order/instances"),
+    ("get_orders", "GET", "/service-orchestration/api/v1/orgs/{org_id}/order/orders"),
+    ("create_order", "POST", "/service-orchestration/api/v1/orgs/{org_id}/order"),
+    ("update_placements", "GET", "/api-aggregator/api/v1/orgs/{org_id}/aggregate/fhplace"),
+    ("execute_order", "POST", "/service-orchestration/api/v1/orgs/{org_id}/order/customers/{customer_id}/instances/{instance_name}/exec"),
+    ("get_instance", "GET", "/service-orchestration/api/v1/orgs/{org_id}/order/customers/{customer_id}/instances/{instance_name}"),
+    ("get_customers", "GET", "/service-orchestration/api/v1/orgs/{org_id}/order/customers"),
+    ("create_customer", "POST", "/service-orchestration/api/v1/orgs/{org_id}/order/customers"),
+    ("get_devices", "GET", "/trust/api/v1.1alpha/{org_id}/devices"),
+    ("get_sites", "GET", "/api/v1/orgs/{org_id}/sites"),
+    ("get_resources", "GET", "/api-aggregator/api/v1/orgs/{org_id}/aggregate/network-resources-by-instance"),
+    ("get_token", "POST", "/active-assurance/api/v2/auth/token"),
+]
+
+# One clause of an RD filter expression, as rd_pagination.build_filter writes them
+FILTER_CLAUSE = re.compile(r"^\s*(\w+)\s+(eq|ne|gt|ge|lt|le|in)\s+(.+?)\s*$")
+FILTER_VALUE = re.compile(r"'((?:[^']|'')*)'")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        self.status = status
+        self.message = message
+        super().__init__(message)
+
+
+def _route_pattern(template: str) -> "re.Pattern":
+    pattern = re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(template))
+    return re.compile(f"^{pattern}$")
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+def _comparable(value: Any) -> Any:
+    """ISO-8601 timestamps compare as points in time, everything else as given"""
+    if isinstance(value, str) and len(value) >= 19 and value[4:5] == '-' and value[10:11] == 'T':
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return value
+
+def parse_filter(expression: str) -> List[Tuple[str, str, Any]]:
+    """(field, op, value) clauses of an RD filter; 'in' clauses carry a list of values"""
+    clauses = []
+    for clause in re.split(r"\s+and\s+", expression.strip()):
+        match = FILTER_CLAUSE.match(clause)
+        if not match:
+            raise HTTPError(400, f"Invalid filter clause: {clause}")
+        field, op, operand = match.groups()
+        values = [value.replace("''", "'") for value in FILTER_VALUE.findall(operand)]
+        if not values:
+            raise HTTPError(400, f"Invalid filter value: {operand}")
+        clauses.append((field, op, values if op == "in" else values[0]))
+    return clauses
+
+def matches_filter(item: Dict[str, Any], clauses: List[Tuple[str, str, Any]]) -> bool:
+    for field, op, value in clauses:
+        actual = item.get(field)
+        if op == "in":
+            if actual is None or str(actual) not in value:
+                return False
+            continue
+        if op == "eq":
+            if actual is None or str(actual) != value:
+                return False
+            continue
+        if actual is None:
+            return False
+        left, right = _comparable(actual), _comparable(value)
+        try:
+            if not {"ne": left != right, "gt": left > right, "ge": left >= right,
+                    "lt": left < right, "le": left <= right}[op]:
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+class MockRoutingDirector:
+    """In-memory stand-in for the Routing Director API
+
+    Serves a synthetic inventory (see synthetic_inventory) over the same paths as
+    the real API, with per-page/current-offset paging and filter support on the
+    instance and order listings. Orders go through create -> fhplace -> exec;
+    an executed order walks its workflow over exec_seconds and then succeeds (or
+    fails, at order_failure_rate), appearing in the orders feed like RD's.
+
+    Args:
+        instances: size of the synthetic inventory
+        seed: random seed of the inventory, latency jitter and injected errors
+        latency: seconds added to every response
+        latency_per_item: extra seconds per record in a list response, so page
+            size affects response time as it does on RD
+        jitter: +/- fraction applied to the latency
+        error_rate: share of requests answered with error_status
+        error_status: HTTP status of injected errors
+        error_routes: route names errors are injected on, all routes by default
+        reject_filter: answer 400 to any filter parameter, like an RD without filter support
+        max_page_size: cap on per-page, like a server-side page limit
+        exec_seconds: how long an executed order takes to complete
+        order_failure_rate: share of executed orders that end failed
+        require_auth: answer 401 to requests without an Authorization header
+    """
+
+    def __init__(self, instances: int = 1000, seed: int = 0, latency: float = 0.0,
+                 latency_per_item: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, error_routes: Optional[List[str]] = None,
+                 reject_filter: bool = False, max_page_size: Optional[int] = None,
+                 exec_seconds: float = 2.0, order_failure_rate: float = 0.0, require_auth: bool = True):
+        self.latency = latency
+        self.latency_per_item = latency_per_item
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.error_routes = set(error_routes) if error_routes else None
+        self.reject_filter = reject_filter
+        self.max_page_size = max_page_size
+        self.exec_seconds = exec_seconds
+        self.order_failure_rate = order_failure_rate
+        self.require_auth = require_auth
+        self.requests: Counter = Counter()
+        self.errors_injected: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._routes = [(name, method, _route_pattern(template)) for name, method, template in ROUTES]
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.load_inventory(instances, seed)
+
+    # ---- data ----
+
+    def load_inventory(self, instances: int, seed: int = 0):
+        """Replace the served data with a fresh synthetic inventory"""
+        inventory = generate_inventory(instances, seed)
+        with self._lock:
+            self.instances: Dict[str, Dict[str, Any]] = {i["instance_id"]: i for i in inventory["instances"]}
+            self.orders: List[Dict[str, Any]] = inventory["orders"]
+            self.customers: List[Dict[str, Any]] = inventory["customers"]
+            self.devices: Dict[str, Any] = inventory["devices"]
+            self.sites: List[Dict[str, Any]] = inventory["sites"]
+            # instance_id -> pending (created, not yet executed) order payload
+            self._pending: Dict[str, Dict[str, Any]] = {}
+            # instance_id -> running execution
+            self._executing: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def infra_id(self) -> str:
+        return next(c["customer_id"] for c in self.customers if c["name"] == "network-operator")
+
+    def topo_resource(self) -> Dict[str, Any]:
+        """Topo resource file in the shape get_postal_code reads"""
+        pops = {site["id"]: {"numbered": {"properties": {"postal_code_matches": [
+            {"country_code": site["country_code"], "name": site["name"], "regex": site["postal_code"]}]}}}
+            for site in self.sites}
+        return {"resource": {"location": {"customer_id": {self.infra_id: {"instance_id": {
+            TOPO_FILE_NAME: {"pop": pops}}}}}}}
+
+    def rt_resource(self) -> Dict[str, Any]:
+        return {"resource": {"route_target": {"customer_id": {self.infra_id: {"instance_id": {
+            RT_RESOURCES_NAME: {"pool": {"start": "64512:1000", "end": "64512:65000"}}}}}}}}
+
+    def _record_order(self, instance: Dict[str, Any], operation: str, status: str, order_id: str):
+        self.orders.append({"order_id": order_id, "operation": operation, "instance_id": instance["instance_id"],
+                            "customer_id": instance.get("customer_id"), "design_id": instance.get("design_id"),
+                            "status": status, "updated_at": _now()})
+
+    def _advance(self):
+        """Move running executions forward to the current time (called with the lock held)"""
+        now = time.monotonic()
+        for instance_name, execution in list(self._executing.items()):
+            instance = self.instances.get(instance_name)
+            if instance is None:
+                del self._executing[instance_name]
+                continue
+            progress = min((now - execution["started"]) / self.exec_seconds, 1.0) if self.exec_seconds > 0 else 1.0
+            done_tasks = int(progress * len(WORKFLOW_TASKS))
+            order_status = instance["order_status"]
+            order_status["workflow_trace"] = [
+                {"name": task, "task_id": f"{task}-{execution['order_id']}",
+                 "status": "success" if position < done_tasks else "running", "start_time": execution["started_at"]}
+                for position, task in enumerate(WORKFLOW_TASKS[:done_tasks + 1])]
+            if progress < 1.0:
+                continue
+            del self._executing[instance_name]
+            status = "failed" if execution["fail"] else "success"
+            order_status["status"] = status
+            order_status["workflow_trace"][-1]["status"] = status
+            order_status["components"] = [{"component_type": "config", "component_data": [
+                {"status": "applied" if status == "success" else "failed", "timestamp": _now()}]}]
+            if execution["operation"] == "delete" and status == "success":
+                del self.instances[instance_name]
+            else:
+                instance["instance_status"] = "active" if status == "success" else "failed"
+            self._record_order(instance, execution["operation"], status, execution["order_id"])
+
+    # ---- handlers, called with the lock held; return (status, body) ----
+
+    def _list(self, items: List[Dict[str, Any]], query: Dict[str, str]) -> Tuple[int, Any]:
+        if "filter" in query:
+            if self.reject_filter:
+                raise HTTPError(400, "filter is not supported")
+            clauses = parse_filter(query["filter"])
+            items = [item for item in items if matches_filter(item, clauses)]
+        if "per-page" in query:
+            try:
+                per_page = int(query["per-page"])
+                offset = int(query.get("current-offset", 0))
+            except ValueError:
+                raise HTTPError(400, "per-page and current-offset must be integers")
+            if self.max_page_size:
+                per_page = min(per_page, self.max_page_size)
+            items = items[offset:offset + per_page]
+        return 200, items
+
+    def get_instances(self, params, query, body):
+        return self._list(list(self.instances.values()), query)
+
+    def get_orders(self, params, query, body):
+        return self._list(self.orders, query)
+
+    def create_order(self, params, query, body):
+        if not isinstance(body, dict) or not body.get("instance_id") or not body.get("customer_id"):
+            raise HTTPError(400, "Order payload needs instance_id and customer_id")
+        if not any(c["customer_id"] == body["customer_id"] for c in self.customers):
+            raise HTTPError(404, f"Customer {body['customer_id']} not found")
+        instance_name = body["instance_id"]
+        operation = body.get("operation", "create")
+        instance = self.instances.get(instance_name)
+        if instance is None:
+            if operation == "delete":
+                raise HTTPError(404, f"Instance {instance_name} not found")
+            instance = {key: value for key, value in body.items() if key != "operation"}
+            instance["instance_status"] = "created"
+            self.instances[instance_name] = instance
+        elif operation != "delete":
+            instance.update({key: value for key, value in body.items() if key != "operation"})
+        order_id = f"order-{uuid.UUID(int=self._rng.getrandbits(128), version=4)}"
+        instance["order_status"] = {"status": "created", "order_id": order_id, "operation": operation,
+                                    "components": [], "workflow_trace": []}
+        self._pending[instance_name] = {"order_id": order_id, "operation": operation}
+        self._record_order(instance, operation, "created", order_id)
+        return 200, {"order_id": order_id, "instance_id": instance_name, "operation": operation}
+
+    def update_placements(self, params, query, body):
+        instance = self.instances.get(query.get("instance_id"))
+        if instance is None or instance.get("customer_id") != query.get("customer_id"):
+            raise HTTPError(404, f"Instance {query.get('instance_id')} not found")
+        nodes = [node for service in ((instance.get("l2vpn_ntw") or instance.get("l3vpn_ntw") or {})
+                                      .get("vpn_services", {}).get("vpn_service", []))
+                 for node in service.get("vpn_nodes", {}).get("vpn_node", [])]
+        placement = {"nodes": [{"ne_id": node.get("ne_id"), "pop": node.get("site_id")} for node in nodes]}
+        instance["placement"] = placement
+        return 200, {"instance_id": instance["instance_id"], "status": "placed", "placement": placement}
+
+    def execute_order(self, params, query, body):
+        instance_name = params["instance_name"]
+        instance = self.instances.get(instance_name)
+        if instance is None or instance.get("customer_id") != params["customer_id"]:
+            raise HTTPError(404, f"Instance {instance_name} not found")
+        if instance_name in self._executing:
+            raise HTTPError(409, f"An order is already executing for {instance_name}")
+        order = self._pending.pop(instance_name, None) or {
+            "order_id": f"order-{uuid.UUID(int=self._rng.getrandbits(128), version=4)}", "operation": "update"}
+        instance["order_status"] = {"status": "in_progress", "order_id": order["order_id"],
+                                    "operation": order["operation"], "components": [], "workflow_trace": []}
+        self._executing[instance_name] = dict(order, started=time.monotonic(), started_at=_now(),
+                                              fail=self._rng.random() < self.order_failure_rate)
+        self._record_order(instance, order["operation"], "in_progress", order["order_id"])
+        return 200, {"order_id": order["order_id"], "instance_id": instance_name, "status": "in_progress"}
+
+    def get_instance(self, params, query, body):
+        instance = self.instances.get(params["instance_name"])
+        if instance is None or instance.get("customer_id") != params["customer_id"]:
+            raise HTTPError(404, f"Instance {params['instance_name']} not found")
+        return 200, [instance]
+
+    def get_customers(self, params, query, body):
+        return 200, self.customers
+
+    def create_customer(self, params, query, body):
+        if not isinstance(body, dict) or not body.get("name"):
+            raise HTTPError(400, "Customer payload needs a name")
+        if any(c["name"].lower() == body["name"].lower() for c in self.customers):
+            raise HTTPError(409, f"Customer {body['name']} already exists")
+        customer = dict(body, customer_id=str(uuid.UUID(int=self._rng.getrandbits(128), version=4)))
+        self.customers.append(customer)
+        return 200, customer
+
+    def get_devices(self, params, query, body):
+        return 200, self.devices
+
+    def get_sites(self, params, query, body):
+        return 200, self.sites
+
+    def get_resources(self, params, query, body):
+        if query.get("customer_id") != self.infra_id:
+            raise HTTPError(404, f"No resources for customer {query.get('customer_id')}")
+        return 200, self.topo_resource() if query.get("instance_id") == TOPO_FILE_NAME else self.rt_resource()
+
+    def get_token(self, params, query, body):
+        return 200, {"access_token": uuid.UUID(int=self._rng.getrandbits(128), version=4).hex,
+                     "token_type": "Bearer", "expires_in": 3600}
+
+    # ---- HTTP ----
+
+    def _resolve(self, method: str, path: str) -> Tuple[str, Dict[str, str]]:
+        allowed = False
+        for name, route_method, pattern in self._routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return name, match.groupdict()
+                allowed = True
+        raise HTTPError(405 if allowed else 404, f"No route for {method} {path}")
+
+    def _delay(self, items: int):
+        delay = self.latency + self.latency_per_item * items
+        if delay > 0 and self.jitter:
+            with self._lock:
+                delay *= self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def handle(self, method: str, target: str, headers: Dict[str, str], raw_body: bytes) -> Tuple[int, Any]:
+        """Answer one request: (HTTP status, JSON-serializable body)"""
+        url = urlparse(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        status, response, items = 500, None, 0
+        try:
+            name, params = self._resolve(method, url.path.rstrip("/") or "/")
+            with self._lock:
+                self.requests[name] += 1
+            if self.require_auth and name != "get_token" and not headers.get("Authorization"):
+                raise HTTPError(401, "Missing Authorization header")
+            with self._lock:
+                inject = (self.error_rate and (self.error_routes is None or name in self.error_routes)
+                          and self._rng.random() < self.error_rate)
+            if inject:
+                with self._lock:
+                    self.errors_injected[name] += 1
+                raise HTTPError(self.error_status, f"Injected error on {name}")
+            try:
+                body = json.loads(raw_body) if raw_body else None
+            except ValueError:
+                raise HTTPError(400, "Request body is not valid JSON")
+            with self._lock:
+                self._advance()
+                status, response = getattr(self, name)(params, query, body)
+                items = len(response) if isinstance(response, list) else 0
+                # Serialize under the lock, records are mutated by later orders
+                response = json.dumps(response)
+        except HTTPError as e:
+            status, response = e.status, json.dumps({"message": e.message})
+        self._delay(items)
+        return status, response
+
+    def _handler_class(self):
+        director = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                status, response = director.handle(self.command, self.path, dict(self.headers), raw_body)
+                payload = response.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = _serve
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0, certfile: str = None,
+              keyfile: str = None) -> str:
+        """Serve in a background thread, returns the BASE_URL to point the clients at"""
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        scheme = "http"
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+            scheme = "https"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address[:2]
+        return f"{scheme}://{host}:{port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the Routing Director API, for offline load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=48800)
+    parser.add_argument("--instances", type=int, default=1000, help="Size of the synthetic inventory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--latency-per-item", type=float, default=0.0, help="Extra seconds per record in list responses")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- fraction applied to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--error-routes", help="Comma-separated route names to inject errors on, e.g. get_instances")
+    parser.add_argument("--reject-filter", action="store_true", help="Answer 400 to the filter parameter")
+    parser.add_argument("--max-page-size", type=int, help="Server-side cap on per-page")
+    parser.add_argument("--exec-seconds", type=float, default=2.0, help="Time an executed order takes")
+    parser.add_argument("--order-failure-rate", type=float, default=0.0, help="Share of executed orders that fail")
+    parser.add_argument("--certfile", help="Serve HTTPS with this certificate")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args()
+
+    director = MockRoutingDirector(
+        instances=args.instances, seed=args.seed, latency=args.latency, latency_per_item=args.latency_per_item,
+        jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status,
+        error_routes=args.error_routes.split(",") if args.error_routes else None,
+        reject_filter=args.reject_filter, max_page_size=args.max_page_size, exec_seconds=args.exec_seconds,
+        order_failure_rate=args.order_failure_rate)
+    base_url = director.start(args.host, args.port, args.certfile, args.keyfile)
+    print(f"Mock Routing Director serving {args.instances} instances at {base_url}")
+    print(f"Point the agent at it with BASE_URL=\"{base_url}\" ORG_ID=\"{ORG_ID}\" "
+          f"TOPO_FILE_NAME=\"{TOPO_FILE_NAME}\" RD_RT_RESOURCES=\"{RT_RESOURCES_NAME}\"")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        director.stop()
@@ -0,0 +1,254 @@
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from ncclient import manager
+from rd_client import env_int, env_float
+
+logger = logging.getLogger(__name__)
+
+# Sessions kept open at once, idle or in use (0 opens and closes a session per use)
+RD_NETCONF_POOL_SIZE = env_int('RD_NETCONF_POOL_SIZE', 64)
+# Seconds an unused session stays open
+RD_NETCONF_IDLE_TIMEOUT = env_float('RD_NETCONF_IDLE_TIMEOUT', 300.0)
+# Sessions idle longer than this are checked with an RPC before they are reused
+RD_NETCONF_HEALTH_CHECK_AFTER = env_float('RD_NETCONF_HEALTH_CHECK_AFTER', 30.0)
+
+HEALTH_CHECK_COMMAND = 'show system uptime'
+
+# (host, port, username)
+SessionKey = Tuple[str, int, str]
+
+
+class _Session:
+    def __init__(self, key: SessionKey, m, secret: str):
+        self.key = key
+        self.m = m
+        self.secret = secret
+        self.last_used = time.monotonic()
+
+
+def _fingerprint(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def _close(session: _Session):
+    try:
+        session.m.close_session()
+    except Exception as e:
+        logger.debug(f"Closing NETCONF session to {session.key[0]}:{session.key[1]} failed: {e}")
+
+
+class NetconfPool:
+    """Open NETCONF sessions kept for reuse, keyed by (host, port, username)
+
+    Reusing a session skips the SSH handshake and authentication, which is most
+    of the latency of a short RPC. Sessions idle past `idle_timeout` are closed
+    by a background reaper, ones idle past `health_check_after` are checked
+    with a cheap RPC before being handed out, and at most `max_size` are open at
+    once: beyond that the least recently used idle session is closed, or the
+    caller waits for one to be given back.
+    """
+
+    def __init__(self, max_size: int = None, idle_timeout: float = None, health_check_after: float = None):
+        self.max_size = RD_NETCONF_POOL_SIZE if max_size is None else max_size
+        self.idle_timeout = RD_NETCONF_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.health_check_after = RD_NETCONF_HEALTH_CHECK_AFTER if health_check_after is None else health_check_after
+        self._idle: Dict[SessionKey, List[_Session]] = {}
+        # Sessions handed out or being opened
+        self._in_use = 0
+        self._lock = threading.Condition()
+        self._reaper: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def _idle_count(self) -> int:
+        return sum(len(sessions) for sessions in self._idle.values())
+
+    def _take_idle(self, key: SessionKey) -> Optional[_Session]:
+        sessions = self._idle.get(key)
+        if not sessions:
+            return None
+        session = sessions.pop()
+        if not sessions:
+            del self._idle[key]
+        return session
+
+    def _evict_lru(self) -> Optional[_Session]:
+        """Least recently used idle session of any key, removed from the pool"""
+        oldest = None
+        for sessions in self._idle.values():
+            if sessions and (oldest is None or sessions[0].last_used < oldest.last_used):
+                oldest = sessions[0]
+        if oldest is not None:
+            self._idle[oldest.key].remove(oldest)
+            if not self._idle[oldest.key]:
+                del self._idle[oldest.key]
+        return oldest
+
+    def _healthy(self, session: _Session, timeout: float) -> bool:
+        if not session.m.connected:
+            return False
+        if time.monotonic() - session.last_used < self.health_check_after:
+            return True
+        try:
+            session.m.timeout = min(timeout, 10.0)
+            session.m.command(HEALTH_CHECK_COMMAND, format='xml')
+            return True
+        except Exception as e:
+            logger.debug(f"NETCONF session to {session.key[0]}:{session.key[1]} failed its health check: {e}")
+            return False
+
+    def _checkout(self, key: SessionKey, secret: str, deadline: float) -> Optional[_Session]:
+        """An idle session of key, or None with a slot reserved to open one"""
+        stale = []
+        try:
+            with self._lock:
+                while True:
+                    session = self._take_idle(key)
+                    if session is not None:
+                        if session.secret == secret:
+                            self._in_use += 1
+                            return session
+                        stale.append(session)
+                        continue
+                    if self._in_use + self._idle_count() < self.max_size:
+                        self._in_use += 1
+                        return None
+                    session = self._evict_lru()
+                    if session is not None:
+                        stale.append(session)
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No NETCONF session slot free within the timeout "
+                                           f"(RD_NETCONF_POOL_SIZE={self.max_size})")
+                    self._lock.wait(remaining)
+        finally:
+            for session in stale:
+                _close(session)
+
+    def _checkin(self, session: Optional[_Session], reuse: bool):
+        with self._lock:
+            self._in_use -= 1
+            if reuse and session is not None and not self._closed.is_set():
+                session.last_used = time.monotonic()
+                self._idle.setdefault(session.key, []).append(session)
+                session = None
+            self._lock.notify()
+        if session is not None:
+            _close(session)
+
+    @contextmanager
+    def session(self, host: str, port: int, username: str, password: str, timeout: float = 60.0):
+        """A connected ncclient manager for (host, port, username), given back to the pool afterwards
+
+        A session whose block raised is closed rather than reused, since it may
+        have an RPC reply still pending.
+
+        Args:
+            host / port: NETCONF over SSH endpoint
+            username / password: SSH credentials; a pooled session opened with another password isn't reused
+            timeout: seconds to wait for a free slot and to connect
+        """
+        if self.max_size <= 0:
+            with _connect(host, port, username, password, timeout) as m:
+                yield m
+            return
+
+        key = (host, int(port), username)
+        secret = _fingerprint(password)
+        deadline = time.monotonic() + timeout
+        session = None
+        # Whether this caller holds a pool slot, to give back
+        held = reuse = False
+        try:
+            while True:
+                session = self._checkout(key, secret, deadline)
+                held = True
+                remaining = max(deadline - time.monotonic(), 1.0)
+                if session is None:
+                    session = _Session(key, _connect(host, port, username, password, remaining), secret)
+                    break
+                if self._healthy(session, remaining):
+                    logger.debug(f"Reusing NETCONF session to {host}:{port}")
+                    break
+                self._checkin(session, reuse=False)
+                session = None
+                held = False
+            self._start_reaper()
+            yield session.m
+            reuse = True
+        finally:
+            if held:
+                self._checkin(session, reuse)
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is None or not self._reaper.is_alive():
+                self._closed.clear()
+                self._reaper = threading.Thread(target=self._reap, name="netconf-pool-reaper", daemon=True)
+                self._reaper.start()
+
+    def _reap(self):
+        while not self._closed.wait(max(self.idle_timeout / 4, 1.0)):
+            expired = []
+            with self._lock:
+                now = time.monotonic()
+                for key in list(self._idle):
+                    sessions = self._idle[key]
+                    expired.extend(session for session in sessions if now - session.last_used >= self.idle_timeout)
+                    sessions[:] = [session for session in sessions if now - session.last_used < self.idle_timeout]
+                    if not sessions:
+                        del self._idle[key]
+                if expired:
+                    self._lock.notify_all()
+            for session in expired:
+                logger.debug(f"Closing idle NETCONF session to {session.key[0]}:{session.key[1]}")
+                _close(session)
+
+    def close(self):
+        """Close every idle session; sessions in use are closed when given back"""
+        self._closed.set()
+        with self._lock:
+            sessions = [session for sessions in self._idle.values() for session in sessions]
+            self._idle.clear()
+            self._lock.notify_all()
+        for session in sessions:
+            _close(session)
+
+
+def _connect(host: str, port: int, username: str, password: str, timeout: float):
+    return manager.connect(
+        host=host,
+        port=port,
+        username=username,
+        password=password,
+        hostkey_verify=False,
+        device_params={'name': 'junos'},
+        allow_agent=False,
+        look_for_keys=False,
+        timeout=timeout
+    )
+
+
+_pool: Optional[NetconfPool] = None
+_pool_lock = threading.Lock()
+
+def get_netconf_pool() -> NetconfPool:
+    """Return the process-wide NETCONF session pool, so the MCP server's tool calls share sessions"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = NetconfPool()
+        return _pool
+
+def close_netconf_pool():
+    """Close the pooled NETCONF sessions"""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
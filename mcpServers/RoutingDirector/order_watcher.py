@@ -0,0 +1,217 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+from rd_client import env_float
+from rd_pagination import iter_filtered_pages, RDRequestError
+
+logger = logging.getLogger(__name__)
+
+RD_ORDER_POLL_INTERVAL = env_float('RD_ORDER_POLL_INTERVAL', 2.0)
+RD_ORDER_POLL_MAX_INTERVAL = env_float('RD_ORDER_POLL_MAX_INTERVAL', 30.0)
+RD_ORDER_WAIT_TIMEOUT = env_float('RD_ORDER_WAIT_TIMEOUT', 600.0)
+
+# order_status.status values that end a watch
+ORDER_SUCCESS_STATUSES = {"success", "successful", "completed", "complete"}
+ORDER_FAILURE_STATUSES = {"failed", "failure", "error", "aborted", "rollback", "rolled_back"}
+
+
+def order_progress(instance: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize the latest order of an instance from its get_instances record"""
+    if instance is None:
+        return {"order_status": "not found", "workflow_progress": "No workflow data", "current_task": None,
+                "tasks_total": 0}
+
+    order_status = instance.get('order_status', {}) or {}
+    workflow_trace = order_status.get('workflow_trace', []) or []
+    successful_tasks = sum(1 for task in workflow_trace if task.get('status') == 'success')
+    current_task = None
+    if workflow_trace:
+        last_task = workflow_trace[-1]
+        current_task = last_task.get('name') or last_task.get('task_name') or last_task.get('task_id')
+
+    return {
+        "order_status": order_status.get('status', 'N/A'),
+        "workflow_progress": f"{successful_tasks}/{len(workflow_trace)} tasks successful" if workflow_trace else 'No workflow data',
+        "current_task": current_task,
+        "tasks_total": len(workflow_trace)
+    }
+
+def order_fingerprint(instance: Optional[Dict[str, Any]]) -> Tuple[str, int, Optional[str], Optional[str]]:
+    """What identifies the current order state, used to tell a new result from the previous order's
+
+    (status, tasks, order id, last timestamp): a redeploy that ends like the
+    previous order did still differs in its order id or task timestamps.
+    """
+    progress = order_progress(instance)
+    order_status = (instance or {}).get('order_status', {}) or {}
+    workflow_trace = order_status.get('workflow_trace', []) or []
+    order_id = order_status.get('order_id') or order_status.get('id')
+    timestamps = [str(task[field]) for task in workflow_trace for field in ('start_time', 'end_time') if task.get(field)]
+    last_change = order_status.get('updated_at') or (max(timestamps) if timestamps else None)
+    return (str(progress["order_status"]).lower(), progress["tasks_total"],
+            str(order_id) if order_id is not None else None, str(last_change) if last_change is not None else None)
+
+
+class _Watch:
+    def __init__(self, instance_name: str, baseline: Optional[Tuple]):
+        self.instance_name = instance_name
+        self.baseline = baseline
+        # Set once a poll shows something other than the pre-exec order
+        self.left_baseline = baseline is None
+        self.started = time.monotonic()
+        self.future = asyncio.get_running_loop().create_future()
+        self.progress: Optional[Dict[str, Any]] = None
+        self.polls = 0
+
+    def result(self, status: str, error: Optional[str] = None) -> Dict[str, Any]:
+        progress = self.progress or {}
+        result = {
+            "instance_name": self.instance_name,
+            "status": status,
+            "order_status": progress.get("order_status"),
+            "workflow_progress": progress.get("workflow_progress"),
+            "current_task": progress.get("current_task"),
+            "polls": self.polls,
+            "elapsed_seconds": round(time.monotonic() - self.started, 1)
+        }
+        if error is not None:
+            result["error"] = error
+        return result
+
+
+class OrderWatcher:
+    """Await completion of Routing Director orders
+
+    A single background poller covers every watched instance: each poll is one
+    filtered get_instances request for all of them, however many callers wait.
+    The poll interval backs off exponentially (with jitter) while nothing
+    changes and drops back to the base interval on progress or a new watch.
+    """
+
+    def __init__(self, endpoint: str, base_interval: float = None, max_interval: float = None,
+                 backoff: float = 1.6, jitter: float = 0.2):
+        self.endpoint = endpoint
+        self.base_interval = base_interval or RD_ORDER_POLL_INTERVAL
+        self.max_interval = max(max_interval or RD_ORDER_POLL_MAX_INTERVAL, self.base_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self._watches: Dict[str, List[_Watch]] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _ensure_poller(self):
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._poller = asyncio.create_task(self._poll_loop())
+        else:
+            self._wakeup.set()
+
+    async def _sleep(self, interval: float):
+        delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _fetch(self, instance_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        instances = {}
+        async for page in iter_filtered_pages(self.endpoint, {"instance_id": instance_names}):
+            for instance in page:
+                instances[instance.get('instance_id')] = instance
+        return instances
+
+    async def _poll_loop(self):
+        interval = self.base_interval
+        while self._watches:
+            await self._sleep(interval)
+            if self._wakeup.is_set():
+                # New watch added, start it off at the fast interval
+                self._wakeup.clear()
+                interval = self.base_interval
+
+            instance_names = list(self._watches)
+            if not instance_names:
+                break
+            try:
+                instances = await self._fetch(instance_names)
+            except Exception as e:
+                # Transient for all we know; ending the poller would leave every waiter hanging
+                if isinstance(e, RDRequestError):
+                    logger.warning(f"Order status poll failed: {e}")
+                else:
+                    logger.error(f"Order status poll failed unexpectedly: {e!r}")
+                interval = min(interval * self.backoff, self.max_interval)
+                continue
+
+            changed = False
+            for instance_name in instance_names:
+                instance = instances.get(instance_name)
+                try:
+                    progress = order_progress(instance)
+                    fingerprint = order_fingerprint(instance)
+                except Exception as e:
+                    # A record this watcher can't read won't get readable by polling it again
+                    logger.error(f"Unexpected order status for {instance_name}: {e!r}")
+                    for watch in list(self._watches.get(instance_name, [])):
+                        self._finish(watch, "failed", error=f"Unreadable order status: {e!r}")
+                    continue
+                for watch in list(self._watches.get(instance_name, [])):
+                    watch.polls += 1
+                    if progress != watch.progress:
+                        changed = True
+                        watch.progress = progress
+                    if not watch.left_baseline:
+                        if fingerprint == watch.baseline:
+                            # Still showing the order from before this watch started
+                            continue
+                        watch.left_baseline = True
+                    if fingerprint[0] in ORDER_SUCCESS_STATUSES:
+                        self._finish(watch, "completed")
+                    elif fingerprint[0] in ORDER_FAILURE_STATUSES:
+                        self._finish(watch, "failed")
+
+            interval = self.base_interval if changed else min(interval * self.backoff, self.max_interval)
+
+    def _finish(self, watch: _Watch, status: str, error: Optional[str] = None):
+        watches = self._watches.get(watch.instance_name, [])
+        if watch in watches:
+            watches.remove(watch)
+        if not watches:
+            self._watches.pop(watch.instance_name, None)
+        if not watch.future.done():
+            watch.future.set_result(watch.result(status, error))
+
+    async def current_state(self, instance_name: str) -> Optional[Dict[str, Any]]:
+        """Fetch an instance's current get_instances record, e.g. to take a baseline before exec"""
+        instances = await self._fetch([instance_name])
+        return instances.get(instance_name)
+
+    async def wait(self, instance_name: str, timeout: float = None,
+                   baseline: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Wait until the latest order of an instance completes or fails
+
+        Args:
+            instance_name: instance to watch
+            timeout: seconds to wait, defaults to RD_ORDER_WAIT_TIMEOUT
+            baseline: the instance record from before the order was executed; a
+                terminal status is only accepted once it differs from this
+
+        Returns:
+            {"status": "completed" | "failed" | "timeout", order_status, workflow_progress, ...},
+            with an "error" when the instance's order status could not be read
+        """
+        watch = _Watch(instance_name, order_fingerprint(baseline) if baseline is not None else None)
+        self._watches.setdefault(instance_name, []).append(watch)
+        self._ensure_poller()
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(watch.future), timeout or RD_ORDER_WAIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._finish(watch, "timeout")
+            return watch.future.result()
+        finally:
+            # A cancelled caller must not leave its instance polled forever
+            self._finish(watch, "cancelled")
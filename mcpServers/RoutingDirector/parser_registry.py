@@ -0,0 +1,442 @@
+import json
+import threading
+import pandas as pd
+from collections import OrderedDict
+from collections.abc import Mapping
+from rd_client import env_int
+from typing import Dict, List, Any, Optional, Callable, Tuple, Iterable, Iterator
+
+# Parsed documents kept by a ParsedServiceCache, materialized entries per LazyReferenceData
+RD_PARSE_CACHE_SIZE = env_int('RD_PARSE_CACHE_SIZE', 200000)
+RD_REFERENCE_CACHE_SIZE = env_int('RD_REFERENCE_CACHE_SIZE', 256)
+
+# Design-specific pieces of a service parser
+StatusExtractor = Callable[[Dict[str, Any]], Dict[str, str]]
+
+
+def get_customer_name(network: Dict[str, Any]) -> str:
+    """Customer name of the first vpn_service in l2vpn_ntw/l3vpn_ntw"""
+    try:
+        vpn_services = network.get('vpn_services', {})
+        vpn_service_list = vpn_services.get('vpn_service', [])
+        if vpn_service_list:
+            return vpn_service_list[0].get('customer_name', '')
+    except:
+        pass
+    return ''
+
+def extract_devices(network: Dict[str, Any], detail_field: Optional[str] = None) -> List[str]:
+    """ne_id of every vpn_node, or ne_id(<detail_field>) for nodes that have both"""
+    devices = []
+    try:
+        vpn_services = network.get('vpn_services', {})
+        for vpn_service in vpn_services.get('vpn_service', []):
+            vpn_nodes = vpn_service.get('vpn_nodes', {})
+            for node in vpn_nodes.get('vpn_node', []):
+                ne_id = node.get('ne_id', '')
+                if detail_field is None:
+                    if ne_id:
+                        devices.append(ne_id)
+                else:
+                    detail = node.get(detail_field, '')
+                    if ne_id and detail:
+                        devices.append(f"{ne_id}({detail})")
+    except:
+        pass
+    return devices
+
+def extract_order_status_data(item: Dict[str, Any]) -> Dict[str, str]:
+    """Extract order status and workflow information"""
+    status_info = {
+        'order_status': 'N/A',
+        'components_status': 'N/A',
+        'workflow_status': 'N/A'
+    }
+
+    try:
+        order_status = item.get('order_status', {})
+
+        # Get overall status
+        status_info['order_status'] = order_status.get('status', 'N/A')
+
+        # Get component statuses
+        components = order_status.get('components', [])
+        component_statuses = []
+
+        for component in components:
+            comp_type = component.get('component_type', '')
+            comp_data = component.get('component_data', [])
+
+            if comp_data:
+                # Get latest status from component data
+                latest_status = comp_data[-1].get('status', '')
+                if comp_type and latest_status:
+                    component_statuses.append(f"{comp_type}:{latest_status}")
+
+        status_info['components_status'] = ' | '.join(component_statuses) if component_statuses else 'No component data'
+
+        # Get workflow trace summary
+        workflow_trace = order_status.get('workflow_trace', [])
+        if workflow_trace:
+            successful_tasks = sum(1 for task in workflow_trace if task.get('status') == 'success')
+            total_tasks = len(workflow_trace)
+            status_info['workflow_status'] = f"{successful_tasks}/{total_tasks} tasks successful"
+        else:
+            status_info['workflow_status'] = 'No workflow data'
+
+    except Exception as e:
+        print(f"Error extracting order status data: {e}")
+
+    return status_info
+
+def extract_assurance_data(item: Dict[str, Any]) -> Dict[str, str]:
+    """Extract active assurance test result data"""
+    assurance_info = {
+        'summary': 'N/A',
+        'assurance_status': 'No data',
+        'test_results': 'No data',
+        'test_ids': 'No data'
+    }
+
+    try:
+        active_assurance = item.get('active_assurance_test_result', {})
+
+        # Get overall summary
+        assurance_info['summary'] = active_assurance.get('summary', 'N/A')
+
+        # Process nodes
+        nodes = active_assurance.get('nodes', [])
+
+        node_statuses = []
+        test_results = []
+        test_ids = []
+
+        for node in nodes:
+            device_id = node.get('device', '')
+            node_status = node.get('status', '')
+
+            # Store node status
+            if node_status:
+                node_statuses.append(f"{device_id[:12]}...:{node_status}")
+
+            # Process test results for this node
+            test_result_list = node.get('test_results', [])
+            for test_result in test_result_list:
+                test_status = test_result.get('status', '')
+                test_id = test_result.get('test_id', '')
+
+                if test_status:
+                    test_results.append(f"{device_id[:12]}...:{test_status}")
+
+                if test_id:
+                    test_ids.append(f"{device_id[:12]}...:{test_id[:8]}...")
+
+        # Create display strings
+        assurance_info['assurance_status'] = ' | '.join(node_statuses) if node_statuses else 'No status data'
+        assurance_info['test_results'] = ' | '.join(test_results) if test_results else 'No test results'
+        assurance_info['test_ids'] = ' | '.join(test_ids) if test_ids else 'No test IDs'
+
+    except Exception as e:
+        print(f"Error extracting assurance data: {e}")
+
+    return assurance_info
+
+class ServiceParser:
+    """How one design_id is turned into a DataFrame row and a reference data entry
+
+    Args:
+        design_id: RD design_id the parser handles
+        service_type: name used by get_services, e.g. "l3vpn"
+        name_column: column holding the service (instance) name
+        network_key: l2vpn_ntw or l3vpn_ntw
+        device_detail: node field shown next to ne_id in Devices, e.g. site_id
+        device_separator: joins the device entries
+        status_key: reference data key of the extracted status
+        extract_status: item -> status fields
+        status_columns: DataFrame column -> status field
+        reference_keys: item keys copied into the reference data entry
+    """
+
+    # Columns after the name column, before the status columns
+    COMMON_COLUMNS = ['Customer ID', 'Customer Name', 'Status', 'Instance ID', 'Devices', 'Device Count']
+
+    def __init__(self, design_id: str, service_type: str, name_column: str, network_key: str,
+                 device_detail: Optional[str], device_separator: str, status_key: str,
+                 extract_status: StatusExtractor, status_columns: Dict[str, str],
+                 reference_keys: Tuple[str, ...]):
+        self.design_id = design_id
+        self.service_type = service_type
+        self.name_column = name_column
+        self.network_key = network_key
+        self.device_detail = device_detail
+        self.device_separator = device_separator
+        self.status_key = status_key
+        self.extract_status = extract_status
+        self.status_columns = status_columns
+        self.reference_keys = reference_keys
+        self.columns = [name_column] + self.COMMON_COLUMNS + list(status_columns)
+        self._status_fields = tuple(status_columns.values())
+
+    def parse_row(self, item: Dict[str, Any]) -> tuple:
+        """Row values in self.columns order for one instance, tolerating malformed data"""
+        network = item.get(self.network_key, {})
+        devices = extract_devices(network, self.device_detail)
+        status_data = self.extract_status(item)
+
+        return (item.get('instance_id', ''), item.get('customer_id', ''), get_customer_name(network),
+                item.get('instance_status', ''), item.get('instance_uuid', ''),
+                self.device_separator.join(devices), len(devices)) + tuple(status_data[field] for field in self._status_fields)
+
+    def parse_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """DataFrame row of one instance of this design, as a column -> value dict"""
+        return dict(zip(self.columns, self.parse_row(item)))
+
+    def status_values(self, row: tuple) -> tuple:
+        """The status columns of a row"""
+        return row[1 + len(self.COMMON_COLUMNS):]
+
+    def reference_subtrees(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """The sections of an instance its reference data is built from"""
+        subtrees = {self.network_key: item.get(self.network_key, {})}
+        for key in self.reference_keys:
+            subtrees[key] = item.get(key, {})
+        return subtrees
+
+    def reference_entry(self, item: Dict[str, Any], status_values: tuple) -> Dict[str, Any]:
+        """Reference data of one instance (or of its reference_subtrees); status_values
+        are the row's status columns"""
+        reference_entry = {self.network_key: item.get(self.network_key, {})}
+        for key in self.reference_keys:
+            reference_entry[key] = item.get(key, {})
+        reference_entry[self.status_key] = dict(zip(self._status_fields, status_values))
+        return reference_entry
+
+
+class LazyReferenceData(Mapping):
+    """Service name -> reference data, built from the instance on first access
+
+    Only the instance id of each service is held; fetch loads the instance (or
+    just its reference subtrees) by id when the service is accessed. Built
+    entries are kept in an LRU bounded by RD_REFERENCE_CACHE_SIZE.
+    """
+
+    def __init__(self, parser: ServiceParser, fetch: Callable[[str], Optional[Dict[str, Any]]],
+                 max_entries: int = None):
+        self._parser = parser
+        self._fetch = fetch
+        # service name -> (instance id, status values)
+        self._locators: Dict[str, Tuple[str, tuple]] = {}
+        self._materialized: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries or RD_REFERENCE_CACHE_SIZE
+
+    def add(self, service_name: str, instance_name: str, status_values: tuple):
+        self._locators[service_name] = (instance_name, status_values)
+
+    def __getitem__(self, service_name: str) -> Dict[str, Any]:
+        # Accessed from worker threads as well as the event loop
+        with self._lock:
+            entry = self._materialized.get(service_name)
+            if entry is not None:
+                self._materialized.move_to_end(service_name)
+                return entry
+        instance_name, status_values = self._locators[service_name]
+        item = self._fetch(instance_name)
+        if item is None:
+            # Instance removed from the store since it was parsed
+            raise KeyError(service_name)
+        entry = self._parser.reference_entry(item, status_values)
+        with self._lock:
+            self._materialized[service_name] = entry
+            if len(self._materialized) > self.max_entries:
+                self._materialized.popitem(last=False)
+        return entry
+
+    def __contains__(self, service_name: object) -> bool:
+        return service_name in self._locators
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._locators)
+
+    def __len__(self) -> int:
+        return len(self._locators)
+
+    def __repr__(self) -> str:
+        return f"LazyReferenceData({len(self._locators)} services: {list(self._locators)[:10]})"
+
+
+# design_id -> parser, in registration order
+PARSERS: Dict[str, ServiceParser] = {}
+
+def register_parser(parser: ServiceParser):
+    """Add a design; every parse_services call picks it up without another scan"""
+    PARSERS[parser.design_id] = parser
+
+ORDER_STATUS_COLUMNS = {
+    'Order Status': 'order_status',
+    'Components Status': 'components_status',
+    'Workflow Status': 'workflow_status',
+}
+
+register_parser(ServiceParser(
+    design_id='eline-evpn-vpws-csm', service_type='evpn_vpws', name_column='L2VPN EVPN Service Name',
+    network_key='l2vpn_ntw', device_detail=None, device_separator=' → ',
+    status_key='status_data', extract_status=extract_order_status_data, status_columns=ORDER_STATUS_COLUMNS,
+    reference_keys=('l2vpn_svc', 'order_status')))
+
+register_parser(ServiceParser(
+    design_id='elan-evpn-csm', service_type='evpn_elan', name_column='L2VPN EVPN Service Name',
+    network_key='l2vpn_ntw', device_detail=None, device_separator=' → ',
+    status_key='status_data', extract_status=extract_order_status_data, status_columns=ORDER_STATUS_COLUMNS,
+    reference_keys=('l2vpn_svc', 'order_status')))
+
+register_parser(ServiceParser(
+    design_id='eline-l2circuit-nsm', service_type='l2circuit', name_column='L2 Circuit Service Name',
+    network_key='l2vpn_ntw', device_detail='vpn_node_id', device_separator=' → ',
+    status_key='status_data', extract_status=extract_order_status_data, status_columns=ORDER_STATUS_COLUMNS,
+    reference_keys=('order_status', 'fh_config', 'placement')))
+
+register_parser(ServiceParser(
+    design_id='l3vpn', service_type='l3vpn', name_column='L3VPN Service Name',
+    network_key='l3vpn_ntw', device_detail='site_id', device_separator=' <-> ',
+    status_key='assurance_data', extract_status=extract_assurance_data,
+    status_columns={
+        'Assurance Summary': 'summary',
+        'Assurance Status': 'assurance_status',
+        'Test Results': 'test_results',
+        'Test IDs': 'test_ids',
+    },
+    reference_keys=('l3vpn_svc', 'active_assurance_test_result')))
+
+
+def _build_results(wanted: List[str], rows: Dict[str, List[tuple]],
+                   reference_data: Dict[str, LazyReferenceData]) -> Dict[str, Tuple[pd.DataFrame, LazyReferenceData]]:
+    results = {}
+    for design_id in wanted:
+        # No services gives a frame without columns, as the per-record parsers always did
+        df = pd.DataFrame(rows[design_id], columns=PARSERS[design_id].columns) if rows[design_id] else pd.DataFrame([])
+        results[design_id] = (df, reference_data[design_id])
+    return results
+
+def _wanted_designs(design_ids: Optional[Iterable[str]]) -> List[str]:
+    return list(PARSERS) if design_ids is None else [d for d in design_ids if d in PARSERS]
+
+def parse_services(json_data: Any, design_ids: Optional[Iterable[str]] = None) -> Dict[str, Tuple[pd.DataFrame, LazyReferenceData]]:
+    """Parse instances of every registered design (or only design_ids) in one pass
+
+    Each instance is dispatched to its design's parser, so the cost is one
+    traversal however many designs are asked for. Instances are flattened into
+    row tuples and each DataFrame is built once from them.
+    Reference data is built only when a service is accessed; until then just the
+    sections it is built from are held, not the instances or json_data.
+
+    Returns:
+        design_id -> (DataFrame, reference data), for every requested design
+    """
+    wanted = _wanted_designs(design_ids)
+    # Handle both single object and list
+    data_list = json_data if isinstance(json_data, list) else [json_data]
+
+    rows: Dict[str, List[tuple]] = {design_id: [] for design_id in wanted}
+    # design_id -> instance id -> reference subtrees
+    subtrees: Dict[str, Dict[str, Dict[str, Any]]] = {design_id: {} for design_id in wanted}
+    reference_data = {design_id: LazyReferenceData(PARSERS[design_id], subtrees[design_id].get)
+                      for design_id in wanted}
+
+    for item in data_list:
+        design_id = item.get('design_id')
+        if design_id not in rows:
+            continue
+        parser = PARSERS[design_id]
+        row = parser.parse_row(item)
+        rows[design_id].append(row)
+        subtrees[design_id][row[0]] = parser.reference_subtrees(item)
+        reference_data[design_id].add(row[0], row[0], parser.status_values(row))
+
+    return _build_results(wanted, rows, reference_data)
+
+def parse_design(json_data: Any, design_id: str) -> Tuple[pd.DataFrame, LazyReferenceData]:
+    """(DataFrame, reference data) for one design"""
+    return parse_services(json_data, [design_id])[design_id]
+
+
+class ParsedServiceCache:
+    """Parsed rows of stored instance documents, reused while a document is unchanged
+
+    Callers pass the digest the inventory store keeps for each document, so a
+    repeated query over a mostly unchanged inventory costs a dict lookup per
+    instance; only new or changed documents are loaded, in one batch, and
+    parsed. Reference data is loaded back the same way when a service is
+    accessed. Concurrent parse calls, e.g. from worker threads, are serialized.
+    """
+
+    def __init__(self, load_documents: Callable[[List[str]], Dict[str, str]], max_entries: int = None):
+        self.load_documents = load_documents
+        self.max_entries = max_entries or RD_PARSE_CACHE_SIZE
+        # instance_id -> (document digest, design_id, row)
+        self._entries: Dict[str, Tuple[bytes, Any, Optional[tuple]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _fetch(self, instance_name: str) -> Optional[Dict[str, Any]]:
+        document = self.load_documents([instance_name]).get(instance_name)
+        return json.loads(document) if document is not None else None
+
+    def _refresh(self, changed: Dict[str, bytes]) -> Dict[str, Tuple[bytes, Any, Optional[tuple]]]:
+        """Load and parse the documents of changed instances, returning their new entries"""
+        entries = self._entries
+        fresh = {}
+        documents = self.load_documents(list(changed))
+        for instance_name, digest in changed.items():
+            document = documents.get(instance_name)
+            if document is None:
+                # Removed from the store since it was listed
+                continue
+            item = json.loads(document)
+            design_id = item.get('design_id')
+            parser = PARSERS.get(design_id)
+            if instance_name not in entries and len(entries) >= self.max_entries:
+                # Drop the oldest entry to stay within bounds
+                del entries[next(iter(entries))]
+            entries[instance_name] = fresh[instance_name] = (digest, design_id,
+                                                             parser.parse_row(item) if parser is not None else None)
+        return fresh
+
+    def parse(self, digests: Iterable[Tuple[str, bytes]],
+              design_ids: Optional[Iterable[str]] = None) -> Dict[str, Tuple[pd.DataFrame, LazyReferenceData]]:
+        """Same result as parse_services over the listed instances' documents
+
+        Args:
+            digests: (instance_id, document digest) pairs, e.g. from InventoryStore.query_digests
+            design_ids: designs to return, all registered designs by default
+        """
+        with self._lock:
+            return self._parse(list(digests), _wanted_designs(design_ids))
+
+    def _parse(self, digests: List[Tuple[str, bytes]],
+               wanted: List[str]) -> Dict[str, Tuple[pd.DataFrame, LazyReferenceData]]:
+        entries = self._entries
+        changed = {}
+        for instance_name, digest in digests:
+            entry = entries.get(instance_name)
+            if entry is None or entry[0] != digest:
+                changed[instance_name] = digest
+        # Kept apart from the entries, which may drop some of them again when the listing exceeds max_entries
+        fresh = self._refresh(changed) if changed else {}
+
+        rows: Dict[str, List[tuple]] = {design_id: [] for design_id in wanted}
+        reference_data = {design_id: LazyReferenceData(PARSERS[design_id], self._fetch) for design_id in wanted}
+        for instance_name, _ in digests:
+            entry = fresh.get(instance_name) or entries.get(instance_name)
+            if entry is None or entry[1] not in rows:
+                continue
+            row = entry[2]
+            rows[entry[1]].append(row)
+            reference_data[entry[1]].add(row[0], instance_name, PARSERS[entry[1]].status_values(row))
+
+        return _build_results(wanted, rows, reference_data)
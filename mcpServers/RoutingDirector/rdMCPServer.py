@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import json
 import re
@@ -7,6 +8,8 @@ from datetime import datetime
 from typing import Dict, Any
 from mcp.server.fastmcp import FastMCP
 from servicesAgent import servicesManager
+from netconf_pool import close_netconf_pool
+from rd_client import close_rd_client
 from typing import Optional
 
 mcp = FastMCP("Routing_Director_MCP_Server")
@@ -63,19 +66,42 @@ async def delete_service(instance_name: str):
     return await svc_mgr.delete_service(instance_name=instance_name, return_customer_id=True)
 
 @mcp.tool()
-async def get_services(service_type):
+async def get_services(service_type, customer_id: Optional[str] = None, status: Optional[str] = None,
+                       device: Optional[str] = None):
     """1. If User asks to get/fetch all services Or \n
     2. asks to fetch all services of evpn_elan services Or \n
     3. asks to fetch all evpn_vpws services Or \n
     4. asks to fetch all l3vpn services Or \n
-    5. asks to fetch all l2circuits services \n
+    5. asks to fetch all l2circuits services Or \n
+    6. asks for a breakdown of all services by service type \n
 
     Args:
-        service_type:  service type is needed. Only these 5 values are allowed - 
-        "evpn_elan", "evpn_vpws", "l3vpn", "l2circuit", "all_services"
+        service_type:  service type is needed. Only these 6 values are allowed - 
+        "evpn_elan", "evpn_vpws", "l3vpn", "l2circuit", "all_services", "services_by_type"
+
+        customer_id: Optional, only return services of this customer ID
+
+        status: Optional, only return services with this instance status (e.g. "active")
+
+        device: Optional, only return services with a node on this device (ne_id/hostname)
+    """
+    svc_mgr = servicesManager()
+    return await svc_mgr.get_services(service_type=service_type, customer_id=customer_id, status=status,
+                                      device=device)
+
+@mcp.tool()
+async def get_service_reference_data(service_type: str, service_name: str):
+    """Get the detailed reference data of one service listed by get_services: its network
+    (l2vpn_ntw/l3vpn_ntw), service, order status or assurance test sections
+
+    Args:
+        service_type: service type of the service. Only these 4 values are allowed -
+        "evpn_elan", "evpn_vpws", "l3vpn", "l2circuit"
+
+        service_name: name of the service/instance, as listed by get_services
     """
     svc_mgr = servicesManager()
-    return await svc_mgr.get_services(service_type=service_type)
+    return await svc_mgr.get_service_reference_data(service_type=service_type, service_name=service_name)
 
 @mcp.tool()
 async def create_service(service_type: str, customer_name: str, hostnames: list):
@@ -141,6 +167,24 @@ async def create_jsonbody_for_service(service_type: str, customer_name: str, hos
 
     return result
 
+@mcp.tool()
+async def bulk_create_services(manifest_filepath: str, output_dir: str = "payload"):
+    """Generate many service json bodies at once from a CSV/JSONL manifest file and save them 
+    into the payload directory. Use this when user wants to create services in bulk/batch or migrate services.
+
+    Args:
+        manifest_filepath: CSV or JSONL file, one service per row with columns service_type, customer_name,
+        hostnames (separated by ';' in CSV) and optional instance_id, eth_inf_type, cvlan_id, speed, lldp, oam_enabled
+
+        output_dir: directory the generated json files are written to, default is "payload"
+    """
+    svc_mgr = servicesManager()
+    result = await svc_mgr.bulk_create_services(manifest_filepath=manifest_filepath, output_dir=output_dir)
+    if isinstance(result, dict) and "results" in result:
+        # Keep the LLM response small, the full per-row report is in the summary file
+        result = {key: value for key, value in result.items() if key != "results"}
+    return result
+
 @mcp.tool()
 async def upload_service_to_RD(json_filename: str):
     """Uploads the service into Routing Director. This tool requires json body to upload a service/instance into RD.
@@ -165,40 +209,99 @@ async def validate_resources(instance_name: str):
     return result
 
 @mcp.tool()
-async def deploy_service(instance_name: str):
+async def deploy_service(instance_name: str, wait_for_completion: bool = False):
     """Deploy the service which is already uploaded, validated with resources
 
     Args:
         instance_name: instance name is the service name with which service to be deployed
+        wait_for_completion: set True to wait until the deployment workflow completes or fails
     """
     svc_mgr = servicesManager()
-    result = await svc_mgr.deploy_service(instance_name=instance_name)
+    result = await svc_mgr.deploy_service(instance_name=instance_name, wait_for_completion=wait_for_completion)
     return result
 
+@mcp.tool()
+async def wait_for_service_deployment(instance_name: str, timeout_seconds: Optional[float] = None):
+    """Wait for a service deployment (order execution) to complete, fail or time out.
+    Use this when user wants to know when a deployed service is done.
+
+    Args:
+        instance_name: instance name of the deployed service
+        timeout_seconds: optional maximum time to wait
+    """
+    svc_mgr = servicesManager()
+    return await svc_mgr.wait_for_deployment(instance_name=instance_name, timeout=timeout_seconds)
+
+@mcp.tool()
+async def bulk_deploy_services(items: Optional[list] = None, bulk_summary_file: Optional[str] = None,
+                               deploy: bool = True, wait_for_completion: bool = False):
+    """Upload, validate resources and deploy many services in one go, concurrently.
+    Use this when user wants to roll out/deploy a batch of services instead of one at a time.
+
+    Args:
+        items: list of payload json filenames (from payload directory) to upload, validate and deploy,
+        or names of instances already uploaded to RD to validate and deploy
+
+        bulk_summary_file: optional bulk_summary_<timestamp>.json written by bulk_create_services,
+        every payload it generated is rolled out
+
+        deploy: set False to only upload and validate resources without deploying
+
+        wait_for_completion: set True to also wait for every deployment workflow to complete
+    """
+    items = list(items or [])
+    if bulk_summary_file:
+        try:
+            with open(bulk_summary_file, 'r') as f:
+                summary = json.load(f)
+            items.extend(result["file"] for result in summary.get("results", []) if result.get("status") == "generated")
+        except (OSError, json.JSONDecodeError) as e:
+            return {"error": f"Cannot read bulk summary file {bulk_summary_file}: {e}"}
+    if not items:
+        return {"error": "No payload files or instance names given"}
+
+    svc_mgr = servicesManager()
+    return await svc_mgr.run_lifecycle_pipeline(items=items, deploy=deploy, wait_for_completion=wait_for_completion)
+
 @mcp.tool()
 async def discover_brownfield_l2vpn_bgp_signaling_services(router_list_filepath: str, output_filepath: str, 
                           username: str = 'jcluser', password: str = 'Juniper!1',
-                          host: str = '66.129.234.204'):
+                          host: str = '66.129.234.204', concurrency: Optional[int] = None,
+                          output_format: Optional[str] = None, run_id: Optional[str] = None):
     """This MCP Tool discovers the brownfield l2vpn bgp signaling services in devices
 
     Args:
         router_list_filepath: This is filepath for routers details
 
         output_filepath: This is the output filename that user wants to write discovered services into xlsx file
+            (a .csv, .jsonl or .parquet filename keeps only the streamed Hardware and L2VPN files)
 
         username: This is username to access each network device from router_list_filepath xlsx
 
         password: This is password to access each network device
 
         host: This is the host IP to access devices
+
+        concurrency: Optional number of devices discovered at the same time (defaults to RD_DISCOVERY_CONCURRENCY)
+
+        output_format: Optional format the discovered rows are streamed in: csv, jsonl or parquet (defaults to RD_DISCOVERY_OUTPUT_FORMAT)
+
+        run_id: Optional run_id from an earlier discovery summary, with the same output_filepath, to resume that run:
+            routers it already discovered are skipped and only the failed ones are retried
     """
     svc_mgr = servicesManager()
     result = await svc_mgr.discover_l2vpn_bgp_signaling_services(router_list_filepath=router_list_filepath,
                                                                  output_filepath=output_filepath,
                                                                  username=username, password=password,
-                                                                 host=host)
+                                                                 host=host, concurrency=concurrency,
+                                                                 output_format=output_format, run_id=run_id)
     return result
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    mcp.run(transport='stdio')
\ No newline at end of file
+    try:
+        mcp.run(transport='stdio')
+    finally:
+        # Pooled NETCONF sessions and RD connections are shared by every tool call of this process
+        close_netconf_pool()
+        asyncio.run(close_rd_client())
\ No newline at end of file
@@ -0,0 +1,114 @@
+import os
+import asyncio
+import logging
+import httpx
+from typing import Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(override=True)
+
+logger = logging.getLogger(__name__)
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid value for {name}, using default {default}")
+        return default
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid value for {name}, using default {default}")
+        return default
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# Pool tuning, all optional in .env
+RD_HTTP2 = env_bool('RD_HTTP2', True)
+RD_MAX_CONNECTIONS = env_int('RD_MAX_CONNECTIONS', 100)
+RD_MAX_KEEPALIVE_CONNECTIONS = env_int('RD_MAX_KEEPALIVE_CONNECTIONS', 20)
+RD_KEEPALIVE_EXPIRY = env_float('RD_KEEPALIVE_EXPIRY', 60.0)
+RD_TIMEOUT = env_float('RD_TIMEOUT', 60.0)
+RD_CONNECT_TIMEOUT = env_float('RD_CONNECT_TIMEOUT', 10.0)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+# Closes of clients left behind by a previous event loop, kept until they finish
+_stale_closes: set = set()
+
+
+def _http2_supported() -> bool:
+    """HTTP/2 needs the optional 'h2' package (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = RD_HTTP2 and _http2_supported()
+    if RD_HTTP2 and not http2:
+        logger.warning("RD_HTTP2 is enabled but 'h2' is not installed, falling back to HTTP/1.1")
+
+    limits = httpx.Limits(
+        max_connections=RD_MAX_CONNECTIONS,
+        max_keepalive_connections=RD_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=RD_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(RD_TIMEOUT, connect=RD_CONNECT_TIMEOUT)
+
+    logger.info(f"Creating pooled Routing Director client (http2={http2}, "
+                f"max_connections={RD_MAX_CONNECTIONS}, keepalive={RD_MAX_KEEPALIVE_CONNECTIONS})")
+    return httpx.AsyncClient(
+        verify=False,
+        http2=http2,
+        limits=limits,
+        timeout=timeout,
+        headers={"Accept-Encoding": "gzip, deflate"}
+    )
+
+def get_rd_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client for Routing Director calls.
+
+    The client is created lazily on first use and reused afterwards, so a run of
+    calls shares warm keep-alive connections. An AsyncClient is bound to the event
+    loop it was created on, so a new one is built if the running loop changes
+    (e.g. successive asyncio.run() calls from a CLI) and the old one is closed.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        if _client is not None and not _client.is_closed:
+            _close_stale(_client, loop)
+        _client = _build_client()
+        _client_loop = loop
+    return _client
+
+def _close_stale(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+    """Close a client built on an earlier event loop so its connections are released"""
+    async def close():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing previous Routing Director client: {e}")
+
+    task = loop.create_task(close())
+    _stale_closes.add(task)
+    task.add_done_callback(_stale_closes.discard)
+
+async def close_rd_client():
+    """Close the pooled client and drop its connections"""
+    global _client, _client_loop
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
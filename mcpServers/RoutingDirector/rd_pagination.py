@@ -0,0 +1,237 @@
+import time
+import asyncio
+import logging
+import operator
+from typing import Dict, List, Any, Optional, AsyncIterator
+from rd_client import env_int, env_float
+from servicesConfigGenerator import make_api_request
+
+logger = logging.getLogger(__name__)
+
+# Page sizing, all optional in .env
+RD_PAGE_SIZE = env_int('RD_PAGE_SIZE', 500)
+RD_MIN_PAGE_SIZE = env_int('RD_MIN_PAGE_SIZE', 50)
+RD_MAX_PAGE_SIZE = env_int('RD_MAX_PAGE_SIZE', 5000)
+RD_PAGE_TARGET_SECONDS = env_float('RD_PAGE_TARGET_SECONDS', 2.0)
+
+# Endpoints whose filter parameter RD has rejected, filtered client-side from then on
+_filter_rejected = set()
+
+
+class RDRequestError(Exception):
+    """Raised when Routing Director returns an error while paging"""
+
+    def __init__(self, error: Dict[str, Any]):
+        self.error = error
+        super().__init__(error.get("error", "Unknown error"))
+
+
+class AdaptivePageSizer:
+    """Grow the page size while pages come back fast, shrink it when they are slow"""
+
+    def __init__(self, page_size: int = None, min_size: int = None, max_size: int = None,
+                 target_seconds: float = None):
+        self.min_size = min_size or RD_MIN_PAGE_SIZE
+        self.max_size = max(max_size or RD_MAX_PAGE_SIZE, self.min_size)
+        self.size = min(max(page_size or RD_PAGE_SIZE, self.min_size), self.max_size)
+        self.target_seconds = target_seconds or RD_PAGE_TARGET_SECONDS
+
+    def record(self, elapsed: float):
+        if elapsed < self.target_seconds / 2:
+            self.size = min(self.size * 2, self.max_size)
+        elif elapsed > self.target_seconds * 1.5:
+            self.size = max(self.size // 2, self.min_size)
+
+    def shrink(self) -> bool:
+        """Halve the page size after a failed page, False if already at the minimum"""
+        if self.size <= self.min_size:
+            return False
+        self.size = max(self.size // 2, self.min_size)
+        return True
+
+
+class Comparison:
+    """A range predicate for build_filter/matches_predicates, e.g. Comparison("ge", "2025-01-01T00:00:00Z")"""
+
+    OPERATORS = {"gt": operator.gt, "ge": operator.ge, "lt": operator.lt, "le": operator.le, "ne": operator.ne}
+
+    def __init__(self, op: str, value: Any):
+        if op not in self.OPERATORS:
+            raise ValueError(f"Unsupported comparison operator {op}")
+        self.op = op
+        self.value = value
+
+    def matches(self, value: Any) -> bool:
+        if value is None:
+            return False
+        try:
+            return self.OPERATORS[self.op](value, self.value)
+        except TypeError:
+            return False
+
+
+async def _fetch_page(endpoint: str, offset: int, sizer: AdaptivePageSizer,
+                      params: Optional[Dict[str, Any]]):
+    """Fetch one page at offset, retrying with smaller pages if RD chokes on the size.
+    Returns (items, requested_size)"""
+    while True:
+        page_size = sizer.size
+        query = dict(params or {})
+        query["per-page"] = page_size
+        query["current-offset"] = offset
+
+        started = time.monotonic()
+        response = await make_api_request(endpoint, method="GET", params=query)
+        elapsed = time.monotonic() - started
+
+        if isinstance(response, dict) and "error" in response:
+            # Only server-side failures are worth retrying with a smaller page
+            status_code = response.get("status_code")
+            if (status_code is None or status_code >= 500) and sizer.shrink():
+                logger.warning(f"Page at offset {offset} failed with {page_size} items, "
+                               f"retrying with {sizer.size}: {response['error']}")
+                continue
+            raise RDRequestError(response)
+
+        sizer.record(elapsed)
+        if isinstance(response, list):
+            return response, page_size
+        # A single object rather than a list, nothing more to page through
+        return [response], page_size
+
+
+async def iter_pages(endpoint: str, params: Optional[Dict[str, Any]] = None,
+                     page_size: int = None, prefetch: bool = True) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Page through a Routing Director list endpoint that supports per-page/current-offset
+
+    The request for the next page is started before the current page is handed to
+    the caller, so network time overlaps with the caller's processing. Page size
+    adapts to how quickly RD answers.
+
+    Args:
+        endpoint: API path with org_id already formatted in
+        params: Extra query parameters (e.g. filter) sent with every page
+        page_size: Initial page size, defaults to RD_PAGE_SIZE
+        prefetch: Fetch page N+1 while page N is being processed
+
+    Yields:
+        Lists of records, one list per page
+    """
+    sizer = AdaptivePageSizer(page_size=page_size)
+    offset = 0
+    pending = None
+    previous_first = None
+
+    try:
+        page, requested = await _fetch_page(endpoint, offset, sizer, params)
+        while True:
+            # A short page is the last one; a page larger than requested means RD
+            # ignored pagination and sent everything at once
+            last_page = len(page) != requested
+            if page and previous_first is not None and page[0] == previous_first:
+                # RD ignored current-offset and sent the same page again
+                logger.warning(f"Pagination ignored by {endpoint}, stopping at offset {offset}")
+                return
+            previous_first = page[0] if page else None
+            offset += len(page)
+
+            if not last_page and prefetch:
+                pending = asyncio.create_task(_fetch_page(endpoint, offset, sizer, params))
+
+            if page:
+                yield page
+            if last_page:
+                return
+
+            if pending is not None:
+                page, requested = await pending
+                pending = None
+            else:
+                page, requested = await _fetch_page(endpoint, offset, sizer, params)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+async def iter_instances(endpoint: str, params: Optional[Dict[str, Any]] = None,
+                         page_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+    """Yield records one at a time from a paginated endpoint"""
+    async for page in iter_pages(endpoint, params=params, page_size=page_size):
+        for item in page:
+            yield item
+
+
+def build_filter(predicates: Dict[str, Any]) -> str:
+    """Build the RD filter expression for field predicates.
+    Scalars become equality tests, lists/tuples/sets become membership tests and
+    Comparison values become range tests:
+        {"design_id": "l3vpn", "instance_status": ["active", "failed"]}
+        -> "design_id eq 'l3vpn' and instance_status in ('active','failed')"
+    """
+    clauses = []
+    for field, value in predicates.items():
+        if isinstance(value, Comparison):
+            clauses.append(f"{field} {value.op} '{value.value}'")
+        elif isinstance(value, (list, tuple, set)):
+            values = ",".join(f"'{v}'" for v in value)
+            clauses.append(f"{field} in ({values})")
+        else:
+            clauses.append(f"{field} eq '{value}'")
+    return " and ".join(clauses)
+
+def matches_predicates(item: Dict[str, Any], predicates: Dict[str, Any]) -> bool:
+    """Client-side evaluation of the same predicates build_filter pushes down"""
+    for field, value in predicates.items():
+        if isinstance(value, Comparison):
+            if not value.matches(item.get(field)):
+                return False
+        elif isinstance(value, (list, tuple, set)):
+            if item.get(field) not in value:
+                return False
+        elif item.get(field) != value:
+            return False
+    return True
+
+def filter_supported(endpoint: str) -> bool:
+    """False once RD has rejected the filter parameter on endpoint"""
+    return endpoint not in _filter_rejected
+
+def _is_filter_rejection(error: RDRequestError) -> bool:
+    return error.error.get("status_code") in (400, 404, 405, 422, 501)
+
+async def iter_filtered_pages(endpoint: str, predicates: Dict[str, Any],
+                              page_size: int = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Page through an endpoint yielding only records that match predicates
+
+    Predicates are pushed down to Routing Director through the filter parameter so
+    only matching records cross the wire. If RD rejects the filter, the endpoint is
+    remembered and records are filtered client-side instead. Records are always
+    re-checked locally, in case RD silently ignores part of the filter.
+
+    Args:
+        endpoint: API path with org_id already formatted in
+        predicates: field -> value (or list of values); None values are ignored
+        page_size: Initial page size, defaults to RD_PAGE_SIZE
+    """
+    predicates = {field: value for field, value in predicates.items() if value is not None}
+
+    if predicates and endpoint not in _filter_rejected:
+        yielded = False
+        try:
+            async for page in iter_pages(endpoint, params={"filter": build_filter(predicates)},
+                                         page_size=page_size):
+                yielded = True
+                matched = [item for item in page if matches_predicates(item, predicates)]
+                if matched:
+                    yield matched
+            return
+        except RDRequestError as e:
+            if yielded or not _is_filter_rejection(e):
+                raise
+            logger.warning(f"Routing Director rejected filter on {endpoint}, filtering client-side: {e}")
+            _filter_rejected.add(endpoint)
+
+    async for page in iter_pages(endpoint, page_size=page_size):
+        matched = [item for item in page if matches_predicates(item, predicates)] if predicates else page
+        if matched:
+            yield matched
@@ -0,0 +1,150 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Tuple
+from dotenv import load_dotenv
+from rd_client import env_float
+from servicesConfigGenerator import make_api_request, ORG_ID
+
+# Load environment variables
+load_dotenv(override=True)
+
+logger = logging.getLogger(__name__)
+
+# Seconds each dataset is served from cache before it is revalidated
+DATASET_TTLS = {
+    "customers": env_float('RD_REFDATA_TTL_CUSTOMERS', 300.0),
+    "devices": env_float('RD_REFDATA_TTL_DEVICES', 300.0),
+    "sites": env_float('RD_REFDATA_TTL_SITES', 900.0),
+    "topo": env_float('RD_REFDATA_TTL_TOPO', 900.0),
+    "rt_resources": env_float('RD_REFDATA_TTL_RT_RESOURCES', 900.0),
+}
+
+
+def _is_error(response: Any) -> bool:
+    return isinstance(response, dict) and "error" in response
+
+def build_customer_index(customers: Any) -> Dict[str, str]:
+    """Lower-cased customer name -> customer_id (first match wins, like a linear scan)"""
+    index = {}
+    if isinstance(customers, list):
+        for customer in customers:
+            index.setdefault(customer.get("name", "").lower(), customer.get("customer_id"))
+    return index
+
+def build_device_index(devices: Any) -> Dict[str, Tuple[str, str]]:
+    """Lower-cased hostname -> (device id, site id)"""
+    index = {}
+    if isinstance(devices, dict):
+        for device in devices.get('devices', []):
+            index.setdefault(device.get('hostname', "").lower(), (device.get("id"), device.get("siteId")))
+    return index
+
+def build_site_index(sites: Any) -> Dict[str, Dict[str, Any]]:
+    """Lower-cased site id -> site"""
+    index = {}
+    if isinstance(sites, list):
+        for site in sites:
+            index.setdefault(site.get("id", "").lower(), site)
+    return index
+
+# Datasets that get a lookup index, built once per fetch
+INDEX_BUILDERS = {
+    "customers": build_customer_index,
+    "devices": build_device_index,
+    "sites": build_site_index,
+}
+
+
+class ReferenceDataStore:
+    """Process-wide cache of the Routing Director data the config generator needs
+
+    Customers, devices, sites, the topo resource file and the RT resource file are
+    fetched concurrently on first use and cached with per-dataset TTLs. Once a
+    dataset has expired it keeps being served while a single background request
+    revalidates it (stale-while-revalidate). Error responses are never cached.
+    Customers, devices and sites are indexed for O(1) lookups whenever they load.
+    """
+
+    def __init__(self, ttls: Dict[str, float] = None):
+        self.ttls = dict(DATASET_TTLS, **(ttls or {}))
+        self._data: Dict[str, Any] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._infra_id: Optional[str] = None
+
+    def _api_path(self, name: str) -> str:
+        if name == "customers":
+            return os.getenv('CUSTOMERS_API_ENDPOINT').format(org_id=ORG_ID)
+        if name == "devices":
+            return os.getenv('DEVICES_API_ENDPOINT').format(org_id=ORG_ID)
+        if name == "sites":
+            return os.getenv('SITES_API_ENDPOINT').format(org_id=ORG_ID)
+        topo_file_name = os.getenv('TOPO_FILE_NAME') if name == "topo" else os.getenv('RD_RT_RESOURCES')
+        return os.getenv('TOPO_API_ENDPOINT').format(org_id=ORG_ID, infra_id=self._infra_id,
+                                                     topo_file_name=topo_file_name)
+
+    def _is_fresh(self, name: str) -> bool:
+        fetched_at = self._fetched_at.get(name)
+        return fetched_at is not None and time.monotonic() - fetched_at < self.ttls[name]
+
+    def _resolve_infra_id(self):
+        """Topo and RT resource files are looked up under the network-operator customer"""
+        self._infra_id = self._indexes["customers"].get('network-operator', self._infra_id)
+
+    async def _fetch(self, name: str) -> Any:
+        if name in ("topo", "rt_resources") and self._infra_id is None:
+            # First load: the resource files need the infra customer id
+            await self._refresh("customers")
+        response = await make_api_request(self._api_path(name), method="GET")
+        if _is_error(response):
+            logger.error(f"Fetching {name} reference data failed: {response['error']}")
+        else:
+            if name in INDEX_BUILDERS:
+                self._indexes[name] = INDEX_BUILDERS[name](response)
+            if name == "customers":
+                self._resolve_infra_id()
+            self._data[name] = response
+            self._fetched_at[name] = time.monotonic()
+        return response
+
+    def _refresh(self, name: str) -> asyncio.Task:
+        """Start (or join) the single in-flight fetch of a dataset"""
+        task = self._inflight.get(name)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._fetch(name))
+            self._inflight[name] = task
+        return task
+
+    async def get(self, name: str) -> Any:
+        """Return one dataset, fetching it if it was never loaded"""
+        if name in self._data:
+            if not self._is_fresh(name):
+                self._refresh(name)
+            return self._data[name]
+        response = await asyncio.shield(self._refresh(name))
+        return self._data.get(name, response)
+
+    async def get_all(self) -> Dict[str, Any]:
+        """Return every dataset, fetching the missing ones concurrently"""
+        names = list(DATASET_TTLS)
+        results = await asyncio.gather(*(self.get(name) for name in names))
+        snapshot = dict(zip(names, results))
+        snapshot["infra_id"] = self._infra_id
+        for name in INDEX_BUILDERS:
+            snapshot[f"{name}_index"] = self._indexes.get(name, {})
+        return snapshot
+
+    def invalidate(self, name: Optional[str] = None):
+        """Force a refetch on next use, of one dataset or all of them"""
+        names = [name] if name else list(DATASET_TTLS)
+        for dataset in names:
+            self._data.pop(dataset, None)
+            self._fetched_at.pop(dataset, None)
+            self._indexes.pop(dataset, None)
+
+
+# Shared by every serviceConfigGenerator in this process
+reference_data_store = ReferenceDataStore()
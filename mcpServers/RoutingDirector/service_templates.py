@@ -0,0 +1,129 @@
+import os
+import re
+import json
+import logging
+from typing import Dict, List, Any, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_PATTERN = re.compile(r'\{[A-Za-z0-9_.]+\}')
+
+SlotPath = Tuple[Union[str, int], ...]
+
+
+def format_path(path: SlotPath) -> str:
+    """Render a slot path the way _check_missing_fields reports it, e.g. a.b[0].c"""
+    rendered = ""
+    for key in path:
+        if isinstance(key, int):
+            rendered += f"[{key}]"
+        else:
+            rendered = f"{rendered}.{key}" if rendered else key
+    return rendered
+
+def structural_copy(obj: Any) -> Any:
+    """Copy the dict/list skeleton of JSON data, sharing the immutable leaves.
+    Equivalent to copy.deepcopy for JSON documents, at a fraction of the cost"""
+    if isinstance(obj, dict):
+        return {key: structural_copy(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [structural_copy(item) for item in obj]
+    return obj
+
+def _copy_omitting(obj: Any, path: SlotPath, omit: Tuple[SlotPath, ...]) -> Any:
+    if path in omit:
+        return type(obj)()
+    if not any(prefix[:len(path)] == path for prefix in omit):
+        return structural_copy(obj)
+    if isinstance(obj, dict):
+        return {key: _copy_omitting(value, path + (key,), omit) for key, value in obj.items()}
+    return [_copy_omitting(item, path + (i,), omit) for i, item in enumerate(obj)]
+
+def _is_placeholder(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("{") and value.endswith("}")
+
+
+class CompiledTemplate:
+    """A JSON service template with the location of every placeholder recorded
+
+    Compiling walks the template once. Instantiating is a structural copy plus a
+    direct assignment into each placeholder slot, and the slots left unfilled are
+    the missing fields, without walking the result again.
+    """
+
+    def __init__(self, template: Any):
+        self.template = template
+        # (path, raw string, whole-string placeholder or None)
+        self.slots: List[Tuple[SlotPath, str, Any]] = []
+        self._subtemplates: Dict[SlotPath, "CompiledTemplate"] = {}
+        self._record_slots(template, ())
+
+    def _record_slots(self, obj: Any, path: SlotPath):
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                self._record_slots(value, path + (key,))
+        elif isinstance(obj, list):
+            for i, item in enumerate(obj):
+                self._record_slots(item, path + (i,))
+        elif isinstance(obj, str) and PLACEHOLDER_PATTERN.search(obj):
+            whole = obj if PLACEHOLDER_PATTERN.fullmatch(obj) else None
+            self.slots.append((path, obj, whole))
+
+    def instantiate(self, values: Dict[str, Any], omit: Tuple[SlotPath, ...] = ()) -> Tuple[Any, List[Tuple[SlotPath, str]]]:
+        """Fill the template
+
+        Args:
+            values: placeholder (with braces, e.g. "{SITE_ID}") -> value. A None value
+                (e.g. an unknown customer id) leaves its slot unfilled and reported as
+                missing; other values are filled in as strings
+            omit: paths of sub-trees the caller rebuilds itself; they come back as
+                empty containers and their slots are neither filled nor reported
+
+        Returns:
+            (filled document, [(slot path, value still in the slot)] for unfilled slots)
+        """
+        values = {placeholder: str(value) for placeholder, value in values.items() if value is not None}
+        document = _copy_omitting(self.template, (), omit) if omit else structural_copy(self.template)
+        missing = []
+        for path, raw, whole in self.slots:
+            if omit and any(path[:len(prefix)] == prefix for prefix in omit):
+                continue
+            if whole is not None:
+                value = values.get(whole, raw)
+            else:
+                value = PLACEHOLDER_PATTERN.sub(lambda m: values.get(m.group(0), m.group(0)), raw)
+
+            if value != raw:
+                parent = document
+                for key in path[:-1]:
+                    parent = parent[key]
+                parent[path[-1]] = value
+            if _is_placeholder(value):
+                missing.append((path, value))
+        return document, missing
+
+    def subtemplate(self, path: SlotPath) -> "CompiledTemplate":
+        """Compiled template of the sub-tree at path, e.g. one site to clone per hostname"""
+        if path not in self._subtemplates:
+            obj = self.template
+            for key in path:
+                obj = obj[key]
+            self._subtemplates[path] = CompiledTemplate(obj)
+        return self._subtemplates[path]
+
+
+# template file path -> (mtime, compiled template)
+_compiled_templates: Dict[str, Tuple[float, CompiledTemplate]] = {}
+
+def load_compiled_template(filepath: str) -> CompiledTemplate:
+    """Return the compiled template for a file, recompiling only when its mtime changes"""
+    mtime = os.stat(filepath).st_mtime
+    cached = _compiled_templates.get(filepath)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(filepath, 'r') as f:
+        compiled = CompiledTemplate(json.load(f))
+    _compiled_templates[filepath] = (mtime, compiled)
+    logger.info(f"Compiled service template {filepath} with {len(compiled.slots)} placeholder slots")
+    return compiled
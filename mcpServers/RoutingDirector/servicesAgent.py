@@ -1,4 +1,6 @@
+import time
 import logging
+import asyncio
 import os, json, httpx
 from dotenv import load_dotenv
 from urllib.parse import urlencode
@@ -6,18 +8,20 @@ from openai import OpenAI
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import pandas as pd
-from ncclient import manager
-import xml.etree.ElementTree as ET
 
 
 
 from servicesConfigGenerator import ParagonAuth
 from servicesConfigGenerator import serviceConfigGenerator
-from servicesConfigGenerator import make_api_request_sync
-from evpn_vpws_parser import parse_evpn_vpws_json
-from l3vpn_parser import parse_l3vpn_json
-from l2ckt_parser import parse_l2circuit_json
-from evpn_elan_parser import parse_evpn_json
+from servicesConfigGenerator import make_api_request
+from parser_registry import PARSERS, ParsedServiceCache, LazyReferenceData
+from rd_pagination import RDRequestError
+from order_watcher import OrderWatcher
+from inventory_sync import InventorySync
+from inventory_store import InventoryStore
+from reference_data import reference_data_store
+from rd_client import env_int
+import brownfield_discovery
 
 # Load environment variables
 load_dotenv(override=True)
@@ -36,48 +40,10 @@ except ValueError as e:
 
 class utilityFunctions():
     @staticmethod
-    async def make_api_request_sync(endpoint: str, method: str = "GET", payload: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make HTTP request to the API with authentication (synchronous version)"""
-        if auth is None:
-            return {"error": "Authentication not configured. Check .env file."}
-        
-        try:
-            url = f"{BASE_URL}{endpoint}"
-            logger.info("url ---> {}".format(url))
-            
-            headers = auth.get_headers(use_basic_auth=True)
-            
-            # Use httpx sync client instead of async
-            with httpx.Client(verify=False, timeout=60.0) as client:
-                if method == "GET":
-                    response = client.get(url, headers=headers)
-                elif method == "POST" or "DELETE":
-                    if payload:
-                        response = client.post(url, headers=headers, json=payload)
-                    else:
-                        response = client.post(url, headers=headers)
-                else:
-                    return {"error": f"Unsupported HTTP method: {method}"}
-                response.raise_for_status()
-                
-                if response.content:
-                    return response.json()
-                else:
-                    return {"success": True, "message": "Request completed successfully"}
-                
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                logger.error("Authentication failed - check username/password in .env")
-                return {"error": "Authentication failed - invalid credentials"}
-            elif e.response.status_code == 403:
-                return {"error": "Access forbidden - insufficient permissions"}
-            else:
-                logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-                return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
-            
-        except Exception as e:
-            logger.error(f"API request failed: {e}")
-            return {"error": str(e)}
+    async def make_api_request(endpoint: str, method: str = "GET", payload: Dict[str, Any] = None,
+                               params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Make HTTP request to the API with authentication over the shared pooled client"""
+        return await make_api_request(endpoint, method=method, json_data=payload, params=params)
 
 class APIEndpoint:
     """Class to represent API endpoint information"""
@@ -162,42 +128,106 @@ ENDPOINTS = {
     ),
 }
 
+# Bulk lifecycle pipeline: max in-flight requests per stage
+RD_PIPELINE_UPLOAD_CONCURRENCY = env_int('RD_PIPELINE_UPLOAD_CONCURRENCY', 10)
+RD_PIPELINE_VALIDATE_CONCURRENCY = env_int('RD_PIPELINE_VALIDATE_CONCURRENCY', 10)
+RD_PIPELINE_DEPLOY_CONCURRENCY = env_int('RD_PIPELINE_DEPLOY_CONCURRENCY', 5)
+
+# Local SQLite copy of the inventory, kept current from the orders feed and
+# resumed from on restart
+inventory_store = InventoryStore()
+inventory_sync = InventorySync(ENDPOINTS['get_instances'].path.format(org_id=ORG_ID),
+                               ENDPOINTS['get_orders'].path.format(org_id=ORG_ID),
+                               restore=inventory_store.load_sync_state)
+
+async def _store_inventory(upserts: List[Dict[str, Any]], removed: List[str], kind: str):
+    # SQLite writes block, keep them off the event loop
+    await asyncio.to_thread(inventory_store.apply_instances, upserts, removed, kind,
+                            high_water_mark=inventory_sync.high_water_mark,
+                            timestamp_field=inventory_sync.timestamp_field)
+
+inventory_sync.add_listener(_store_inventory)
+
+def _parse_stored(predicates: Dict[str, Any], design_ids: Optional[List[str]] = None):
+    """Parsed services of the stored instances matching predicates; blocks on SQLite"""
+    return parsed_services.parse(inventory_store.query_digests(predicates), design_ids)
+
+# Parsed service rows, reused across get_services calls while an instance is unchanged
+parsed_services = ParsedServiceCache(inventory_store.get_documents)
+# service_type -> reference data of the services its last get_services listing returned
+service_reference_data: Dict[str, LazyReferenceData] = {}
+
+# One shared poller for every order being waited on
+order_watcher = OrderWatcher(ENDPOINTS['get_instances'].path.format(org_id=ORG_ID))
+# instance_name -> its record from just before its last exec, the baseline for waiting on that order
+exec_baselines: Dict[str, Optional[Dict[str, Any]]] = {}
+
+# service_type -> design_id, from the parser registry
+SERVICE_DESIGN_IDS = {parser.service_type: parser.design_id for parser in PARSERS.values()}
+
 class servicesManager():
     def __init__(self):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         env_path = os.path.join(current_dir, '.env')
         load_dotenv(dotenv_path=env_path, override=True)
 
-    async def get_services(self, service_type:str):
+    async def get_services(self, service_type:str, customer_id: Optional[str] = None,
+                           status: Optional[str] = None, device: Optional[str] = None):
 
-        api_path = ENDPOINTS['get_instances'].path
-        api_path = api_path.format(org_id=ORG_ID)
-        logger.info(f"it's in service manager class {api_path}")
-        all_services = await utilityFunctions.make_api_request_sync(api_path, method="GET")
-        #logger.info(f"printing all services if it's successful {all_services}")
-        if service_type == "all_services":
-            return all_services
-        elif service_type == "evpn_vpws":
-            evpn_vpws_services = parse_evpn_vpws_json(all_services)
-            return evpn_vpws_services
-        elif service_type == "evpn_elan":
-            evpn_elan_services = parse_evpn_json(all_services)
-            return evpn_elan_services
-        elif service_type == "l2circuit":
-            l2circuit_services = parse_l2circuit_json(all_services)
-            return l2circuit_services
-        elif service_type == "l3vpn":
-            l3vpn_services = parse_l3vpn_json(all_services)
-            return l3vpn_services
-        else:
-            print(f"Service Type selected by LLM AGENT {service_type} is wrong.!!!")
+        logger.info(f"it's in service manager class, getting {service_type}")
+        predicates = {"customer_id": customer_id, "instance_status": status, "ne_id": device}
+        try:
+            await inventory_sync.ensure_fresh()
+            if service_type == "all_services":
+                return await asyncio.to_thread(inventory_store.query_instances, predicates)
+            elif service_type == "services_by_type":
+                # Every design parsed in a single pass over the instances
+                parsed = await asyncio.to_thread(_parse_stored, predicates)
+                by_type = {}
+                for design_id, (df, reference_data) in parsed.items():
+                    service_reference_data[PARSERS[design_id].service_type] = reference_data
+                    by_type[PARSERS[design_id].service_type] = df
+                return by_type
+            elif service_type in SERVICE_DESIGN_IDS:
+                predicates["design_id"] = design_id = SERVICE_DESIGN_IDS[service_type]
+                parsed = await asyncio.to_thread(_parse_stored, predicates, [design_id])
+                df, service_reference_data[service_type] = parsed[design_id]
+                # Reference data stays lazy, get_service_reference_data hands out one service at a time
+                return df
+            else:
+                print(f"Service Type selected by LLM AGENT {service_type} is wrong.!!!")
+        except RDRequestError as e:
+            logger.error(f"Fetching instances failed: {e}")
+            return e.error
         return []
     
+    async def get_service_reference_data(self, service_type: str, service_name: str):
+        """Reference data of one service: its network, service and status sections"""
+        if service_type not in SERVICE_DESIGN_IDS:
+            return {"error": f"Unknown service type {service_type}"}
+        reference_data = service_reference_data.get(service_type)
+        if reference_data is None or service_name not in reference_data:
+            # Not in the last listing, parse just this instance
+            design_id = SERVICE_DESIGN_IDS[service_type]
+            try:
+                await inventory_sync.ensure_fresh()
+            except RDRequestError as e:
+                logger.error(f"Fetching instances failed: {e}")
+                return e.error
+            parsed = await asyncio.to_thread(_parse_stored, {"instance_id": service_name, "design_id": design_id},
+                                             [design_id])
+            reference_data = parsed[design_id][1]
+        try:
+            # May load the instance from the inventory store
+            return await asyncio.to_thread(reference_data.__getitem__, service_name)
+        except KeyError:
+            return {"error": f"No {service_type} service named {service_name}"}
+
     async def get_service(self, instance_name:str, return_customer_id: bool=False):
         api_path = ENDPOINTS['get_instance'].path
         customer_id, instance_id = await self.get_cust_id_and_inst_id_by_inst_name(instance_name=instance_name)
         api_path = api_path.format(org_id=ORG_ID, customer_id=customer_id, instance_name=instance_name)
-        svc_to_delete = await utilityFunctions.make_api_request_sync(api_path, method="GET")
+        svc_to_delete = await utilityFunctions.make_api_request(api_path, method="GET")
         if return_customer_id == True:
             return svc_to_delete, customer_id
         else:
@@ -213,11 +243,12 @@ class servicesManager():
 
         api_path = ENDPOINTS['create_order'].path
         api_path = api_path.format(org_id=ORG_ID)
-        delete_order = await utilityFunctions.make_api_request_sync(api_path, method="POST", json_data=svc_to_delete)
+        delete_order = await utilityFunctions.make_api_request(api_path, method="POST", payload=svc_to_delete)
 
         api_path = ENDPOINTS['execute_order'].path
         api_path = api_path.format(org_id=ORG_ID, customer_id=customer_id, instance_name=instance_name)
-        svc_deleted = await utilityFunctions.make_api_request_sync(api_path, method="POST", json_data=svc_to_delete)
+        svc_deleted = await utilityFunctions.make_api_request(api_path, method="POST", payload=svc_to_delete)
+        inventory_sync.mark_stale()
         print(f"svc_deleted json {svc_deleted}")
 
         return svc_deleted
@@ -229,6 +260,7 @@ class servicesManager():
         try:
             logger.info(f"****** About to create serviceConfigGenerator instance")
             scg = serviceConfigGenerator()
+            await scg.load_rd_data()
             logger.info(f"****** serviceConfigGenerator instance created successfully")
             
             logger.info(f"****** About to call fill_fields")
@@ -243,6 +275,17 @@ class servicesManager():
             logger.error(f"****** Full traceback: {traceback.format_exc()}")
             raise e
     
+    async def bulk_create_services(self, manifest_filepath: str, output_dir: str = "payload"):
+        logger.info(f"****** Bulk generating services from manifest {manifest_filepath}")
+        if not Path(manifest_filepath).exists():
+            return {"error": f"Manifest file not found: {manifest_filepath}"}
+
+        scg = serviceConfigGenerator()
+        await scg.load_rd_data()
+        # Generation is CPU-bound, keep it off the event loop
+        return await asyncio.to_thread(scg.generate_services_from_manifest,
+                                       manifest_path=manifest_filepath, output_dir=output_dir)
+    
     async def create_customer(self, customer_name: str, customer_ref_no: Optional[str], 
                                customer_description: Optional[str]):
         logger.info(f"****** I am trying to create customer")
@@ -253,13 +296,23 @@ class servicesManager():
         payload = {"name":customer_name, "reference_number": customer_ref_no if customer_ref_no else "", 
                    "description": customer_description if customer_description else ""}
 
-        cust_create = await utilityFunctions.make_api_request_sync(api_path, method=method, payload=payload)
+        cust_create = await utilityFunctions.make_api_request(api_path, method=method, payload=payload)
+        reference_data_store.invalidate("customers")
 
         if "error" in cust_create:
             return f"Customer {customer_name} creation Failed"
         else:
             return f"Customer {customer_name} created Successfully"
         
+    async def _submit_order(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the service order in RD from a payload, returns the RD response"""
+        api_path = ENDPOINTS['create_order'].path
+        method = ENDPOINTS['create_order'].method
+        api_path = api_path.format(org_id=ORG_ID)
+        response = await utilityFunctions.make_api_request(api_path, method=method, payload=payload)
+        inventory_sync.mark_stale()
+        return response
+
     async def upload_service(self, json_filename: str):
         logger.info(f"****** I am trying to upload service from file: {json_filename}")
         
@@ -282,13 +335,8 @@ class servicesManager():
             # Extract instance name for logging/response
             instance_name = payload.get('instance_id', 'Unknown')
             
-            # API configuration
-            api_path = ENDPOINTS['create_order'].path
-            method = ENDPOINTS['create_order'].method
-            api_path = api_path.format(org_id=ORG_ID)
-            
             # Make API request with loaded payload
-            svc_to_upload = await utilityFunctions.make_api_request_sync(api_path, method=method, payload=payload)
+            svc_to_upload = await self._submit_order(payload)
 
             if "error" in svc_to_upload:
                 error_msg = svc_to_upload.get('error', 'Unknown error')
@@ -305,253 +353,228 @@ class servicesManager():
             logger.error(f"Error uploading service from {json_filename}: {e}")
             return f"Error uploading service: {str(e)}"
         
-    async def update_placements(self, instance_name:str):
+    async def _place_resources(self, instance_name: str) -> Dict[str, Any]:
+        """Run fhplace (update placements) for an instance, returns the RD response"""
         api_path = ENDPOINTS['update_placements'].path
         method = ENDPOINTS['update_placements'].method
-        customer_id, instance_id = await self.get_cust_id_and_inst_id_by_inst_name(instance_name=instance_name)
+        ids = await self.get_cust_id_and_inst_id_by_inst_name(instance_name=instance_name)
+        if not isinstance(ids, list):
+            return {"error": f"Instance {instance_name} not found in Routing Director"}
+        customer_id, instance_id = ids
         api_path = api_path.format(org_id=ORG_ID, customer_id=customer_id, instance_name=instance_name)
-        svc_to_validate = await utilityFunctions.make_api_request_sync(api_path, method=method)
-        if "error" in svc_to_validate:
-            return f"Resource Validation for Service {instance_name} Failed"
-        else:
-            return "Resource Validation/Update Placements for Service {instance_name} is successful"
-    
-    async def deploy_service(self, instance_name:str):
+        return await utilityFunctions.make_api_request(api_path, method=method)
+
+    async def _execute_order(self, instance_name: str) -> Dict[str, Any]:
+        """Execute the uploaded order of an instance, returns the RD response"""
         api_path = ENDPOINTS['execute_order'].path
         method = ENDPOINTS['execute_order'].method
-        customer_id, instance_id = await self.get_cust_id_and_inst_id_by_inst_name(instance_name=instance_name)
+        ids = await self.get_cust_id_and_inst_id_by_inst_name(instance_name=instance_name)
+        if not isinstance(ids, list):
+            return {"error": f"Instance {instance_name} not found in Routing Director"}
+        customer_id, instance_id = ids
         api_path = api_path.format(org_id=ORG_ID, customer_id=customer_id, instance_name=instance_name)
-        svc_to_deploy = await utilityFunctions.make_api_request_sync(api_path, method=method)
+        # Whoever waits on this order must not take the previous order's result for it
+        try:
+            exec_baselines[instance_name] = await order_watcher.current_state(instance_name)
+        except RDRequestError as e:
+            logger.warning(f"Could not read order state of {instance_name} before exec: {e}")
+            exec_baselines.pop(instance_name, None)
+        response = await utilityFunctions.make_api_request(api_path, method=method)
+        inventory_sync.mark_stale()
+        return response
 
-        if "error" in svc_to_deploy:
-            return f"Service {instance_name} deployment failed"
+    async def update_placements(self, instance_name:str):
+        svc_to_validate = await self._place_resources(instance_name=instance_name)
+        if "error" in svc_to_validate:
+            return f"Resource Validation for Service {instance_name} Failed"
         else:
-            return f"Service {instance_name} deployed successfully"
-
+            return f"Resource Validation/Update Placements for Service {instance_name} is successful"
     
+    async def _execute_and_wait(self, instance_name: str, timeout: float = None) -> Dict[str, Any]:
+        """Execute the order of an instance and wait for its workflow to finish"""
+        response = await self._execute_order(instance_name=instance_name)
+        if "error" in response:
+            return response
+        result = await self._wait_for_order(instance_name, timeout=timeout)
+        if result["status"] != "completed":
+            return {"error": f"Order {result['status']} ({result['order_status']}, {result['workflow_progress']})",
+                    "order": result}
+        return result
+
+    async def deploy_service(self, instance_name:str, wait_for_completion: bool = False, timeout: float = None):
+        if not wait_for_completion:
+            svc_to_deploy = await self._execute_order(instance_name=instance_name)
+
+            if "error" in svc_to_deploy:
+                return f"Service {instance_name} deployment failed"
+            else:
+                return f"Service {instance_name} deployed successfully"
+
+        result = await self._execute_and_wait(instance_name=instance_name, timeout=timeout)
+        if "error" in result:
+            return f"Service {instance_name} deployment failed: {result['error']}"
+        return (f"Service {instance_name} deployed successfully "
+                f"({result['workflow_progress']}, {result['elapsed_seconds']}s)")
+
+    async def _wait_for_order(self, instance_name: str, timeout: float = None) -> Dict[str, Any]:
+        """Wait on the order last executed for an instance, against its pre-exec baseline"""
+        result = await order_watcher.wait(instance_name, timeout=timeout, baseline=exec_baselines.get(instance_name))
+        if result["status"] != "timeout":
+            exec_baselines.pop(instance_name, None)
+        return result
+
+    async def wait_for_deployment(self, instance_name: str, timeout: float = None) -> Dict[str, Any]:
+        """Wait for the current order of an instance to complete, fail or time out"""
+        return await self._wait_for_order(instance_name, timeout=timeout)
+
+    async def run_lifecycle_pipeline(self, items: List[str], upload_concurrency: int = None,
+                                     validate_concurrency: int = None, deploy_concurrency: int = None,
+                                     deploy: bool = True, wait_for_completion: bool = False,
+                                     order_timeout: float = None) -> Dict[str, Any]:
+        """Upload -> validate (fhplace) -> deploy (exec) many services concurrently
+
+        Each item moves through the stages on its own, so one item can be deploying
+        while others are still uploading; each stage has its own concurrency bound.
+        An item that fails a stage stops there and the rest carry on.
+
+        Args:
+            items: payload json files (name in payload/ or a path) to upload first,
+                or names of instances already in Routing Director
+            upload_concurrency / validate_concurrency / deploy_concurrency:
+                max in-flight requests per stage, defaults from .env
+            deploy: False to stop after validation
+            wait_for_completion: a deploy only succeeds once its order workflow
+                completes, polled through the shared order watcher
+            order_timeout: seconds to wait for each order, defaults from .env
+
+        Returns:
+            Aggregate report with per-item status
+        """
+        stage_limits = {
+            "upload": asyncio.Semaphore(upload_concurrency or RD_PIPELINE_UPLOAD_CONCURRENCY),
+            "validate": asyncio.Semaphore(validate_concurrency or RD_PIPELINE_VALIDATE_CONCURRENCY),
+            "deploy": asyncio.Semaphore(deploy_concurrency or RD_PIPELINE_DEPLOY_CONCURRENCY),
+        }
+        started = time.monotonic()
+
+        async def run_stage(record: Dict[str, Any], stage: str, action) -> bool:
+            async with stage_limits[stage]:
+                try:
+                    response = await action()
+                except Exception as e:
+                    response = {"error": str(e)}
+            if isinstance(response, dict) and "error" in response:
+                record["stages"][stage] = "failed"
+                record.update(status="failed", failed_stage=stage, error=response["error"])
+                return False
+            record["stages"][stage] = "ok"
+            return True
+
+        async def run_item(item: str) -> Dict[str, Any]:
+            record = {"item": item, "instance_name": None, "status": "pending", "stages": {}}
+            payload_path = self._resolve_payload_path(item)
+            if payload_path is not None:
+                try:
+                    with open(payload_path, 'r') as f:
+                        payload = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    record.update(status="failed", failed_stage="upload", error=f"Unreadable payload: {e}")
+                    return record
+                record["instance_name"] = payload.get('instance_id')
+                if not await run_stage(record, "upload", lambda: self._submit_order(payload)):
+                    return record
+            else:
+                record["instance_name"] = item
+
+            instance_name = record["instance_name"]
+            if not await run_stage(record, "validate", lambda: self._place_resources(instance_name)):
+                return record
+            if deploy and not await run_stage(record, "deploy", lambda: self._execute_order(instance_name)):
+                return record
+            if deploy and wait_for_completion:
+                # Waiting holds no stage slot, the poller covers every waiting item at once
+                try:
+                    response = await self._wait_for_order(instance_name, timeout=order_timeout)
+                except Exception as e:
+                    response = {"status": "failed", "error": str(e)}
+                record["order"] = response
+                if response["status"] != "completed":
+                    record["stages"]["complete"] = response["status"]
+                    record.update(status="failed", failed_stage="complete",
+                                  error=response.get("error") or f"Order {response['status']}")
+                    return record
+                record["stages"]["complete"] = "ok"
+            record["status"] = "succeeded"
+            return record
+
+        results = await asyncio.gather(*(run_item(item) for item in items))
+
+        failed_stages = {}
+        for record in results:
+            if record["status"] == "failed":
+                failed_stages[record["failed_stage"]] = failed_stages.get(record["failed_stage"], 0) + 1
+        succeeded = sum(1 for record in results if record["status"] == "succeeded")
+        report = {
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "failed_by_stage": failed_stages,
+            "elapsed_seconds": round(time.monotonic() - started, 2),
+            "items": results
+        }
+        logger.info(f"Lifecycle pipeline finished: {succeeded}/{len(results)} succeeded in {report['elapsed_seconds']}s")
+        return report
+
+    @staticmethod
+    def _resolve_payload_path(item: str) -> Optional[Path]:
+        """Payload file for a pipeline item, None if the item is an instance name"""
+        if not item.lower().endswith(".json"):
+            return None
+        for candidate in (Path("payload") / item, Path(item)):
+            if candidate.exists():
+                return candidate
+        return Path("payload") / item
+
     async def get_cust_id_and_inst_id_by_inst_name(self, instance_name:str):
-        all_services = await self.get_services("all_services")
-        return next(
-            (
-                [instance['customer_id'], instance['instance_id']]
-                for instance in all_services
-                if instance['instance_id'] == instance_name
-            ), 
-            "Provide Instance Name is not available"
-        )
+        try:
+            await inventory_sync.ensure_fresh()
+            entry = await asyncio.to_thread(inventory_store.lookup_instance, instance_name)
+            if entry is None:
+                # The instance may be newer than the last sync, fetch only that one
+                await inventory_sync.refresh_instances([instance_name])
+                entry = await asyncio.to_thread(inventory_store.lookup_instance, instance_name)
+        except RDRequestError as e:
+            logger.error(f"Instance lookup for {instance_name} failed: {e}")
+            entry = None
+        if entry is None:
+            return "Provide Instance Name is not available"
+        return list(entry)
     
-    async def discover_l2vpn_bgp_signaling_services(router_list_filepath: str, output_filepath: str, 
+    async def discover_l2vpn_bgp_signaling_services(self, router_list_filepath: str, output_filepath: str,
                           username: str = 'jcluser', password: str = 'Juniper!1',
-                          host: str = '66.129.234.204'):
+                          host: str = '66.129.234.204', concurrency: Optional[int] = None,
+                          output_format: Optional[str] = None, run_id: Optional[str] = None):
         """
         Discover L2VPN bgp signaling services from Juniper routers and save to Excel
         
         Args:
             router_list_filepath: Path to Excel file containing router list with 'Port' column
-            output_filepath: Path for output Excel file
+                (and an optional 'Host' column for routers behind another SSH host)
+            output_filepath: Path for output Excel file (or a .csv/.jsonl/.parquet path to skip the workbook)
             username: SSH username (default: 'jcluser')
             password: SSH password (default: 'Juniper!1')
             host: SSH host IP (default: '66.129.234.204')
+            concurrency: Routers discovered at once, defaults to RD_DISCOVERY_CONCURRENCY
+            output_format: Format rows are streamed in (csv, jsonl or parquet), defaults to RD_DISCOVERY_OUTPUT_FORMAT
+            run_id: ID of an earlier run (from its summary) to resume, skipping the routers it already discovered
             
         Returns:
             dict: Summary of discovery results
         """
-        
-        # Validate input file exists
-        if not Path(router_list_filepath).exists():
-            raise FileNotFoundError(f"Router list file not found: {router_list_filepath}")
-        
-        # Load Excel file with IP addresses
-        try:
-            df = pd.read_excel(router_list_filepath, engine='openpyxl')
-            if 'Port' not in df.columns:
-                raise ValueError("Excel file must contain 'Port' column")
-        except Exception as e:
-            raise Exception(f"Error reading router list file: {str(e)}")
-
-        hardware_data = []
-        l2vpn_data = []
-        successful_connections = 0
-        failed_connections = 0
-        connection_errors = []
-
-        print(f"Starting discovery for {len(df)} routers...")
-        
-        for index, row in df.iterrows():
-            sshport = row['Port']
-            print(f"\nConnecting to {host} port:{sshport}... ({index+1}/{len(df)})")
-            
-            try:
-                with manager.connect(
-                    host=host,
-                    port=sshport,
-                    username=username,
-                    password=password,
-                    hostkey_verify=False,
-                    device_params={'name': 'junos'},
-                    allow_agent=False,
-                    look_for_keys=False
-                ) as m:
-
-                    # --- Hardware Info ---
-                    version_reply = m.command('show version | display xml', format='xml')
-                    version_root = ET.fromstring(str(version_reply))
-
-                    hostname = version_root.findtext('.//host-name')
-                    product_model = version_root.findtext('.//product-model')
-                    junos_version = version_root.findtext('.//junos-version')
-
-                    interface_reply = m.command('show configuration interfaces lo0.0 family inet |display xml', format='xml')
-                    interface_root = ET.fromstring(str(interface_reply))
-
-                    lo0_ip = None
-                    for af in interface_root.findall('.//family'):
-                        af_name = af.findtext('address')
-                        lo0_ip = af.findtext('.//name')
-                        break
-
-                    hardware_data.append({
-                        'hostname': hostname,
-                        'product-model': product_model,
-                        'junos-version': junos_version,
-                        'lo0.0 inet ip': lo0_ip
-                    })
-                    print(f' ### Lo0 IP = {lo0_ip} ###')
-                    print("####### Finish Extract Hardware Info ######")
-
-                    # --- L2VPN Info ---
-                    l2vpn_reply = m.command('show l2vpn connection | display xml', format='xml')
-                    l2vpn_root = ET.fromstring(str(l2vpn_reply))
-
-                    for conn in l2vpn_root.findall('.//instance'):
-                        instance_name = conn.findtext('.//instance-name')
-                        local_site = conn.findtext('.//local-site-id')
-
-                        for rpe in conn.findall('.//connection'):
-                            remote_pe = rpe.findtext('remote-pe')
-                            conn_status = rpe.findtext('connection-status')
-                            interface_name = rpe.findtext('.//local-interface/interface-name')
-                            interface_status = rpe.findtext('.//local-interface/interface-status')
-
-                            entry = {
-                                'hostname': hostname,
-                                'instance-name': instance_name,
-                                'Instance Type': None,
-                                'local-site': local_site,
-                                'connection-status': conn_status,
-                                'remote-pe': remote_pe,
-                                'interface-name': interface_name,
-                                'interface id': None,
-                                'unit id': None,
-                                'IFD description': None,
-                                'Unit Description': None,
-                                'interface-status': interface_status,
-                                'Route Target': None,
-                                'outer-vlan': None,
-                                'inner-vlan': None   
-                            }
-
-                            # --- VLAN Parsing ---
-                            print("####### Start VLAN PARSING #########")
-                            try:
-                                if conn_status == "Up":
-                                    ifd, unit_id = interface_name.split('.')
-                                    entry['interface id'] = ifd
-                                    entry['unit id'] = unit_id
-                                    config_reply = m.command('show configuration interfaces | display xml |display inheritance no-comments', format='xml')
-                                    config_root = ET.fromstring(str(config_reply))
-
-                                    for iface in config_root.findall('.//interface'):
-                                        name = iface.findtext('name')
-                                        if name == ifd:
-                                            desc = iface.findtext('description')
-                                            print(f"IFD Description = {desc}")
-                                            entry['IFD description'] = desc
-                                            for unit in iface.findall('.//unit'):
-                                                unit_name = unit.findtext('name')
-                                                if unit_name == unit_id:
-                                                    unit_desc = unit.findtext('description')
-                                                    print(f'Unit: {unit_name} description is {unit_desc}')
-                                                    entry['Unit Description'] = unit_desc
-                                                    vlan_tags = unit.find('.//vlan-tags')
-                                                    vlan_id = unit.findtext('.//vlan-id')
-
-                                                    if vlan_tags is not None:
-                                                        outer = vlan_tags.findtext('outer')
-                                                        inner = vlan_tags.findtext('inner')
-                                                        if outer and inner:
-                                                            entry['outer-vlan'] = outer
-                                                            entry['inner-vlan'] = inner
-                                                        elif outer and not inner:
-                                                            entry['outer-vlan'] = outer
-                                                            entry['inner-vlan'] = '0'
-                                                        else:
-                                                            entry['outer-vlan'] = entry['inner-vlan'] = 'config error'
-                                                    elif vlan_id:
-                                                        entry['outer-vlan'] = vlan_id
-                                                        entry['inner-vlan'] = '0'
-                                                    else:
-                                                        entry['outer-vlan'] = entry['inner-vlan'] = '0'
-                                else:
-                                    entry['outer-vlan'] = 'None'
-                                    entry['inner-vlan'] = 'None'
-
-                            except Exception as e:
-                                print(f"Error parsing VLAN config for {interface_name}: {e}")
-                                entry['outer-vlan'] = entry['inner-vlan'] = 'parse error'
-
-                            l2vpn_data.append(entry)
-
-                    # --- Routing Instances for Route Target ---
-                    routing_reply = m.command('show configuration routing-instances | display xml |display inheritance no-comments', format='xml')
-                    routing_root = ET.fromstring(str(routing_reply))
-
-                    for instance in routing_root.findall('.//instance'):
-                        name = instance.findtext('name')
-                        community = instance.findtext('.//community')
-                        instance_type = instance.findtext('instance-type')
-                        print(f'### Instance type = {instance_type} ###')
-                        for entry in l2vpn_data:
-                            if entry['hostname'] == hostname and entry['instance-name'] == name:
-                                entry['Route Target'] = community
-                                entry['Instance Type'] = instance_type
-
-                    successful_connections += 1
-                    print(f"✅ Successfully processed {hostname}")
-
-            except Exception as e:
-                failed_connections += 1
-                error_msg = f"Failed to connect to {host}:{sshport}: {e}"
-                print(error_msg)
-                connection_errors.append(error_msg)
-
-        # Save to Excel
-        try:
-            # Create output directory if it doesn't exist
-            output_path = Path(output_filepath)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with pd.ExcelWriter(output_filepath, engine='openpyxl') as writer:
-                pd.DataFrame(hardware_data).to_excel(writer, sheet_name='Hardware', index=False)
-                pd.DataFrame(l2vpn_data).to_excel(writer, sheet_name='L2VPN', index=False)
-
-            print(f"\n✅ Data has been written to {output_filepath}")
-            
-        except Exception as e:
-            raise Exception(f"Error writing output file: {str(e)}")
-
-        # Return summary
-        summary = {
-            'total_routers': len(df),
-            'successful_connections': successful_connections,
-            'failed_connections': failed_connections,
-            'hardware_records': len(hardware_data),
-            'l2vpn_records': len(l2vpn_data),
-            'output_file': output_filepath,
-            'connection_errors': connection_errors
-        }
-        
-        return summary
+        return await brownfield_discovery.discover_l2vpn_bgp_signaling_services(
+            router_list_filepath=router_list_filepath, output_filepath=output_filepath,
+            username=username, password=password, host=host, concurrency=concurrency,
+            output_format=output_format, run_id=run_id)
 
 if __name__ == "__main__":
     # Setup Logging Configs
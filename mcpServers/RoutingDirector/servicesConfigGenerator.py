@@ -6,6 +6,9 @@ import copy
 import httpx
 import base64
 import random
+import argparse
+import time
+import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -13,7 +16,9 @@ from dotenv import load_dotenv
 from collections import defaultdict
 from typing import Dict, List, Any, Optional, Tuple, Callable
 from urllib.parse import urlencode
-from helper_fns import clean_string
+from helper_fns import clean_string, read_service_manifest, split_manifest_field
+from rd_client import get_rd_client, env_float
+from service_templates import load_compiled_template, format_path, structural_copy
 
 # Load environment variables
 load_dotenv(override=True)
@@ -23,20 +28,53 @@ logger = logging.getLogger(__name__)
 BASE_URL = os.getenv('BASE_URL', "https://66.129.234.204:48800")
 ORG_ID = os.getenv('ORG_ID', "0eaf8613-632d-41d2-8de4-c2d242325d7e")
 
+# The per-hostname site entry inside the l2vpn service templates
+SITE_TEMPLATE_PATH = ('l2vpn_svc', 'sites', 'site', 0)
+
+# Bulk manifest interface column -> form data key suffix used by _complete_json_with_form_data
+MANIFEST_INTERFACE_FIELDS = {
+    "eth_inf_type": "eth_intf_type",
+    "cvlan_id": "cvlan_id",
+    "speed": "speed",
+    "lldp": "lldp",
+    "oam_enabled": "oam",
+}
+
 class ParagonAuth:
-    """Handle authentication for Routing Director"""
+    """Handle authentication for Routing Director
+
+    RD_AUTH_MODE selects how requests are authenticated:
+        basic - Basic credentials on every request (default)
+        token - Bearer token fetched once, cached until shortly before expiry and
+                refreshed in the background; falls back to Basic if no token can be obtained,
+                and waits RD_TOKEN_RETRY_BACKOFF seconds before asking for one again
+    """
     
     def __init__(self):
         self.username = os.getenv('USERNAME')
         self.password = os.getenv('PASSWORD')
         self.token = None
         self.token_expiry = None
+        self.auth_mode = os.getenv('RD_AUTH_MODE', 'basic').strip().lower()
+        self.token_endpoint = os.getenv('RD_TOKEN_API_ENDPOINT', '/active-assurance/api/v2/auth/token')
+        self.token_ttl = env_float('RD_TOKEN_TTL', 3600.0)
+        self.token_refresh_margin = env_float('RD_TOKEN_REFRESH_MARGIN', 60.0)
+        self.token_retry_backoff = env_float('RD_TOKEN_RETRY_BACKOFF', 30.0)
+        self._token_retry_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
         
         if not self.username or not self.password:
             logger.error("USERNAME and PASSWORD must be set in .env file")
             raise ValueError("Missing credentials in .env file")
+
+        if self.auth_mode not in ("basic", "token"):
+            logger.warning(f"Unknown RD_AUTH_MODE '{self.auth_mode}', using basic")
+            self.auth_mode = "basic"
+
+        # Credentials don't change for the life of the process, encode them once
+        self._basic_auth_header = self.get_basic_auth_header()
         
-        logger.info(f"Authentication configured for user: {self.username}")
+        logger.info(f"Authentication configured for user: {self.username} (mode: {self.auth_mode})")
     
     def get_basic_auth_header(self) -> str:
         """Generate Basic Authentication header"""
@@ -47,35 +85,63 @@ class ParagonAuth:
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
         return f"Basic {encoded_credentials}"
 
-    def get_auth_token(self) -> Optional[str]:
-        """Get authentication token from API (if token-based auth is used)"""
+    async def get_auth_token(self) -> Optional[str]:
+        """Get authentication token from API and cache it with its expiry"""
         try:
-            auth_url = f"{BASE_URL}/active-assurance/api/v2/auth/token"
+            auth_url = f"{BASE_URL}{self.token_endpoint}"
             
             auth_payload = {
                 "username": self.username,
                 "password": self.password
             }
             
-            with httpx.Client(verify=False, timeout=30.0) as client:
-                response = client.post(
-                    auth_url,
-                    json=auth_payload,
-                    headers={"Content-Type": "application/json"}
-                )
+            client = get_rd_client()
+            response = await client.post(
+                auth_url,
+                json=auth_payload,
+                headers={"Content-Type": "application/json"}
+            )
+            
+            if response.status_code == 200:
+                token_data = response.json()
+                self.token = token_data.get('access_token')
+                expires_in = token_data.get('expires_in') or self.token_ttl
+                self.token_expiry = time.time() + float(expires_in)
+                self._token_retry_at = 0.0
+                logger.info("Token authentication successful")
+                return self.token
+            else:
+                logger.error(f"Token authentication failed: {response.status_code}")
                 
-                if response.status_code == 200:
-                    token_data = response.json()
-                    self.token = token_data.get('access_token')
-                    logger.info("Token authentication successful")
-                    return self.token
-                else:
-                    logger.error(f"Token authentication failed: {response.status_code}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Token authentication error: {e}")
-            return None
+
+        # Requests use Basic meanwhile instead of each paying for another failing token call
+        self._token_retry_at = time.time() + self.token_retry_backoff
+        return None
+
+    def _token_backoff(self) -> bool:
+        """Whether the last token request failed less than RD_TOKEN_RETRY_BACKOFF seconds ago"""
+        return time.time() < self._token_retry_at
+
+    async def refresh_token(self) -> Optional[str]:
+        """Refresh the token, sharing one in-flight request across concurrent callers"""
+        if self._token_backoff():
+            return self.token if self._token_valid() else None
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self.get_auth_token())
+            self._refresh_task = task
+        # shield so a cancelled caller doesn't cancel the refresh the others wait on
+        return await asyncio.shield(task)
+
+    def invalidate_token(self):
+        """Drop the cached token, e.g. after RD answered 401"""
+        self.token = None
+        self.token_expiry = None
+
+    def _token_valid(self) -> bool:
+        return self.token is not None and self.token_expiry is not None and time.time() < self.token_expiry
     
     def get_headers(self, use_basic_auth: bool = True) -> Dict[str, str]:
         """Get headers with authentication"""
@@ -86,13 +152,27 @@ class ParagonAuth:
         
         if use_basic_auth:
             # Use Basic Authentication
-            headers["Authorization"] = self.get_basic_auth_header()
+            headers["Authorization"] = self._basic_auth_header
         elif self.token:
             # Use Bearer token if available
             headers["Authorization"] = f"Bearer {self.token}"
         
         return headers
 
+    async def get_request_headers(self) -> Dict[str, str]:
+        """Get headers for a request according to RD_AUTH_MODE"""
+        if self.auth_mode != "token":
+            return self.get_headers(use_basic_auth=True)
+
+        if not self._token_valid():
+            await self.refresh_token()
+        elif self.token_expiry - time.time() < self.token_refresh_margin:
+            # Still valid, refresh ahead of expiry without holding up this request
+            if (self._refresh_task is None or self._refresh_task.done()) and not self._token_backoff():
+                self._refresh_task = asyncio.create_task(self.get_auth_token())
+
+        return self.get_headers(use_basic_auth=not self._token_valid())
+
 # Initialize authentication
 try:
     auth = ParagonAuth()
@@ -100,44 +180,52 @@ except ValueError as e:
     logger.error(f"Authentication initialization failed: {e}")
     auth = None
 
-def make_api_request_sync(endpoint: str, method: str = "GET", json_data: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Make HTTP request to the API with authentication (synchronous version)"""
+async def make_api_request(endpoint: str, method: str = "GET", json_data: Dict[str, Any] = None,
+                           params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Make HTTP request to the API with authentication over the shared pooled client"""
     if auth is None:
         return {"error": "Authentication not configured. Check .env file."}
     
+    if method not in ("GET", "POST", "DELETE"):
+        return {"error": f"Unsupported HTTP method: {method}"}
+
     try:
         url = f"{BASE_URL}{endpoint}"
         logger.info("url ---> {}".format(url))
         
-        headers = auth.get_headers(use_basic_auth=True)
+        client = get_rd_client()
+        headers = await auth.get_request_headers()
+        response = await client.request(method, url, headers=headers, params=params,
+                                        json=json_data if json_data else None)
+
+        if response.status_code == 401 and auth.auth_mode == "token":
+            # Token may have been revoked or expired early, refresh and retry once
+            logger.info("Token rejected by Routing Director, refreshing and retrying")
+            if headers.get("Authorization") == f"Bearer {auth.token}":
+                # Another caller may already have replaced the rejected token
+                auth.invalidate_token()
+            if not auth._token_valid():
+                await auth.refresh_token()
+            headers = await auth.get_request_headers()
+            response = await client.request(method, url, headers=headers, params=params,
+                                            json=json_data if json_data else None)
+        response.raise_for_status()
         
-        # Use httpx sync client instead of async
-        with httpx.Client(verify=False, timeout=60.0) as client:
-            if method == "GET":
-                response = client.get(url, headers=headers)
-            elif method == "POST" or "DELETE":
-                if json_data:
-                    response = client.post(url, headers=headers, json=json_data)
-                else:
-                    response = client.post(url, headers=headers)
-            else:
-                return {"error": f"Unsupported HTTP method: {method}"}
-            response.raise_for_status()
-            
-            if response.content:
-                return response.json()
-            else:
-                return {"success": True, "message": "Request completed successfully"}
+        if response.content:
+            return response.json()
+        else:
+            return {"success": True, "message": "Request completed successfully"}
             
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 401:
             logger.error("Authentication failed - check username/password in .env")
-            return {"error": "Authentication failed - invalid credentials"}
+            return {"error": "Authentication failed - invalid credentials", "status_code": 401}
         elif e.response.status_code == 403:
-            return {"error": "Access forbidden - insufficient permissions"}
+            return {"error": "Access forbidden - insufficient permissions", "status_code": 403}
         else:
             logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
+            return {"error": f"HTTP {e.response.status_code}: {e.response.text}",
+                    "status_code": e.response.status_code}
         
     except Exception as e:
         logger.error(f"API request failed: {e}")
@@ -171,34 +259,19 @@ class serviceConfigGenerator():
         # Store form handler callback for GUI communication
         self.form_handler = form_handler
 
-        #Get Updated Customers & Devices Data from Routing Director
-        CUSTOMER_API_ENDPOINT = os.getenv('CUSTOMERS_API_ENDPOINT')
-        DEVICE_API_ENDPOINT = os.getenv('DEVICES_API_ENDPOINT')
-        SITES_API_ENDPOINT = os.getenv('SITES_API_ENDPOINT')
-        TOPO_API_ENDPOINT = os.getenv('TOPO_API_ENDPOINT')
-        TOPO_FILE_NAME = os.getenv('TOPO_FILE_NAME')
-        RD_RT_RESOURCES = os.getenv('RD_RT_RESOURCES')
-        
-        #Get customers Data
-        api_path = CUSTOMER_API_ENDPOINT.format(org_id=ORG_ID)
-        self.rd_customers_data = make_api_request_sync(api_path, method="GET")
-
-        #Get Devices Data
-        api_path = DEVICE_API_ENDPOINT.format(org_id=ORG_ID)
-        self.rd_devices_data = make_api_request_sync(api_path, method="GET")
-
-        #Get Site Details Data
-        api_path = SITES_API_ENDPOINT.format(org_id=ORG_ID)
-        self.site_details = make_api_request_sync(api_path, method="GET")
-
-        #Get Topo Details Data
-        self.infra_id = self.get_customer_id('network-operator')
-        api_path = TOPO_API_ENDPOINT.format(org_id=ORG_ID, infra_id=self.infra_id, topo_file_name=TOPO_FILE_NAME)
-        self.topo_details = make_api_request_sync(api_path, method="GET")
+        # (generated JSON, its unfilled placeholder slots) from the last generation
+        self._slot_manifest = None
 
-        #Get RD RT Resource Details Data
-        api_path = TOPO_API_ENDPOINT.format(org_id=ORG_ID, infra_id=self.infra_id, topo_file_name=RD_RT_RESOURCES)
-        self.rd_rt_details = make_api_request_sync(api_path, method="GET")
+        # Routing Director data is fetched asynchronously in load_rd_data()
+        self.rd_customers_data = []
+        self.rd_devices_data = {'devices': []}
+        self.site_details = []
+        self.topo_details = {}
+        self.rd_rt_details = {}
+        self.infra_id = None
+        self.customers_index = {}
+        self.devices_index = {}
+        self.sites_index = {}
 
         self.service_designs = {
             "l2circuit": {
@@ -219,35 +292,54 @@ class serviceConfigGenerator():
             "evpn_vpws": "services/evpn_vpws_template.json"
         }
 
-    def _generate_evpn_vpws_json(self, service_type: str, customer_name: str, hostnames: list):
+    async def load_rd_data(self):
+        """Get Customers, Devices, Sites & Resource Data of Routing Director from the
+        process-wide reference data cache (fetched concurrently on first use)"""
+        # Imported here as reference_data builds on make_api_request from this module
+        from reference_data import reference_data_store
+
+        rd_data = await reference_data_store.get_all()
+        self.rd_customers_data = rd_data['customers']
+        self.rd_devices_data = rd_data['devices']
+        self.site_details = rd_data['sites']
+        self.infra_id = rd_data['infra_id']
+        self.topo_details = rd_data['topo']
+        self.rd_rt_details = rd_data['rt_resources']
+        self.customers_index = rd_data['customers_index']
+        self.devices_index = rd_data['devices_index']
+        self.sites_index = rd_data['sites_index']
+
+    def _generate_evpn_vpws_json(self, service_type: str, customer_name: str, hostnames: list,
+                                 instance_identifier: Optional[str] = None):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         template_filepath = os.path.join(current_dir, self.template_files[service_type])
 
-        with open(template_filepath, 'r') as f:
-            template = json.load(f)
-        filled_template = copy.deepcopy(template)
+        # Compiled once per template file, recompiled only if the file changes
+        template = load_compiled_template(template_filepath)
+        site_template = template.subtemplate(SITE_TEMPLATE_PATH)
 
         #Fetch Customer ID
         customer_id = self.get_customer_id(customer_name)
         
         #generate some random values for globla fields
         design_identifier = self.service_designs[service_type]["design_id"]
-        instance_identifier = f"{service_type}_{random.randint(10000, 99999)}"
+        if instance_identifier is None:
+            instance_identifier = f"{service_type}_{random.randint(10000, 99999)}"
         clean_instance_identifier = clean_string(input_string=instance_identifier)
         logger.info(f"###### {clean_instance_identifier}")
         instance_uuid = str(uuid.uuid4())
 
-        filled_template = utilityFunctions._replace_in_dict(obj=filled_template, replacements={
+        values = {
             "{CUSTOMER_UUID}": customer_id,
             "{DESIGN_IDENTIFIER}": design_identifier,
             "{INSTANCE_IDENTIFIER}": clean_instance_identifier,
             "{INSTANCE_UUID}": instance_uuid
-        })
-
-        logger.info(f"###### {filled_template}")
+        }
+        # Sites are rebuilt from the site sub-template below, one per hostname
+        sites_path = SITE_TEMPLATE_PATH[:-1]
+        filled_template, missing_fields = template.instantiate(values, omit=(sites_path,))
 
-        base_site = filled_template['l2vpn_svc']['sites']['site'][0]
-        filled_template['l2vpn_svc']['sites']['site'] = []
+        logger.debug(f"###### {filled_template}")
 
         #Find how many nodes in this service
         n_nodes = len(hostnames)
@@ -258,13 +350,11 @@ class serviceConfigGenerator():
             setattr(self, f"h{i}_device_id", device_id)
             setattr(self, f"h{i}_site_id", site_id)
             site_id = getattr(self, f"h{i}_site_id")
-            site_country_code = self.get_site_details(site_id)['country_code']
-            site_name = self.get_site_details(site_id)['name']
+            site_details = self.get_site_details(site_id)
+            site_country_code = site_details['country_code']
+            site_name = site_details['name']
             setattr(self, f"h{i}_site_cc", site_id)
 
-            #Site Creation
-            new_site = copy.deepcopy(base_site)
-            
             #Create Counters for Country (Sites) and Links
             cc_site_counter = defaultdict(int)
             country_count = cc_site_counter[site_country_code]+1
@@ -274,24 +364,32 @@ class serviceConfigGenerator():
 
             pop_name = f"{site_country_code.lower()}_site{country_count}"
             cc_site_counter[site_country_code] +=1
-
-            new_site['site_network_accesses']['site_network_access'][0]['network_access_id'] = f"{site_country_code.lower()}_link{link_count}"
             cc_link_counter[f"{site_country_code.lower()}_link"] +=1
 
             postal_code = self.get_postal_code(infra_id=self.infra_id, site_id=site_id, country_code=site_country_code, site_name=site_name)
 
-            new_site['site_id'] = pop_name
-            if new_site['locations']['location']:
-                new_site['locations']['location'][0]['country_code'] = site_country_code
-                new_site['locations']['location'][0]['postal_code'] = postal_code
-                new_site['locations']['location'][0]['location_id'] = pop_name
+            #Site Creation
+            new_site, site_unfilled = site_template.instantiate(dict(values, **{
+                "{SITE_ID}": pop_name,
+                "{COUNTRY_CODE}": site_country_code,
+                "{POSTAL_CODE}": postal_code,
+                "{LOCATION_ID}": pop_name,
+                "{NETWORK_ACCESS_ID}": f"{site_country_code.lower()}_link{link_count}"
+            }))
+            missing_fields.extend((sites_path + (i,) + path, value) for path, value in site_unfilled)
 
             filled_template['l2vpn_svc']['sites']['site'].append(new_site)
 
+        # Remember which slots are still open so _check_missing_fields needn't walk the JSON
+        self._slot_manifest = (filled_template, [(format_path(path), value) for path, value in missing_fields])
         return filled_template
 
     def _check_missing_fields(self, json_data: Dict) -> Tuple[bool, List[str]]:
         """Check for missing placeholder fields in the JSON configuration"""
+        manifest = self._slot_manifest
+        if manifest is not None and manifest[0] is json_data:
+            return len(manifest[1]) > 0, list(manifest[1])
+
         missing_fields = []
         
         def find_placeholders(obj, path=""):
@@ -362,7 +460,7 @@ class serviceConfigGenerator():
             logger.warning("No form data provided, returning original JSON")
             return json_data
         
-        completed_json = copy.deepcopy(json_data)
+        completed_json = structural_copy(json_data)
         sites = completed_json['l2vpn_svc']['sites']['site']
         
         for i, site in enumerate(sites):
@@ -437,33 +535,141 @@ class serviceConfigGenerator():
         elif service_type == "l2circuit":
             return []
 
+    def _manifest_form_data(self, row: Dict[str, Any], n_sites: int) -> Dict[str, Any]:
+        """Turn a manifest row's interface columns into form data keys for every site.
+        A single value applies to all sites, a ';'-separated list (or JSON list) gives one value per site.
+        The templates have one network access per site, so a row with more values than sites, or
+        with a list of values for one site, raises ValueError rather than losing the extra accesses"""
+        form_data = {}
+        for column, form_key in MANIFEST_INTERFACE_FIELDS.items():
+            values = split_manifest_field(row.get(column))
+            if not values:
+                continue
+            if len(values) > n_sites or any(isinstance(value, (list, tuple, dict)) for value in values):
+                raise ValueError(f"'{column}' gives more than one access per site; "
+                                 f"only one network access per site is supported")
+            for i in range(n_sites):
+                form_data[f"site_{i}_access_0_{form_key}"] = values[i] if i < len(values) else values[-1]
+        return form_data
+
+    def generate_services_from_manifest(self, manifest_path: str, output_dir: str = "payload") -> Dict[str, Any]:
+        """Generate service payloads in bulk from a CSV/JSONL manifest, without any LLM involvement.
+        load_rd_data() must have been awaited first.
+
+        Customers and devices are resolved once for the whole manifest; each row is then
+        generated on its own from the compiled template and written out, so one bad row
+        fails alone. Rows asking for more than one network access per site are rejected.
+
+        Manifest columns:
+            service_type, customer_name, hostnames (';'-separated in CSV)
+            optional: instance_id, eth_inf_type, cvlan_id, speed, lldp, oam_enabled
+
+        Returns:
+            Summary report, also written as bulk_summary_<timestamp>.json in output_dir
+        """
+        started = datetime.now()
+        rows = read_service_manifest(manifest_path)
+        payload_dir = Path(output_dir)
+        payload_dir.mkdir(parents=True, exist_ok=True)
+
+        # Resolve every distinct customer and hostname once for the whole batch
+        customers = {}
+        devices = {}
+        for row in rows:
+            customer_name = str(row.get('customer_name', '') or '')
+            if customer_name not in customers:
+                customers[customer_name] = self.get_customer_id(customer_name)
+            for hostname in split_manifest_field(row.get('hostnames')):
+                if hostname not in devices:
+                    ids = self.get_device_and_site_ids(hostname)
+                    devices[hostname] = ids if ids and self.get_site_details(ids[1] or "") else None
+
+        used_identifiers = set()
+        results = []
+        for row_number, row in enumerate(rows, start=1):
+            service_type = str(row.get('service_type', '') or '').strip()
+            customer_name = str(row.get('customer_name', '') or '')
+            hostnames = split_manifest_field(row.get('hostnames'))
+            result = {"row": row_number, "service_type": service_type, "customer_name": customer_name,
+                      "hostnames": hostnames}
+
+            unresolved = [hostname for hostname in hostnames if devices.get(hostname) is None]
+            requested_identifier = row.get('instance_id') or None
+            if service_type not in self.template_files or not os.path.exists(
+                    os.path.join(os.path.dirname(os.path.abspath(__file__)), self.template_files[service_type])):
+                result.update(status="failed", error=f"Unsupported service type '{service_type}'")
+            elif customers.get(customer_name) is None:
+                result.update(status="failed", error=f"Customer '{customer_name}' not found in Routing Director")
+            elif len(hostnames) < 2:
+                result.update(status="failed", error="At least two hostnames are required")
+            elif unresolved:
+                result.update(status="failed", error=f"Unknown device(s) or site(s): {', '.join(unresolved)}")
+            elif requested_identifier and clean_string(input_string=requested_identifier) in used_identifiers:
+                result.update(status="failed", error=f"Duplicate instance_id '{requested_identifier}'")
+            else:
+                instance_identifier = requested_identifier
+                attempts = 0
+                while instance_identifier is None or clean_string(input_string=instance_identifier) in used_identifiers:
+                    # Same naming as interactive creation; widen the suffix if a huge batch exhausts it
+                    attempts += 1
+                    suffix = random.randint(10000, 99999) if attempts <= 10 else uuid.uuid4().hex[:12]
+                    instance_identifier = f"{service_type}_{suffix}"
+                try:
+                    form_data = self._manifest_form_data(row, len(hostnames))
+                    service_json = self._generate_evpn_vpws_json(service_type=service_type, customer_name=customer_name,
+                                                                 hostnames=hostnames, instance_identifier=instance_identifier)
+                    if form_data:
+                        service_json = self._complete_json_with_form_data(service_json, form_data)
+                    has_missing_fields, missing_field_list = self._check_missing_fields(service_json)
+
+                    instance_name = service_json['instance_id']
+                    used_identifiers.add(instance_name)
+                    file_path = payload_dir / f"{service_type}_{hostnames[0]}_{hostnames[1]}_{instance_name}.json"
+                    # Compact JSON: indent forces the pure-Python encoder, several times slower
+                    with open(file_path, 'w') as f:
+                        f.write(json.dumps(service_json))
+
+                    result.update(status="generated", instance_id=instance_name, file=str(file_path),
+                                  missing_fields=[path for path, _ in missing_field_list])
+                except Exception as e:
+                    logger.error(f"Manifest row {row_number} failed: {e}")
+                    result.update(status="failed", error=str(e))
+            results.append(result)
+
+        elapsed = (datetime.now() - started).total_seconds()
+        generated = sum(1 for result in results if result["status"] == "generated")
+        summary_file = payload_dir / f"bulk_summary_{started.strftime('%Y%m%d_%H%M%S')}.json"
+        summary = {
+            "manifest": str(manifest_path),
+            "total_rows": len(rows),
+            "generated": generated,
+            "failed": len(rows) - generated,
+            "output_dir": str(payload_dir),
+            "elapsed_seconds": round(elapsed, 3),
+            "payloads_per_second": round(generated / elapsed, 1) if elapsed > 0 else None,
+            "summary_file": str(summary_file),
+            "results": results
+        }
+        with open(summary_file, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(f"Bulk generation: {generated}/{len(rows)} payloads written to {payload_dir} in {elapsed:.2f}s")
+        return summary
+
     def get_customer_id(self, customer_name: str):
         """ Get Customer ID from Routing Director 
         Input: Customer Name
         Output: Customer ID in string format 
         """
-        return next(
-            (
-                customer["customer_id"]
-                for customer in self.rd_customers_data
-                if customer.get("name", "").lower() == customer_name.lower()
-            ),
-            None
-        )
+        return self.customers_index.get(customer_name.lower())
 
     def get_device_and_site_ids(self, device_name: str):
         """ Get Device ID & Site ID from Routing Director 
         Input: DeviceName/Hostname
         Output: [DeviceID, SiteID] in list format
         """
-        return next(
-            (
-                [device.get("id"), device.get("siteId")]
-                for device in self.rd_devices_data['devices']
-                if device.get('hostname', "").lower() == device_name.lower()
-            ),
-            None
-        )
+        ids = self.devices_index.get(device_name.lower())
+        return list(ids) if ids is not None else None
     
     def get_site_details(self, site_id: str):
         """ Get Site Details of Routing Director 
@@ -473,14 +679,7 @@ class serviceConfigGenerator():
                 The function get_device_and_site_ids gives back [Device id, Site ID] as list as output 
         Output: 
         """
-        return next(
-            (
-                site
-                for site in self.site_details
-                if site.get("id", "").lower() == site_id.lower()
-            ),
-            None
-        )
+        return self.sites_index.get(site_id.lower())
     
     def get_postal_code(self, infra_id: str, site_id: str, country_code: str, site_name: str):
         location_data = self.topo_details.get('resource', {}).get('location', {})['customer_id'][infra_id]
@@ -497,6 +696,19 @@ class serviceConfigGenerator():
             "Country Code and Site name is not matching to find the correct postal code"
         )
 
+async def _generate_from_manifest_cli(manifest_path: str, output_dir: str) -> Dict[str, Any]:
+    scg = serviceConfigGenerator()
+    await scg.load_rd_data()
+    return scg.generate_services_from_manifest(manifest_path=manifest_path, output_dir=output_dir)
+
 if __name__ == "__main__":
     # Setup Logging Configs
-    logging.basicConfig(level=logging.INFO)
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Generate Routing Director service payloads in bulk from a manifest")
+    parser.add_argument("manifest", help="CSV/JSONL manifest, one service per row")
+    parser.add_argument("--output-dir", default="payload", help="Directory the payloads are written to")
+    args = parser.parse_args()
+
+    summary = asyncio.run(_generate_from_manifest_cli(manifest_path=args.manifest, output_dir=args.output_dir))
+    print(json.dumps({key: value for key, value in summary.items() if key != "results"}, indent=2))
\ No newline at end of file
@@ -0,0 +1,218 @@
+import gc
+import json
+import uuid
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional
+
+# Design ids of the registered parsers, generated in equal shares by default
+DESIGN_IDS = ('eline-evpn-vpws-csm', 'elan-evpn-csm', 'eline-l2circuit-nsm', 'l3vpn')
+
+ORDER_STATUSES = ('success', 'success', 'success', 'success', 'failed', 'in_progress')
+WORKFLOW_TASKS = ('validate', 'allocate_resources', 'render_config', 'commit_config', 'verify', 'update_inventory')
+COMPONENT_TYPES = ('config', 'resource', 'assurance')
+COUNTRIES = (('KH', '121207'), ('TH', '10310'), ('SG', '018956'), ('MY', '50450'), ('IN', '560001'), ('JP', '100-0005'))
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _timestamp(rng: random.Random, index: int) -> str:
+    # Later instances are newer, like an orders feed
+    return (EPOCH + timedelta(seconds=index * 60 + rng.randrange(60))).isoformat().replace('+00:00', 'Z')
+
+
+class _Catalog:
+    """Customers, devices and sites the generated instances refer to"""
+
+    def __init__(self, count: int, rng: random.Random):
+        n_customers = max(5, count // 100)
+        n_sites = max(4, count // 500)
+        n_devices = max(8, count // 50)
+        self.customers = [{"customer_id": _uuid(rng), "name": f"customer-{i:05d}", "customer_ref_no": f"REF{i:06d}"}
+                          for i in range(n_customers)]
+        self.customers.append({"customer_id": _uuid(rng), "name": "network-operator", "customer_ref_no": "INFRA"})
+        self.sites = []
+        for i in range(n_sites):
+            country_code, postal_code = COUNTRIES[i % len(COUNTRIES)]
+            self.sites.append({"id": _uuid(rng), "name": f"{country_code.lower()}_site{i}",
+                               "country_code": country_code, "postal_code": postal_code})
+        self.devices = [{"id": _uuid(rng), "hostname": f"pe{i:04d}", "siteId": self.sites[i % n_sites]["id"],
+                         "model": rng.choice(("ACX7100-48L", "ACX7509", "MX304", "PTX10001-36MR"))}
+                        for i in range(n_devices)]
+
+
+def _vpn_nodes(rng: random.Random, devices: List[Dict[str, Any]], n_nodes: int, l3: bool) -> List[Dict[str, Any]]:
+    nodes = []
+    for position, device in enumerate(rng.sample(devices, n_nodes)):
+        node = {
+            "vpn_node_id": f"{device['hostname']}-node{position + 1}",
+            "ne_id": device["hostname"],
+            "site_id": f"site-{device['siteId'][:8]}",
+            "vpn_network_accesses": {"vpn_network_access": [{
+                "id": f"access{position + 1}",
+                "interface_id": f"et-0/0/{rng.randrange(48)}",
+                "connection": {"encapsulation_type": "dot1q", "dot1q": {"cvlan_id": rng.randrange(2, 4094)}},
+            }]},
+        }
+        if l3:
+            node["ip_connection"] = {"ipv4": {"local_address": f"10.{rng.randrange(256)}.{rng.randrange(256)}.1",
+                                              "prefix_length": 30}}
+        nodes.append(node)
+    return nodes
+
+def _sites_svc(rng: random.Random, nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """l2vpn_svc / l3vpn_svc sites in the shape of the payloads this repo generates"""
+    sites = []
+    for node in nodes:
+        country_code, postal_code = rng.choice(COUNTRIES)
+        sites.append({
+            "devices": {"device": []},
+            "locations": {"location": [{"country_code": country_code, "location_id": node["site_id"],
+                                        "postal_code": postal_code}]},
+            "site_id": node["site_id"],
+            "site_network_accesses": {"site_network_access": [{
+                "connection": {"eth_inf_type": "tagged",
+                               "tagged_interface": {"dot1q_vlan_tagged": {"cvlan_id": rng.randrange(2, 4094),
+                                                                          "tg_type": "c-vlan"}, "type": "dot1q"},
+                               "untagged_interface": {"lldp": True, "oam_802.3ah_link": {"enabled": False},
+                                                      "speed": 10000}},
+                "network_access_id": f"{node['site_id']}_link1",
+                "service": {"svc_bandwidth": {"bandwidth": []}}
+            }]}
+        })
+    return {"sites": {"site": sites}}
+
+def _order_status(rng: random.Random, index: int) -> Dict[str, Any]:
+    status = rng.choice(ORDER_STATUSES)
+    n_tasks = rng.randrange(3, len(WORKFLOW_TASKS) + 1)
+    workflow_trace = []
+    for position, task in enumerate(WORKFLOW_TASKS[:n_tasks]):
+        task_status = 'success'
+        if position == n_tasks - 1 and status != 'success':
+            task_status = 'failed' if status == 'failed' else 'running'
+        workflow_trace.append({"name": task, "task_id": f"{task}-{index}", "status": task_status,
+                               "start_time": _timestamp(rng, index)})
+    components = [{"component_type": component_type,
+                   "component_data": [{"status": rng.choice(('pending', 'applied')), "timestamp": _timestamp(rng, index)},
+                                      {"status": 'applied' if status == 'success' else status,
+                                       "timestamp": _timestamp(rng, index)}]}
+                  for component_type in COMPONENT_TYPES[:rng.randrange(1, len(COMPONENT_TYPES) + 1)]]
+    return {"status": status, "order_id": f"order-{index}", "operation": "create",
+            "components": components, "workflow_trace": workflow_trace}
+
+def _assurance(rng: random.Random) -> Dict[str, Any]:
+    nodes = []
+    for _ in range(rng.randrange(1, 4)):
+        nodes.append({"device": _uuid(rng), "status": rng.choice(('up', 'up', 'up', 'down')),
+                      "test_results": [{"test_id": _uuid(rng), "status": rng.choice(('pass', 'pass', 'fail'))}
+                                       for _ in range(rng.randrange(1, 3))]})
+    return {"summary": "pass" if all(node["status"] == 'up' for node in nodes) else "degraded", "nodes": nodes}
+
+def _malform(rng: random.Random, instance: Dict[str, Any]):
+    """Damage one part of an instance the way partial RD records look"""
+    network_key = 'l3vpn_ntw' if 'l3vpn_ntw' in instance else 'l2vpn_ntw'
+    damage = rng.randrange(4)
+    if damage == 0:
+        instance[network_key] = None
+    elif damage == 1:
+        instance.pop(network_key)
+    elif damage == 2:
+        instance['order_status'] = None
+    else:
+        instance['active_assurance_test_result'] = None
+
+def _instance(rng: random.Random, catalog: _Catalog, index: int, design_id: str) -> Dict[str, Any]:
+    customer = catalog.customers[rng.randrange(len(catalog.customers) - 1)]
+    l3 = design_id == 'l3vpn'
+    n_nodes = rng.randrange(3, 6) if design_id == 'elan-evpn-csm' or l3 else 2
+    nodes = _vpn_nodes(rng, catalog.devices, min(n_nodes, len(catalog.devices)), l3)
+    instance = {
+        "instance_id": f"{design_id.split('-')[0]}{index:06d}",
+        "instance_uuid": _uuid(rng),
+        "customer_id": customer["customer_id"],
+        "design_id": design_id,
+        "design_version": "0.5.4",
+        "instance_status": rng.choice(('active', 'active', 'active', 'inactive')),
+        "created_at": _timestamp(rng, index),
+        "order_status": _order_status(rng, index),
+    }
+    network = {"vpn_services": {"vpn_service": [{
+        "vpn_id": f"vpn-{index}",
+        "customer_name": customer["name"],
+        "vpn_svc_type": design_id,
+        "vpn_nodes": {"vpn_node": nodes},
+    }]}}
+    if l3:
+        instance["l3vpn_ntw"] = network
+        instance["l3vpn_svc"] = _sites_svc(rng, nodes)
+        instance["active_assurance_test_result"] = _assurance(rng)
+    else:
+        instance["l2vpn_ntw"] = network
+        instance["l2vpn_svc"] = _sites_svc(rng, nodes)
+        if design_id == 'eline-l2circuit-nsm':
+            instance["fh_config"] = {"pseudowire": {"vc_id": rng.randrange(1, 1 << 20), "mtu": 9100}}
+            instance["placement"] = {"nodes": [{"ne_id": node["ne_id"], "pop": node["site_id"]} for node in nodes]}
+    return instance
+
+
+def generate_inventory(count: int, seed: int = 0, design_ids: Optional[List[str]] = None,
+                       malformed_ratio: float = 0.0) -> Dict[str, Any]:
+    """Deterministic Routing Director inventory of count service instances
+
+    The same count and seed always give the same data, so benchmark runs can be
+    compared with each other.
+
+    Args:
+        count: number of service instances
+        seed: random seed
+        design_ids: designs to generate, in equal shares (all parser designs by default)
+        malformed_ratio: share of instances with a missing or null section
+
+    Returns:
+        {"instances": get_instances body, "orders": get_orders body, "customers": get_customers body,
+         "devices": get_devices body, "sites": sites body}
+    """
+    rng = random.Random(seed)
+    design_ids = list(design_ids or DESIGN_IDS)
+    catalog = _Catalog(count, rng)
+    instances, orders = [], []
+    # Nothing built here is cyclic; collector passes over the growing lists only cost time
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for index in range(count):
+            instance = _instance(rng, catalog, index, design_ids[index % len(design_ids)])
+            if malformed_ratio and rng.random() < malformed_ratio:
+                _malform(rng, instance)
+            instances.append(instance)
+            order_status = instance.get("order_status") or {}
+            orders.append({"order_id": order_status.get("order_id", f"order-{index}"), "operation": "create",
+                           "instance_id": instance["instance_id"], "customer_id": instance["customer_id"],
+                           "design_id": instance["design_id"], "status": order_status.get("status", "success"),
+                           "updated_at": instance["created_at"]})
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {"instances": instances, "orders": orders, "customers": catalog.customers,
+            "devices": {"devices": catalog.devices}, "sites": catalog.sites}
+
+def generate_instances(count: int, seed: int = 0, design_ids: Optional[List[str]] = None,
+                       malformed_ratio: float = 0.0) -> List[Dict[str, Any]]:
+    """Deterministic get_instances body (see generate_inventory)"""
+    return generate_inventory(count, seed, design_ids, malformed_ratio)["instances"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic get_instances body, e.g. for the parsers' __main__ blocks")
+    parser.add_argument("count", type=int, help="Number of service instances (1k to 200k)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--malformed-ratio", type=float, default=0.0, help="Share of instances with a missing section")
+    parser.add_argument("--output", default="services/get_instances.json", help="File the instances are written to")
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as file:
+        json.dump(generate_instances(args.count, args.seed, malformed_ratio=args.malformed_ratio), file)
+    print(f"Wrote {args.count} instances to {args.output}")
@@ -0,0 +1,135 @@
+import os
+import sys
+import pytest
+
+# The server modules are imported by bare name, as rdMCPServer does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import servicesConfigGenerator
+from mock_rd_server import MockRoutingDirector, ORG_ID
+
+
+def api_path(route: str, **params) -> str:
+    """Path of a mock Routing Director route, e.g. api_path('get_instances')"""
+    from mock_rd_server import ROUTES
+    template = next(template for name, _, template in ROUTES if name == route)
+    return template.format(org_id=ORG_ID, **params)
+
+
+@pytest.fixture
+def mock_rd(monkeypatch):
+    """A MockRoutingDirector the RD clients are pointed at"""
+    import rd_pagination
+    # Filter support learnt from one mock server doesn't carry over to the next
+    monkeypatch.setattr(rd_pagination, '_filter_rejected', set())
+    server = MockRoutingDirector(instances=40, seed=1, exec_seconds=0.5)
+    monkeypatch.setattr(servicesConfigGenerator, 'BASE_URL', server.start())
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def generator(mock_rd, monkeypatch, tmp_path):
+    """A serviceConfigGenerator with the mock RD's reference data loaded, working in tmp_path"""
+    import asyncio
+    import reference_data
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(reference_data, 'reference_data_store', reference_data.ReferenceDataStore())
+    scg = servicesConfigGenerator.serviceConfigGenerator()
+    asyncio.run(scg.load_rd_data())
+    return scg
+
+
+@pytest.fixture
+def services_manager(mock_rd, monkeypatch, tmp_path):
+    """A servicesManager whose inventory store, sync and order watcher are fresh and point at the mock RD"""
+    import servicesAgent
+    from inventory_store import InventoryStore
+    from inventory_sync import InventorySync
+    from order_watcher import OrderWatcher
+    from parser_registry import ParsedServiceCache
+    store = InventoryStore(str(tmp_path / "inventory.db"))
+    sync = InventorySync(api_path('get_instances'), api_path('get_orders'), restore=store.load_sync_state)
+    sync.add_listener(servicesAgent._store_inventory)
+    monkeypatch.setattr(servicesAgent, 'inventory_store', store)
+    monkeypatch.setattr(servicesAgent, 'inventory_sync', sync)
+    monkeypatch.setattr(servicesAgent, 'parsed_services', ParsedServiceCache(store.get_documents))
+    monkeypatch.setattr(servicesAgent, 'service_reference_data', {})
+    monkeypatch.setattr(servicesAgent, 'order_watcher',
+                        OrderWatcher(api_path('get_instances'), base_interval=0.05, max_interval=0.1))
+    monkeypatch.setattr(servicesAgent, 'exec_baselines', {})
+    monkeypatch.chdir(tmp_path)
+    yield servicesAgent.servicesManager()
+    store.close()
+
+
+class FakeNetconf:
+    """Stand-in for an ncclient manager: answers Junos commands from canned XML"""
+
+    def __init__(self, host: str, port: int, replies: dict):
+        self.host = host
+        self.port = port
+        self.replies = replies
+        self.timeout = 30
+        self.connected = True
+        self.commands = []
+
+    def command(self, command: str, format: str = 'xml'):
+        self.commands.append(command)
+        for prefix in sorted(self.replies, key=len, reverse=True):
+            if command.startswith(prefix):
+                return self.replies[prefix]
+        raise ValueError(f"Unexpected command {command}")
+
+    def close_session(self):
+        self.connected = False
+
+
+def device_replies(port: int) -> dict:
+    """Junos replies of a router with one Up L2VPN connection on ge-0/0/1.100"""
+    return {
+        'show version': f"<rpc-reply><software-information><host-name>r{port}</host-name>"
+                        f"<product-model>mx960</product-model><junos-version>23.4R1</junos-version>"
+                        f"</software-information></rpc-reply>",
+        'show configuration interfaces lo0': f"<rpc-reply><configuration><interfaces><interface><name>lo0</name>"
+                                             f"<unit><name>0</name><family><inet><address><name>10.0.0.{port}/32</name>"
+                                             f"</address></inet></family></unit></interface></interfaces></configuration></rpc-reply>",
+        'show l2vpn connection': "<rpc-reply><l2vpn-connection-information><instance><instance-name>vpn1</instance-name>"
+                                 "<local-site><local-site-id>1</local-site-id><connection><remote-pe>10.1.1.1</remote-pe>"
+                                 "<connection-status>Up</connection-status><local-interface>"
+                                 "<interface-name>ge-0/0/1.100</interface-name><interface-status>Up</interface-status>"
+                                 "</local-interface></connection></local-site></instance></l2vpn-connection-information></rpc-reply>",
+        'show configuration interfaces |': "<rpc-reply><configuration><interfaces><interface><name>ge-0/0/1</name>"
+                                           "<description>uplink</description><unit><name>100</name><description>cust</description>"
+                                           "<vlan-tags><outer>100</outer><inner>200</inner></vlan-tags></unit></interface>"
+                                           "</interfaces></configuration></rpc-reply>",
+        'show configuration routing-instances': "<rpc-reply><configuration><routing-instances><instance><name>vpn1</name>"
+                                                "<instance-type>l2vpn</instance-type><vrf-target><community>target:65000:1"
+                                                "</community></vrf-target></instance></routing-instances></configuration></rpc-reply>",
+        'show system uptime': "<rpc-reply><system-uptime-information/></rpc-reply>",
+    }
+
+
+class FakeManagerModule:
+    """Replaces netconf_pool.manager; records connects and refuses ports in `refused`"""
+
+    def __init__(self):
+        self.sessions = []
+        self.refused = set()
+
+    def connect(self, host, port, **kwargs):
+        if port in self.refused:
+            raise ConnectionRefusedError(f"ssh refused on {host}:{port}")
+        session = FakeNetconf(host, port, device_replies(port))
+        self.sessions.append(session)
+        return session
+
+
+@pytest.fixture
+def fake_netconf(monkeypatch):
+    import netconf_pool
+    fake = FakeManagerModule()
+    monkeypatch.setattr(netconf_pool, 'manager', fake)
+    netconf_pool.close_netconf_pool()
+    yield fake
+    netconf_pool.close_netconf_pool()
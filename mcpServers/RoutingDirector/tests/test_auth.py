@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+import servicesConfigGenerator
+from servicesConfigGenerator import ParagonAuth, make_api_request
+from conftest import api_path
+
+
+@pytest.fixture
+def token_auth(monkeypatch):
+    monkeypatch.setenv('RD_AUTH_MODE', 'token')
+    auth = ParagonAuth()
+    monkeypatch.setattr(servicesConfigGenerator, 'auth', auth)
+    return auth
+
+
+async def _list_customers(count: int):
+    return [await make_api_request(api_path('get_customers')) for _ in range(count)]
+
+
+def test_token_is_fetched_once_and_reused(mock_rd, token_auth):
+    results = asyncio.run(_list_customers(3))
+    assert all('error' not in result for result in results)
+    assert mock_rd.requests['get_token'] == 1
+    assert token_auth.get_headers(use_basic_auth=False)['Authorization'].startswith('Bearer ')
+
+def test_failed_token_request_is_not_retried_per_call(mock_rd, token_auth):
+    mock_rd.error_rate, mock_rd.error_routes = 1.0, {'get_token'}
+    results = asyncio.run(_list_customers(3))
+    # Requests fall back to Basic and still succeed
+    assert all('error' not in result for result in results)
+    assert mock_rd.requests['get_token'] == 1
+
+def test_token_is_requested_again_after_the_backoff(mock_rd, token_auth):
+    mock_rd.error_rate, mock_rd.error_routes = 1.0, {'get_token'}
+    token_auth.token_retry_backoff = 0.2
+    asyncio.run(_list_customers(1))
+    mock_rd.error_rate = 0.0
+
+    async def later():
+        await asyncio.sleep(0.3)
+        return await _list_customers(1)
+
+    asyncio.run(later())
+    assert mock_rd.requests['get_token'] == 2
+    assert token_auth.token is not None
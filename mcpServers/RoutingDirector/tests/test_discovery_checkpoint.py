@@ -0,0 +1,72 @@
+import csv
+import asyncio
+import pandas as pd
+import pytest
+import brownfield_discovery
+from brownfield_discovery import DiscoveryCheckpoint
+
+
+def _router_list(tmp_path, ports) -> str:
+    path = str(tmp_path / 'routers.xlsx')
+    pd.DataFrame({'Port': ports}).to_excel(path, index=False)
+    return path
+
+def _discover(router_list: str, output: str, **kwargs):
+    return asyncio.run(brownfield_discovery.discover_l2vpn_bgp_signaling_services(
+        router_list, output, 'u', 'p', 'h1', retries=0, **kwargs))
+
+def _csv_rows(path: str):
+    with open(path, newline='') as file:
+        return list(csv.DictReader(file))
+
+
+def test_resume_skips_completed_routers_and_truncates_torn_rows(tmp_path, fake_netconf):
+    router_list = _router_list(tmp_path, [1, 2, 3, 4])
+    output = str(tmp_path / 'out.csv')
+    fake_netconf.refused = {3}
+
+    first = _discover(router_list, output, run_id='run1')
+    assert first['successful_connections'] == 3
+    # Rows written after the last checkpoint, by a run that died mid-router
+    with open(first['streamed_files']['L2VPN'], 'a') as file:
+        file.write('9,torn,row')
+
+    fake_netconf.refused = set()
+    fake_netconf.sessions.clear()
+    second = _discover(router_list, output, run_id='run1')
+
+    assert second['resumed_routers'] == 3
+    assert second['successful_connections'] == 4
+    assert [session.port for session in fake_netconf.sessions] == [3]
+    rows = _csv_rows(second['streamed_files']['L2VPN'])
+    assert sorted(row['hostname'] for row in rows) == ['r1', 'r2', 'r3', 'r4']
+    assert all(row['Route Target'] == 'target:65000:1' and row['outer-vlan'] == '100' for row in rows)
+
+def test_checkpoint_of_another_run_is_not_overwritten(tmp_path):
+    path = str(tmp_path / 'out.checkpoint.jsonl')
+    checkpoint = DiscoveryCheckpoint(path, 'run1', 'csv')
+    checkpoint.record({'host': 'h1', 'port': 1}, 'ok', 1)
+    checkpoint.close()
+    journal = open(path).read()
+
+    with pytest.raises(ValueError):
+        DiscoveryCheckpoint(path, 'run2', 'csv', resume=True)
+    assert open(path).read() == journal
+
+def test_resume_after_a_torn_journal_line_keeps_the_next_event(tmp_path):
+    path = str(tmp_path / 'out.checkpoint.jsonl')
+    checkpoint = DiscoveryCheckpoint(path, 'run1', 'csv')
+    checkpoint.record({'host': 'h1', 'port': 1}, 'ok', 1, positions={'L2VPN': 10})
+    checkpoint.close()
+    with open(path, 'a') as file:
+        file.write('{"router": "h1:2", "sta')
+
+    checkpoint = DiscoveryCheckpoint(path, 'run1', 'csv', resume=True)
+    assert checkpoint.resumed and checkpoint.completed({'host': 'h1', 'port': 1})
+    checkpoint.record({'host': 'h1', 'port': 3}, 'ok', 1, positions={'L2VPN': 20})
+    checkpoint.close()
+
+    checkpoint = DiscoveryCheckpoint(path, 'run1', 'csv', resume=True)
+    assert checkpoint.completed({'host': 'h1', 'port': 3})
+    assert checkpoint.positions == {'L2VPN': 20}
+    checkpoint.close()
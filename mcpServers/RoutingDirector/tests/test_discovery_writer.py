@@ -0,0 +1,87 @@
+import csv
+import json
+import importlib.util
+import pytest
+from openpyxl import load_workbook
+from discovery_writer import (TABLES, INDEX_COLUMN, open_writer, read_rows, rows_in_router_order, convert_to_excel,
+                              resolve_output)
+
+needs_pyarrow = pytest.mark.skipif(importlib.util.find_spec('pyarrow') is None, reason="Parquet output needs pyarrow")
+FORMATS = ['csv', 'jsonl', pytest.param('parquet', marks=needs_pyarrow)]
+
+
+def _result(hostname, vpns):
+    return {'hardware': {'hostname': hostname, 'product-model': 'mx204'},
+            'l2vpn': [{'hostname': hostname, 'instance-name': vpn, 'outer-vlan': None} for vpn in vpns]}
+
+def _write(base, output_format, routers, resume=None):
+    """Write (index, hostname, vpns) routers in the given (completion) order"""
+    with open_writer(base, output_format, resume) as writer:
+        for index, hostname, vpns in routers:
+            writer.write_device(_result(hostname, vpns), index)
+    return writer
+
+
+@pytest.mark.parametrize('output_format', FORMATS)
+def test_rows_come_back_in_router_order(tmp_path, output_format):
+    # Routers finish out of list order: 2 and 3 ahead of 0 and 1
+    writer = _write(str(tmp_path / 'out'), output_format,
+                    [(2, 'r2', ['a', 'b']), (3, 'r3', []), (0, 'r0', ['c']), (1, 'r1', ['d', 'e', 'f'])])
+
+    rows = list(rows_in_router_order(writer.paths['L2VPN'], output_format))
+    assert [(int(row[INDEX_COLUMN]), row['instance-name']) for row in rows] == \
+        [(0, 'c'), (1, 'd'), (1, 'e'), (1, 'f'), (2, 'a'), (2, 'b')]
+    assert all(row['outer-vlan'] is None for row in rows)
+    assert [row['hostname'] for row in rows_in_router_order(writer.paths['Hardware'], output_format)] == \
+        ['r0', 'r1', 'r2', 'r3']
+    assert writer.rows == {'Hardware': 4, 'L2VPN': 6}
+
+def test_rows_without_an_index_keep_file_order(tmp_path):
+    path = str(tmp_path / 'out.l2vpn.jsonl')
+    with open(path, 'w') as file:
+        for value in ['b', 'a', 'c']:
+            file.write(json.dumps({'instance-name': value}) + '\n')
+    assert [row['instance-name'] for row in rows_in_router_order(path, 'jsonl')] == ['b', 'a', 'c']
+
+@pytest.mark.parametrize('output_format', ['csv', 'jsonl'])
+def test_resume_drops_rows_past_the_recorded_positions(tmp_path, output_format):
+    base = str(tmp_path / 'out')
+    with open_writer(base, output_format) as writer:
+        writer.write_device(_result('r0', ['a']), 0)
+        positions = writer.positions()
+        # Written after the last checkpoint, by a run that then died
+        writer.write_device(_result('r1', ['b']), 1)
+
+    writer = _write(base, output_format, [(2, 'r2', ['c'])], resume=positions)
+    assert [row['hostname'] for row in read_rows(writer.paths['Hardware'], output_format)] == ['r0', 'r2']
+    assert [row['instance-name'] for row in read_rows(writer.paths['L2VPN'], output_format)] == ['a', 'c']
+    if output_format == 'csv':
+        # The header is written once, by the run that created the file
+        with open(writer.paths['L2VPN'], newline='') as file:
+            assert sum(row[0] == INDEX_COLUMN for row in csv.reader(file)) == 1
+
+def test_resume_without_the_files_starts_them_afresh(tmp_path):
+    writer = _write(str(tmp_path / 'out'), 'csv', [(0, 'r0', ['a'])], resume={'Hardware': 999, 'L2VPN': 999})
+    assert [row['hostname'] for row in read_rows(writer.paths['Hardware'], 'csv')] == ['r0']
+
+@needs_pyarrow
+def test_parquet_resume_keeps_the_previous_rows(tmp_path):
+    base = str(tmp_path / 'out')
+    _write(base, 'parquet', [(0, 'r0', ['a'])])
+    writer = _write(base, 'parquet', [(1, 'r1', ['b'])], resume={})
+    assert [row['hostname'] for row in read_rows(writer.paths['Hardware'], 'parquet')] == ['r0', 'r1']
+
+def test_excel_conversion_is_in_router_order(tmp_path):
+    base, output_format, excel = resolve_output(str(tmp_path / 'discovery.xlsx'), 'jsonl')
+    writer = _write(base, output_format, [(1, 'r1', ['b']), (0, 'r0', ['a'])])
+    convert_to_excel(writer.paths, output_format, excel)
+
+    workbook = load_workbook(excel, read_only=True)
+    assert workbook.sheetnames == list(TABLES)
+    sheet = list(workbook['L2VPN'].values)
+    assert list(sheet[0]) == TABLES['L2VPN']
+    assert [(row[0], row[1]) for row in sheet[1:]] == [('r0', 'a'), ('r1', 'b')]
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_writer(str(tmp_path / 'out'), 'xml')
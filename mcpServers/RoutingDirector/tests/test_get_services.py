@@ -0,0 +1,39 @@
+import asyncio
+import pandas as pd
+from parser_registry import PARSERS, parse_services
+
+
+def _expected(mock_rd, design_id):
+    return parse_services(list(mock_rd.instances.values()), [design_id])[design_id]
+
+
+def test_get_services_returns_only_the_frame(mock_rd, services_manager):
+    df = asyncio.run(services_manager.get_services("l3vpn"))
+    expected_df, _ = _expected(mock_rd, "l3vpn")
+    pd.testing.assert_frame_equal(df, expected_df)
+
+def test_services_by_type_returns_a_frame_per_type(mock_rd, services_manager):
+    by_type = asyncio.run(services_manager.get_services("services_by_type"))
+    assert list(by_type) == [parser.service_type for parser in PARSERS.values()]
+    for design_id, parser in PARSERS.items():
+        pd.testing.assert_frame_equal(by_type[parser.service_type], _expected(mock_rd, design_id)[0])
+
+def test_reference_data_of_a_listed_service(mock_rd, services_manager):
+    df = asyncio.run(services_manager.get_services("evpn_vpws"))
+    service_name = df.iloc[0, 0]
+    _, expected = _expected(mock_rd, "eline-evpn-vpws-csm")
+    assert asyncio.run(services_manager.get_service_reference_data("evpn_vpws", service_name)) == expected[service_name]
+
+def test_reference_data_of_a_service_not_in_the_last_listing(mock_rd, services_manager):
+    _, expected = _expected(mock_rd, "l3vpn")
+    service_name = next(iter(expected))
+    customer_id = next(instance["customer_id"] for instance in mock_rd.instances.values()
+                       if instance["design_id"] == "l3vpn" and instance["instance_id"] != service_name
+                       and instance["customer_id"] != mock_rd.instances[service_name]["customer_id"])
+    df = asyncio.run(services_manager.get_services("l3vpn", customer_id=customer_id))
+    assert service_name not in set(df.iloc[:, 0])
+    assert asyncio.run(services_manager.get_service_reference_data("l3vpn", service_name)) == expected[service_name]
+
+def test_reference_data_of_an_unknown_service(mock_rd, services_manager):
+    assert "error" in asyncio.run(services_manager.get_service_reference_data("l3vpn", "no-such-service"))
+    assert "error" in asyncio.run(services_manager.get_service_reference_data("vpls", "anything"))
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import pytest
+from inventory_store import InventoryStore, instance_devices
+from inventory_sync import DELTA, FULL_PAGE, FULL_DONE
+from synthetic_inventory import generate_inventory
+
+
+@pytest.fixture
+def inventory():
+    return generate_inventory(200, seed=3)["instances"]
+
+@pytest.fixture
+def store(tmp_path, inventory):
+    store = InventoryStore(str(tmp_path / "inventory.db"))
+    for start in range(0, len(inventory), 50):
+        store.apply_instances(inventory[start:start + 50], [], FULL_PAGE)
+    store.apply_instances([], [], FULL_DONE, high_water_mark="2025-01-01T00:00:00Z", timestamp_field="updated_at")
+    yield store
+    store.close()
+
+
+def _names(instances):
+    return [instance["instance_id"] for instance in instances]
+
+
+def test_database_is_created_on_first_use(tmp_path):
+    path = tmp_path / "inventory.db"
+    store = InventoryStore(str(path))
+    assert not path.exists()
+    assert store.query_instances() == []
+    assert path.exists()
+    store.close()
+
+def test_queries_match_a_scan(store, inventory):
+    instance = inventory[7]
+    device = instance_devices(instance)[0]
+    predicates = {"customer_id": instance["customer_id"], "design_id": instance["design_id"], "ne_id": device.upper()}
+    expected = [i for i in inventory if i["customer_id"] == instance["customer_id"]
+                and i["design_id"] == instance["design_id"] and device in instance_devices(i)]
+    assert _names(store.query_instances(predicates)) == _names(expected)
+
+    statuses = ["active", "failed"]
+    assert _names(store.query_instances({"instance_status": statuses, "customer_id": None})) == \
+        _names([i for i in inventory if i.get("instance_status") in statuses])
+
+def test_unknown_predicate_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.query_instances({"hostname": "pe0001"})
+
+def test_delta_upserts_and_removes(store, inventory):
+    changed = dict(inventory[0], instance_status="failed")
+    store.apply_instances([changed], [inventory[1]["instance_id"]], DELTA, high_water_mark="2025-02-01T00:00:00Z",
+                          timestamp_field="updated_at")
+    assert store.query_instances({"instance_id": changed["instance_id"]}) == [changed]
+    assert store.lookup_instance(inventory[1]["instance_id"]) is None
+    assert store.lookup_instance(changed["instance_id"]) == (changed["customer_id"], changed.get("instance_uuid"))
+    assert store.load_sync_state()[:2] == ("2025-02-01T00:00:00Z", "updated_at")
+
+def test_interrupted_full_resync_leaves_the_inventory_alone(tmp_path, store, inventory):
+    store.apply_instances(inventory[:10], [], FULL_PAGE)
+    # A new process starts a fresh resync, the pages staged before are dropped
+    restarted = InventoryStore(store.path)
+    assert len(restarted.query_instances()) == len(inventory)
+    restarted.apply_instances(inventory[:5], [], FULL_PAGE)
+    restarted.apply_instances([], [], FULL_DONE)
+    assert _names(restarted.query_instances()) == _names(inventory[:5])
+    restarted.close()
+
+def test_older_schema_is_dropped_for_a_full_resync(tmp_path, inventory):
+    path = str(tmp_path / "inventory.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("CREATE TABLE instances (instance_id TEXT PRIMARY KEY, instance_uuid TEXT, customer_id TEXT, "
+                       "design_id TEXT, instance_status TEXT, data TEXT NOT NULL);"
+                       "CREATE TABLE sync_state (key TEXT PRIMARY KEY, value TEXT);"
+                       "INSERT INTO instances VALUES ('old', NULL, NULL, 'l3vpn', 'active', '{}');"
+                       "INSERT INTO sync_state VALUES ('full_synced_at', '1.0');")
+    conn.close()
+    store = InventoryStore(path)
+    assert store.load_sync_state() is None
+    assert store.query_digests() == []
+    store.apply_instances(inventory[:3], [], DELTA)
+    assert [instance_name for instance_name, _ in store.query_digests()] == _names(inventory[:3])
+    store.close()
+
+def test_digest_changes_with_the_document(store, inventory):
+    before = dict(store.query_digests({"instance_id": [inventory[0]["instance_id"], inventory[1]["instance_id"]]}))
+    store.apply_instances([dict(inventory[0], instance_status="failed"), inventory[1]], [], DELTA)
+    after = dict(store.query_digests({"instance_id": [inventory[0]["instance_id"], inventory[1]["instance_id"]]}))
+    assert after[inventory[0]["instance_id"]] != before[inventory[0]["instance_id"]]
+    assert after[inventory[1]["instance_id"]] == before[inventory[1]["instance_id"]]
+    assert store.get_documents([inventory[1]["instance_id"], "missing"]).keys() == {inventory[1]["instance_id"]}
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+import inventory_sync
+from conftest import api_path
+from inventory_store import InventoryStore
+from inventory_sync import InventorySync, DELTA
+from servicesConfigGenerator import make_api_request
+from rd_pagination import RDRequestError
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InventoryStore(str(tmp_path / "inventory.db"))
+    yield store
+    store.close()
+
+
+def _sync(store: InventoryStore, changes: list = None) -> InventorySync:
+    """A sync writing to store; every listener call is also appended to changes as (kind, instance names)"""
+    sync = InventorySync(api_path('get_instances'), api_path('get_orders'), interval=0, full_resync=3600,
+                         restore=store.load_sync_state)
+
+    def listener(upserts, removed, kind):
+        store.apply_instances(upserts, removed, kind, high_water_mark=sync.high_water_mark,
+                              timestamp_field=sync.timestamp_field)
+        if changes is not None:
+            changes.append((kind, [instance["instance_id"] for instance in upserts]))
+
+    sync.add_listener(listener)
+    return sync
+
+async def _update_instance(instance: dict, description: str):
+    """Submit an update order through the RD API, which records it in the orders feed"""
+    order = dict(instance, operation="update", instance_description=description)
+    response = await make_api_request(api_path('create_order'), method="POST", json_data=order)
+    assert "error" not in response
+
+def _stored(store: InventoryStore, instance_name: str) -> dict:
+    return store.query_instances({"instance_id": instance_name})[0]
+
+
+def test_full_resync_replaces_the_store(mock_rd, store):
+    sync = _sync(store)
+    asyncio.run(sync.sync())
+    assert [i["instance_id"] for i in store.query_instances()] == list(mock_rd.instances)
+
+    mock_rd.load_inventory(30, seed=2)
+    asyncio.run(sync.sync(force_full=True))
+    assert [i["instance_id"] for i in store.query_instances()] == list(mock_rd.instances)
+
+def test_incremental_sync_applies_new_orders(mock_rd, store):
+    changes = []
+    sync = _sync(store, changes)
+    instance = next(iter(mock_rd.instances.values()))
+
+    async def main():
+        await sync.sync()
+        await _update_instance(instance, "changed")
+        changes.clear()
+        await sync.sync()
+
+    asyncio.run(main())
+    assert _stored(store, instance["instance_id"])["instance_description"] == "changed"
+    # Only the changed instance is fetched and passed on
+    assert changes == [(DELTA, [instance["instance_id"]])]
+
+def test_failed_fetch_keeps_the_high_water_mark(mock_rd, store):
+    """Orders whose instances couldn't be fetched are picked up by the next sync"""
+    sync = _sync(store)
+    instance = next(iter(mock_rd.instances.values()))
+
+    async def main():
+        await sync.sync()
+        mark = sync.high_water_mark
+        await _update_instance(instance, "changed")
+
+        mock_rd.error_rate, mock_rd.error_routes = 1.0, {'get_instances'}
+        with pytest.raises(RDRequestError):
+            await sync.sync()
+        assert sync.high_water_mark == mark
+        assert _stored(store, instance["instance_id"]).get("instance_description") != "changed"
+
+        mock_rd.error_rate = 0.0
+        await sync.sync()
+        assert sync.high_water_mark != mark
+
+    asyncio.run(main())
+    assert _stored(store, instance["instance_id"])["instance_description"] == "changed"
+
+def test_rejected_filter_fetches_changes_in_one_pass(mock_rd, store, monkeypatch):
+    monkeypatch.setattr(inventory_sync, 'RD_INVENTORY_FETCH_BATCH', 5)
+    sync = _sync(store)
+    first, *instances = list(mock_rd.instances.values())[:21]
+
+    async def main():
+        await sync.sync()
+        mock_rd.reject_filter = True
+        await _update_instance(first, "changed")
+        # Learns that RD rejects the filter
+        await sync.sync()
+        for instance in instances:
+            await _update_instance(instance, "changed")
+        requests = mock_rd.requests['get_instances']
+        await sync.sync()
+        return mock_rd.requests['get_instances'] - requests
+
+    # A single unfiltered pass over the inventory rather than one per batch of 5
+    assert asyncio.run(main()) == 1
+    assert all(_stored(store, i["instance_id"])["instance_description"] == "changed" for i in [first] + instances)
+
+def test_restarted_sync_resumes_from_the_store(mock_rd, store):
+    asyncio.run(_sync(store).sync())
+    instance = next(iter(mock_rd.instances.values()))
+    asyncio.run(_update_instance(instance, "changed"))
+    changes = []
+
+    asyncio.run(_sync(store, changes).sync())
+    # The saved high-water mark lets the new sync fetch only the changes instead of everything
+    assert [kind for kind, _ in changes] == [DELTA]
+    assert instance["instance_id"] in changes[0][1]
+    assert _stored(store, instance["instance_id"])["instance_description"] == "changed"
+    assert len(store.query_instances()) == len(mock_rd.instances)
@@ -0,0 +1,69 @@
+import csv
+import json
+import pytest
+from helper_fns import read_service_manifest
+
+ROWS = [
+    {"service_type": "evpn_vpws", "customer_name": "customer-00000", "hostnames": "pe0000;pe0001",
+     "instance_id": "vpws-a", "eth_inf_type": "tagged", "cvlan_id": "100;200"},
+    {"service_type": "evpn_vpws", "customer_name": "customer-00001", "hostnames": "pe0002;pe0003", "speed": "1000"},
+]
+
+
+def _write_manifest(path, rows):
+    if path.suffix == ".csv":
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=sorted({key for row in rows for key in row}))
+            writer.writeheader()
+            writer.writerows(rows)
+    elif path.suffix == ".jsonl":
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    else:
+        path.write_text(json.dumps(rows))
+    return path
+
+def _payload(result):
+    with open(result["file"]) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".json"])
+def test_every_manifest_format_reads_the_same_rows(tmp_path, suffix):
+    rows = read_service_manifest(str(_write_manifest(tmp_path / f"manifest{suffix}", ROWS)))
+    # CSV leaves absent columns as empty strings
+    assert [{key: value for key, value in row.items() if value != ""} for row in rows] == ROWS
+
+def test_unsupported_manifest_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        read_service_manifest(str(tmp_path / "manifest.xlsx"))
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".json"])
+def test_manifest_rows_become_payloads(generator, tmp_path, suffix):
+    manifest = _write_manifest(tmp_path / f"manifest{suffix}", ROWS)
+    summary = generator.generate_services_from_manifest(str(manifest), output_dir=str(tmp_path / "payload"))
+    assert (summary["generated"], summary["failed"]) == (2, 0)
+
+    assert summary["results"][0]["instance_id"] == "vpwsa"
+    tagged, untagged = ([site["site_network_accesses"]["site_network_access"][0]["connection"]
+                         for site in _payload(result)["l2vpn_svc"]["sites"]["site"]]
+                        for result in summary["results"])
+    # One ';'-separated value per site, or a single value for all of them
+    assert [connection["tagged_interface"]["dot1q_vlan_tagged"]["cvlan_id"] for connection in tagged] == ["100", "200"]
+    assert [connection["untagged_interface"]["speed"] for connection in untagged] == ["1000", "1000"]
+
+def test_rows_asking_for_several_accesses_per_site_are_rejected(generator, tmp_path):
+    rows = [dict(ROWS[0], cvlan_id="100;200;300"),
+            dict(ROWS[1], cvlan_id=[["100", "101"], "200"]),
+            ROWS[1]]
+    manifest = _write_manifest(tmp_path / "manifest.json", rows)
+    summary = generator.generate_services_from_manifest(str(manifest), output_dir=str(tmp_path / "payload"))
+    assert [result["status"] for result in summary["results"]] == ["failed", "failed", "generated"]
+    assert all("one network access per site" in result["error"] for result in summary["results"][:2])
+
+def test_unknown_customer_and_device_fail_alone(generator, tmp_path):
+    rows = [dict(ROWS[0], customer_name="nobody"), dict(ROWS[0], hostnames="pe0000;ghost"), ROWS[1]]
+    manifest = _write_manifest(tmp_path / "manifest.jsonl", rows)
+    summary = generator.generate_services_from_manifest(str(manifest), output_dir=str(tmp_path / "payload"))
+    assert [result["status"] for result in summary["results"]] == ["failed", "failed", "generated"]
+    assert "nobody" in summary["results"][0]["error"]
+    assert "ghost" in summary["results"][1]["error"]
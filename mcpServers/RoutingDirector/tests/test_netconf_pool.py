@@ -0,0 +1,78 @@
+import pytest
+from netconf_pool import NetconfPool
+
+
+def _pool(max_size: int = 4) -> NetconfPool:
+    return NetconfPool(max_size=max_size, idle_timeout=300, health_check_after=300)
+
+
+def test_session_is_reused(fake_netconf):
+    pool = _pool()
+    with pool.session('h1', 830, 'u', 'p') as first:
+        pass
+    with pool.session('h1', 830, 'u', 'p') as second:
+        pass
+    assert first is second
+    assert len(fake_netconf.sessions) == 1
+    pool.close()
+    assert not first.connected
+
+def test_least_recently_used_idle_session_is_evicted(fake_netconf):
+    pool = _pool(max_size=2)
+    for host in ('h1', 'h2', 'h1', 'h3'):
+        with pool.session(host, 830, 'u', 'p'):
+            pass
+    h1, h2, h3 = fake_netconf.sessions
+    # h2 was idle longest when h3 needed a slot
+    assert (h1.connected, h2.connected, h3.connected) == (True, False, True)
+    # The two kept are reused rather than reopened
+    for host in ('h1', 'h3'):
+        with pool.session(host, 830, 'u', 'p'):
+            pass
+    assert len(fake_netconf.sessions) == 3
+    pool.close()
+
+def test_session_of_a_failed_block_is_closed(fake_netconf):
+    pool = _pool()
+    with pytest.raises(RuntimeError):
+        with pool.session('h1', 830, 'u', 'p') as m:
+            raise RuntimeError("RPC failed")
+    assert not m.connected
+    with pool.session('h1', 830, 'u', 'p') as again:
+        pass
+    assert again is not m
+    pool.close()
+
+def test_session_opened_with_another_password_is_not_reused(fake_netconf):
+    pool = _pool()
+    with pool.session('h1', 830, 'u', 'old') as old:
+        pass
+    with pool.session('h1', 830, 'u', 'new') as new:
+        pass
+    assert new is not old
+    assert not old.connected
+    pool.close()
+
+def test_checkout_waits_for_a_slot_then_times_out(fake_netconf):
+    pool = _pool(max_size=1)
+    with pool.session('h1', 830, 'u', 'p'):
+        with pytest.raises(TimeoutError):
+            with pool.session('h2', 830, 'u', 'p', timeout=0.2):
+                pass
+    # The slot given back is usable again, and the timed-out checkout kept none
+    with pool.session('h2', 830, 'u', 'p', timeout=0.2):
+        pass
+    with pool.session('h1', 830, 'u', 'p', timeout=0.2):
+        pass
+    pool.close()
+
+def test_unhealthy_idle_session_is_replaced(fake_netconf):
+    pool = NetconfPool(max_size=4, idle_timeout=300, health_check_after=0)
+    with pool.session('h1', 830, 'u', 'p') as first:
+        pass
+    first.replies = {}
+    with pool.session('h1', 830, 'u', 'p') as second:
+        pass
+    assert second is not first
+    assert not first.connected
+    pool.close()
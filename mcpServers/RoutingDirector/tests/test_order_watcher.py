@@ -0,0 +1,106 @@
+import time
+import asyncio
+from conftest import api_path
+from order_watcher import OrderWatcher
+from servicesConfigGenerator import make_api_request
+
+
+def _watcher() -> OrderWatcher:
+    return OrderWatcher(api_path('get_instances'), base_interval=0.05, max_interval=0.1)
+
+def _completed_instances(mock_rd):
+    return [instance for instance in mock_rd.instances.values()
+            if (instance.get('order_status') or {}).get('status') == 'success']
+
+async def _exec(instance):
+    return await make_api_request(api_path('execute_order', customer_id=instance['customer_id'],
+                                           instance_name=instance['instance_id']), method="POST")
+
+async def _polls_stop(mock_rd) -> bool:
+    """Whether the watcher has stopped polling get_instances"""
+    await asyncio.sleep(0.3)
+    polls = mock_rd.requests['get_instances']
+    await asyncio.sleep(0.3)
+    return mock_rd.requests['get_instances'] == polls
+
+
+def test_redeploy_waits_for_the_new_order(mock_rd):
+    """An instance whose last order succeeded is only complete again once the new order is"""
+    instance = _completed_instances(mock_rd)[0]
+
+    async def main():
+        watcher = _watcher()
+        baseline = await watcher.current_state(instance['instance_id'])
+        started = time.monotonic()
+        await _exec(instance)
+        result = await watcher.wait(instance['instance_id'], timeout=10, baseline=baseline)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(main())
+    assert result['status'] == 'completed'
+    assert elapsed >= mock_rd.exec_seconds
+
+def test_wait_without_baseline_takes_the_current_status(mock_rd):
+    instance = _completed_instances(mock_rd)[0]
+    result = asyncio.run(_watcher().wait(instance['instance_id'], timeout=10))
+    assert result['status'] == 'completed'
+
+def test_unchanged_baseline_times_out(mock_rd):
+    """Nothing was executed, so the order from the baseline is never taken for a new one"""
+    instance = _completed_instances(mock_rd)[0]
+
+    async def main():
+        watcher = _watcher()
+        baseline = await watcher.current_state(instance['instance_id'])
+        result = await watcher.wait(instance['instance_id'], timeout=0.5, baseline=baseline)
+        return result, await _polls_stop(mock_rd)
+
+    result, stopped = asyncio.run(main())
+    assert result['status'] == 'timeout'
+    assert stopped
+
+def test_cancelled_wait_stops_polling(mock_rd):
+    instance = _completed_instances(mock_rd)[0]
+
+    async def main():
+        watcher = _watcher()
+        baseline = await watcher.current_state(instance['instance_id'])
+        waiter = asyncio.create_task(watcher.wait(instance['instance_id'], timeout=30, baseline=baseline))
+        await asyncio.sleep(0.2)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        return await _polls_stop(mock_rd)
+
+    assert asyncio.run(main())
+
+def test_failed_polls_are_retried(mock_rd):
+    instance = _completed_instances(mock_rd)[0]
+
+    async def main():
+        watcher = _watcher()
+        baseline = await watcher.current_state(instance['instance_id'])
+        await _exec(instance)
+        mock_rd.error_rate, mock_rd.error_routes = 1.0, {'get_instances'}
+        waiter = asyncio.create_task(watcher.wait(instance['instance_id'], timeout=10, baseline=baseline))
+        await asyncio.sleep(0.3)
+        mock_rd.error_rate = 0.0
+        return await waiter
+
+    assert asyncio.run(main())['status'] == 'completed'
+
+def test_unreadable_order_status_fails_only_its_watch(mock_rd):
+    broken, healthy = _completed_instances(mock_rd)[:2]
+    broken['order_status'] = {'status': 'in_progress', 'workflow_trace': 'not a list of tasks'}
+
+    async def main():
+        watcher = _watcher()
+        return await asyncio.gather(watcher.wait(broken['instance_id'], timeout=5),
+                                    watcher.wait(healthy['instance_id'], timeout=5))
+
+    broken_result, healthy_result = asyncio.run(main())
+    assert broken_result['status'] == 'failed'
+    assert 'Unreadable order status' in broken_result['error']
+    assert healthy_result['status'] == 'completed'
@@ -0,0 +1,178 @@
+import pandas as pd
+import pytest
+from synthetic_inventory import generate_inventory
+from parser_registry import PARSERS, parse_services, ParsedServiceCache
+from inventory_store import InventoryStore
+from inventory_sync import DELTA, FULL_PAGE, FULL_DONE
+
+# How the per-design parsers laid out each design before the registry replaced them:
+# design_id -> (name column, network key, device detail, device separator, status key, reference keys)
+BASELINE_LAYOUTS = {
+    'eline-evpn-vpws-csm': ('L2VPN EVPN Service Name', 'l2vpn_ntw', None, ' → ', 'status_data',
+                            ('l2vpn_svc', 'order_status')),
+    'elan-evpn-csm': ('L2VPN EVPN Service Name', 'l2vpn_ntw', None, ' → ', 'status_data',
+                      ('l2vpn_svc', 'order_status')),
+    'eline-l2circuit-nsm': ('L2 Circuit Service Name', 'l2vpn_ntw', 'vpn_node_id', ' → ', 'status_data',
+                            ('order_status', 'fh_config', 'placement')),
+    'l3vpn': ('L3VPN Service Name', 'l3vpn_ntw', 'site_id', ' <-> ', 'assurance_data',
+              ('l3vpn_svc', 'active_assurance_test_result')),
+}
+
+
+def _baseline_devices(network, detail_field):
+    devices = []
+    try:
+        for vpn_service in network.get('vpn_services', {}).get('vpn_service', []):
+            for node in vpn_service.get('vpn_nodes', {}).get('vpn_node', []):
+                ne_id = node.get('ne_id', '')
+                if detail_field is None:
+                    if ne_id:
+                        devices.append(ne_id)
+                elif ne_id and node.get(detail_field, ''):
+                    devices.append(f"{ne_id}({node.get(detail_field, '')})")
+    except:
+        pass
+    return devices
+
+def _baseline_customer_name(network):
+    try:
+        vpn_service_list = network.get('vpn_services', {}).get('vpn_service', [])
+        if vpn_service_list:
+            return vpn_service_list[0].get('customer_name', '')
+    except:
+        pass
+    return ''
+
+def _baseline_order_status(item):
+    info = {'order_status': 'N/A', 'components_status': 'N/A', 'workflow_status': 'N/A'}
+    try:
+        order_status = item.get('order_status', {})
+        info['order_status'] = order_status.get('status', 'N/A')
+        statuses = []
+        for component in order_status.get('components', []):
+            comp_type, comp_data = component.get('component_type', ''), component.get('component_data', [])
+            if comp_data and comp_type and comp_data[-1].get('status', ''):
+                statuses.append(f"{comp_type}:{comp_data[-1].get('status', '')}")
+        info['components_status'] = ' | '.join(statuses) if statuses else 'No component data'
+        trace = order_status.get('workflow_trace', [])
+        if trace:
+            info['workflow_status'] = f"{sum(1 for task in trace if task.get('status') == 'success')}/{len(trace)} tasks successful"
+        else:
+            info['workflow_status'] = 'No workflow data'
+    except Exception:
+        pass
+    return info
+
+def _baseline_assurance(item):
+    info = {'summary': 'N/A', 'assurance_status': 'No data', 'test_results': 'No data', 'test_ids': 'No data'}
+    try:
+        assurance = item.get('active_assurance_test_result', {})
+        info['summary'] = assurance.get('summary', 'N/A')
+        node_statuses, test_results, test_ids = [], [], []
+        for node in assurance.get('nodes', []):
+            device_id, node_status = node.get('device', ''), node.get('status', '')
+            if node_status:
+                node_statuses.append(f"{device_id[:12]}...:{node_status}")
+            for test_result in node.get('test_results', []):
+                if test_result.get('status', ''):
+                    test_results.append(f"{device_id[:12]}...:{test_result.get('status', '')}")
+                if test_result.get('test_id', ''):
+                    test_ids.append(f"{device_id[:12]}...:{test_result.get('test_id', '')[:8]}...")
+        info['assurance_status'] = ' | '.join(node_statuses) if node_statuses else 'No status data'
+        info['test_results'] = ' | '.join(test_results) if test_results else 'No test results'
+        info['test_ids'] = ' | '.join(test_ids) if test_ids else 'No test IDs'
+    except Exception:
+        pass
+    return info
+
+def baseline_parse(json_data, design_id):
+    """(DataFrame, reference data) the way the per-design parsers built them, one record dict at a time"""
+    name_column, network_key, detail, separator, status_key, reference_keys = BASELINE_LAYOUTS[design_id]
+    services, reference_data = [], {}
+    for item in json_data if isinstance(json_data, list) else [json_data]:
+        if item.get('design_id') != design_id:
+            continue
+        network = item.get(network_key, {})
+        devices = _baseline_devices(network, detail)
+        record = {name_column: item.get('instance_id', ''), 'Customer ID': item.get('customer_id', ''),
+                  'Customer Name': _baseline_customer_name(network), 'Status': item.get('instance_status', ''),
+                  'Instance ID': item.get('instance_uuid', ''), 'Devices': separator.join(devices),
+                  'Device Count': len(devices)}
+        if status_key == 'assurance_data':
+            status = _baseline_assurance(item)
+            record.update({'Assurance Summary': status['summary'], 'Assurance Status': status['assurance_status'],
+                           'Test Results': status['test_results'], 'Test IDs': status['test_ids']})
+        else:
+            status = _baseline_order_status(item)
+            record.update({'Order Status': status['order_status'], 'Components Status': status['components_status'],
+                           'Workflow Status': status['workflow_status']})
+        services.append(record)
+        entry = {network_key: network}
+        entry.update({key: item.get(key, {}) for key in reference_keys})
+        entry[status_key] = status
+        reference_data[record[name_column]] = entry
+    return pd.DataFrame(services), reference_data
+
+
+@pytest.fixture
+def inventory():
+    instances = generate_inventory(400, seed=3, malformed_ratio=0.25)["instances"]
+    # Sections of the wrong type, which the parsers tolerate rather than fail on
+    instances[0]['order_status'] = {'status': 'success', 'components': None, 'workflow_trace': 'n/a'}
+    instances[1]['l2vpn_ntw'] = {'vpn_services': []}
+    instances[2]['active_assurance_test_result'] = {'nodes': [{'device': None, 'status': 'up'}]}
+    return instances
+
+def assert_matches_baseline(results, instances):
+    assert list(results) == list(PARSERS)
+    for design_id, (df, reference_data) in results.items():
+        expected_df, expected_reference = baseline_parse(instances, design_id)
+        pd.testing.assert_frame_equal(df, expected_df)
+        assert {name: reference_data[name] for name in reference_data} == expected_reference
+
+
+def test_parse_services_matches_baseline_parsers(inventory):
+    assert_matches_baseline(parse_services(inventory), inventory)
+
+def test_single_design_and_single_object(inventory):
+    item = next(instance for instance in inventory if instance.get('design_id') == 'l3vpn')
+    df, reference_data = parse_services(item, ['l3vpn'])['l3vpn']
+    expected_df, expected_reference = baseline_parse(item, 'l3vpn')
+    pd.testing.assert_frame_equal(df, expected_df)
+    assert dict(reference_data.items()) == expected_reference
+
+def test_design_without_instances_gives_empty_frame():
+    df, reference_data = parse_services([], ['l3vpn'])['l3vpn']
+    pd.testing.assert_frame_equal(df, baseline_parse([], 'l3vpn')[0])
+    assert len(reference_data) == 0
+
+def test_cached_parse_matches_baseline_and_reloads_only_changes(inventory, tmp_path):
+    store = InventoryStore(str(tmp_path / "inventory.db"))
+    store.apply_instances(inventory, [], FULL_PAGE)
+    store.apply_instances([], [], FULL_DONE)
+    loaded = []
+
+    def load_documents(instance_names):
+        loaded.extend(instance_names)
+        return store.get_documents(instance_names)
+
+    cache = ParsedServiceCache(load_documents)
+    results = cache.parse(store.query_digests())
+    assert len(loaded) == len(inventory)
+    assert_matches_baseline(results, inventory)
+
+    loaded.clear()
+    results = cache.parse(store.query_digests())
+    assert loaded == []
+    assert_matches_baseline(results, inventory)
+
+    removed = inventory.pop(6)
+    # The store lists a re-written instance after the others
+    changed = dict(inventory.pop(5), instance_status='failed')
+    inventory.append(changed)
+    store.apply_instances([changed], [removed['instance_id']], DELTA)
+    loaded.clear()
+    results = cache.parse(store.query_digests())
+    assert loaded == [changed['instance_id']]
+    assert_matches_baseline(results, inventory)
+    store.close()
@@ -0,0 +1,42 @@
+import json
+import asyncio
+from pathlib import Path
+
+
+def _payloads(mock_rd, count: int):
+    """Write count new service payloads to payload/, as the config generator would"""
+    customer = mock_rd.customers[0]
+    template = next(iter(mock_rd.instances.values()))
+    Path("payload").mkdir(exist_ok=True)
+    names = []
+    for i in range(count):
+        payload = dict(template, instance_id=f"pipeline{i}", customer_id=customer["customer_id"])
+        payload.pop("order_status", None)
+        Path("payload", f"pipeline{i}.json").write_text(json.dumps(payload))
+        names.append(f"pipeline{i}.json")
+    return names
+
+
+def test_every_item_goes_through_each_stage(mock_rd, services_manager):
+    items = _payloads(mock_rd, 6)
+    report = asyncio.run(services_manager.run_lifecycle_pipeline(items, upload_concurrency=2, validate_concurrency=2,
+                                                                 deploy_concurrency=2, wait_for_completion=True,
+                                                                 order_timeout=10))
+    assert (report["succeeded"], report["failed"]) == (6, 0)
+    assert all(item["stages"] == {"upload": "ok", "validate": "ok", "deploy": "ok", "complete": "ok"}
+               for item in report["items"])
+    assert all(mock_rd.instances[f"pipeline{i}"]["instance_status"] == "active" for i in range(6))
+
+def test_failed_items_stop_at_their_stage(mock_rd, services_manager):
+    items = _payloads(mock_rd, 1) + ["missing.json", "no-such-instance"]
+    report = asyncio.run(services_manager.run_lifecycle_pipeline(items, deploy=False))
+    assert [item["status"] for item in report["items"]] == ["succeeded", "failed", "failed"]
+    assert report["items"][0]["stages"] == {"upload": "ok", "validate": "ok"}
+    assert report["failed_by_stage"] == {"upload": 1, "validate": 1}
+
+def test_failed_order_fails_the_complete_stage(mock_rd, services_manager):
+    mock_rd.order_failure_rate = 1.0
+    report = asyncio.run(services_manager.run_lifecycle_pipeline(_payloads(mock_rd, 2), wait_for_completion=True,
+                                                                 order_timeout=10))
+    assert report["failed_by_stage"] == {"complete": 2}
+    assert all(item["order"]["status"] == "failed" for item in report["items"])
@@ -0,0 +1,29 @@
+import asyncio
+from rd_client import get_rd_client, close_rd_client
+
+
+def test_client_is_reused_within_a_loop():
+    async def main():
+        first, second = get_rd_client(), get_rd_client()
+        await close_rd_client()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first is second
+    assert first.is_closed
+
+def test_client_of_a_previous_loop_is_closed():
+    async def first_run():
+        return get_rd_client()
+
+    async def second_run():
+        client = get_rd_client()
+        # Let the close of the previous client run
+        await asyncio.sleep(0.1)
+        await close_rd_client()
+        return client
+
+    old = asyncio.run(first_run())
+    new = asyncio.run(second_run())
+    assert new is not old
+    assert old.is_closed
@@ -0,0 +1,84 @@
+import asyncio
+from conftest import api_path
+from reference_data import ReferenceDataStore, build_customer_index, build_device_index, build_site_index
+from servicesConfigGenerator import make_api_request
+
+DATASET_ROUTES = {"customers": "get_customers", "devices": "get_devices", "sites": "get_sites"}
+
+
+def test_every_dataset_is_fetched_once_for_concurrent_callers(mock_rd):
+    store = ReferenceDataStore()
+
+    async def main():
+        return await asyncio.gather(*(store.get_all() for _ in range(5)))
+
+    snapshots = asyncio.run(main())
+    assert all(snapshot["customers"] == mock_rd.customers for snapshot in snapshots)
+    assert all(mock_rd.requests[route] == 1 for route in DATASET_ROUTES.values())
+    # The topo and RT resource files are both read from get_resources
+    assert mock_rd.requests["get_resources"] == 2
+    assert snapshots[0]["infra_id"] == mock_rd.infra_id
+
+def test_expired_dataset_is_served_stale_while_it_revalidates(mock_rd):
+    store = ReferenceDataStore(ttls={"customers": 0.0})
+
+    async def main():
+        await store.get_all()
+        await make_api_request(api_path("create_customer"), method="POST", json_data={"name": "new-customer"})
+        stale = await store.get("customers")
+        # Let the background revalidation finish
+        await asyncio.sleep(0.2)
+        return stale, await store.get("customers")
+
+    stale, fresh = asyncio.run(main())
+    assert "new-customer" not in [customer["name"] for customer in stale]
+    assert "new-customer" in [customer["name"] for customer in fresh]
+    assert mock_rd.requests["get_customers"] >= 2
+
+def test_invalidated_dataset_is_fetched_again(mock_rd):
+    store = ReferenceDataStore()
+
+    async def main():
+        await store.get_all()
+        store.invalidate("devices")
+        await store.get_all()
+
+    asyncio.run(main())
+    assert mock_rd.requests["get_devices"] == 2
+    assert mock_rd.requests["get_customers"] == 1
+
+def test_error_responses_are_not_cached(mock_rd):
+    store = ReferenceDataStore()
+    mock_rd.error_rate, mock_rd.error_status, mock_rd.error_routes = 1.0, 404, {"get_sites"}
+
+    async def main():
+        failed = await store.get("sites")
+        mock_rd.error_rate = 0.0
+        return failed, await store.get("sites")
+
+    failed, sites = asyncio.run(main())
+    assert "error" in failed
+    assert sites == mock_rd.sites
+
+def test_generator_lookups_ignore_case(generator, mock_rd):
+    customer = mock_rd.customers[0]
+    device = mock_rd.devices["devices"][0]
+    site = next(site for site in mock_rd.sites if site["id"] == device["siteId"])
+    assert generator.get_customer_id(customer["name"].upper()) == customer["customer_id"]
+    assert generator.get_device_and_site_ids(device["hostname"].upper()) == [device["id"], device["siteId"]]
+    assert generator.get_site_details(site["id"].upper()) == site
+
+def test_generator_lookups_of_unknown_names_return_none(generator):
+    assert generator.get_customer_id("nobody") is None
+    assert generator.get_device_and_site_ids("ghost") is None
+    assert generator.get_site_details("nowhere") is None
+
+def test_duplicate_names_resolve_to_the_first_listed():
+    """The indexes give the same answer as the linear scans they replaced"""
+    customers = [{"name": "Acme", "customer_id": "c-1"}, {"name": "acme", "customer_id": "c-2"}]
+    assert build_customer_index(customers)["acme"] == "c-1"
+    devices = {"devices": [{"hostname": "PE1", "id": "d-1", "siteId": "s-1"},
+                           {"hostname": "pe1", "id": "d-2", "siteId": "s-2"}]}
+    assert build_device_index(devices)["pe1"] == ("d-1", "s-1")
+    # An error response indexes to nothing rather than failing
+    assert build_site_index({"error": "HTTP 500"}) == {}
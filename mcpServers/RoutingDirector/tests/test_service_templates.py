@@ -0,0 +1,42 @@
+import os
+import json
+import pytest
+from service_templates import CompiledTemplate, format_path
+from servicesConfigGenerator import utilityFunctions
+
+TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'services', 'evpn_vpws_template.json')
+
+
+@pytest.fixture
+def template():
+    with open(TEMPLATE_FILE) as f:
+        return json.load(f)
+
+
+def test_instantiate_matches_recursive_replace(template):
+    values = {"{CUSTOMER_UUID}": "c-1", "{DESIGN_IDENTIFIER}": "evpn-vpws",
+              "{INSTANCE_IDENTIFIER}": "vpws_1", "{INSTANCE_UUID}": "u-1"}
+    document, missing = CompiledTemplate(template).instantiate(values)
+    assert document == utilityFunctions._replace_in_dict(template, values)
+    assert missing
+
+def test_none_value_is_reported_missing():
+    document, missing = CompiledTemplate({"customer_id": "{CUSTOMER_UUID}", "name": "{NAME}"}).instantiate(
+        {"{CUSTOMER_UUID}": None, "{NAME}": "vpn1"})
+    assert document == {"customer_id": "{CUSTOMER_UUID}", "name": "vpn1"}
+    assert [(format_path(path), value) for path, value in missing] == [("customer_id", "{CUSTOMER_UUID}")]
+
+def test_non_string_values_are_filled_as_strings():
+    compiled = CompiledTemplate({"sites": [{"vlan": "{VLAN}", "name": "site-{ID}-{VLAN}"}]})
+    document, missing = compiled.instantiate({"{VLAN}": 100, "{ID}": 7})
+    assert document == {"sites": [{"vlan": "100", "name": "site-7-100"}]}
+    assert not missing
+
+def test_omitted_subtree_is_left_empty_and_unreported():
+    compiled = CompiledTemplate({"id": "{ID}", "sites": {"site": [{"site_id": "{SITE_ID}"}]}})
+    document, missing = compiled.instantiate({"{ID}": "x"}, omit=(("sites", "site"),))
+    assert document == {"id": "x", "sites": {"site": []}}
+    assert not missing
+    # The template itself is left untouched
+    assert compiled.template["sites"]["site"] == [{"site_id": "{SITE_ID}"}]